@@ -0,0 +1,5 @@
+"""Standalone fuzz and performance checks for the notebook helpers.
+
+Run from the notebooks/ directory, e.g. `python -m benchmarks.json_salvage`.
+None of them need the network or the database.
+"""
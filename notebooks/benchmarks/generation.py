@@ -0,0 +1,193 @@
+"""End-to-end generation throughput against the local stub servers.
+
+    python -m benchmarks.generation [--backend ollama claude] [--requests 40] [--concurrency 1 4 8]
+                                    [--per-subject 5] [--hosts 2] [--save]
+                                    [--latency 0.05] [--token-rate 2000] [--parallel 4]
+                                    [--truncate 0.1] [--errors 0.05]
+
+Every request runs the notebook pipeline: call_ollama (through the shared host pool,
+one stub per --hosts) or call_claude (via ANTHROPIC_BASE_URL) → JSON parse →
+ai_to_scored_compositions (batched conversion and scoring), and with --save also
+save_compositions into the configured database (rows are tagged
+generation_method="benchmark-stub" and deleted afterwards). For each backend and
+concurrency level it reports valid compositions per second plus p50/p95/p99 latency
+per stage, taken from helpers.metrics: the clients' own spans (ollama.http,
+ollama.parse, claude.http, claude.parse, db.insert) plus "request" (the whole client
+call) and "convert" (ai_to_scored_compositions).
+
+Without --save no database is needed; no real model host is ever contacted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+
+from helpers import claude as claude_client
+from helpers import metrics
+from helpers import ollama as ollama_client
+from helpers.models import AiComposition, ai_to_scored_compositions
+from helpers.pool import configure_pool
+
+from .stub_servers import add_config_arguments, anthropic_server, config_from_args, ollama_server
+
+SUBJECTS = ["cat", "house", "tree", "bicycle", "fish", "umbrella", "guitar", "rocket"]
+STUB_METHOD = "benchmark-stub"
+
+
+@dataclass
+class RunStats:
+    backend: str
+    concurrency: int
+    seconds: float = 0.0
+    requests: int = 0
+    failed: int = 0
+    compositions: int = 0
+    valid: int = 0
+    stages: dict[str, dict] = field(default_factory=dict)
+    server: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+def _generate(backend: str, subject: str, per_subject: int, model: str | None) -> list[AiComposition | dict]:
+    if backend == "ollama":
+        messages = ollama_client.build_few_shot_messages(subject, per_subject, [])
+        data = ollama_client.call_ollama(messages, model=model or ollama_client.DEFAULT_MODEL,
+                                         schema=ollama_client.COMPOSITION_SCHEMA)
+        return data.get("compositions", [])
+    comps, _ = claude_client.call_claude(
+        claude_client.CLAUDE_SYSTEM_PROMPT, claude_client.build_user_prompt(subject, per_subject),
+        model=model or claude_client.DEFAULT_MODEL,
+    )
+    return comps
+
+
+def _one_request(stats: RunStats, backend: str, subject: str, per_subject: int, model: str | None, save: bool) -> None:
+    try:
+        with metrics.span("request"):
+            ai_comps = _generate(backend, subject, per_subject, model)
+    except Exception as e:
+        with stats._lock:
+            stats.failed += 1
+        print(f"    {subject}: {type(e).__name__}: {e}")
+        return
+
+    with metrics.span("convert"):
+        scored = ai_to_scored_compositions(ai_comps, generation_method=STUB_METHOD)
+    comps = [c for c, _, _ in scored]
+    valid = [c for c, ok, _ in scored if ok]
+
+    if save and valid:
+        from helpers.db import save_compositions
+        save_compositions(subject, valid, generation_method=STUB_METHOD)
+
+    with stats._lock:
+        stats.requests += 1
+        stats.compositions += len(comps)
+        stats.valid += len(valid)
+
+
+def _server_totals(servers: list) -> dict[str, int]:
+    totals: dict[str, int] = {}
+    for server in servers:
+        for key, value in asdict(server.stats).items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def run(
+    backend: str,
+    concurrency: int,
+    requests: int,
+    per_subject: int,
+    model: str | None,
+    save: bool,
+    servers: list,
+) -> RunStats:
+    """One batch of requests; servers are the stubs behind this backend, for their counters."""
+    stats = RunStats(backend, concurrency)
+    before = _server_totals(servers)
+    metrics.reset()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(requests):
+            pool.submit(_one_request, stats, backend, SUBJECTS[i % len(SUBJECTS)], per_subject, model, save)
+    stats.seconds = time.perf_counter() - t0
+    stats.stages = metrics.snapshot()["stages"]
+    stats.server = {k: v - before.get(k, 0) for k, v in _server_totals(servers).items()}
+    return stats
+
+
+def report(stats: RunStats) -> None:
+    rate = stats.valid / stats.seconds if stats.seconds else 0.0
+    print(f"  {stats.backend} × {stats.concurrency}: {stats.valid}/{stats.compositions} valid from "
+          f"{stats.requests} requests ({stats.failed} failed) in {stats.seconds:.1f}s — "
+          f"{rate:.1f} valid compositions/s, {stats.requests / stats.seconds if stats.seconds else 0:.2f} requests/s")
+    server = stats.server
+    if server:
+        print(f"    server side: {server['requests']} requests, {server['errors']} injected errors "
+              f"(the pool / SDK retry these), {server['truncated']} truncated, "
+              f"{server['output_tokens'] / stats.seconds if stats.seconds else 0:,.0f} output tok/s")
+    print(f"    {'stage':<16}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, s in sorted(stats.stages.items(), key=lambda kv: -kv[1]["sum"]):
+        print(f"    {name:<16}{s['count']:>6}{s['p50'] * 1000:>10.1f}{s['p95'] * 1000:>10.1f}{s['p99'] * 1000:>10.1f}")
+
+
+def _cleanup_saved() -> None:
+    from helpers.db import get_connection, invalidate_stats
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM seed_compositions WHERE generation_method = %s", (STUB_METHOD,))
+            print(f"Removed {cur.rowcount} benchmark rows")
+        conn.commit()
+    invalidate_stats()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", nargs="+", choices=["ollama", "claude"], default=["ollama", "claude"])
+    parser.add_argument("--requests", type=int, default=40, help="requests per backend and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--per-subject", type=int, default=5, help="compositions asked for per request")
+    parser.add_argument("--hosts", type=int, default=2, help="Ollama stub hosts behind the pool")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--save", action="store_true", help="also run save_compositions (needs the database)")
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config = config_from_args(args)
+    metrics.enable()
+    if args.model and args.model not in config.models:
+        config.models.append(args.model)
+
+    with ExitStack() as stack:
+        servers = {
+            "ollama": [stack.enter_context(ollama_server(config)) for _ in range(args.hosts)],
+            "claude": [stack.enter_context(anthropic_server(config))],
+        }
+        claude_url = servers["claude"][0].url
+        configure_pool([s.url for s in servers["ollama"]])
+        os.environ["ANTHROPIC_BASE_URL"] = claude_url
+        os.environ.setdefault("ANTHROPIC_API_KEY", "stub")
+        print(f"Stubs: {args.hosts} Ollama hosts, Anthropic at {claude_url} — latency {config.latency}s, "
+              f"{config.token_rate:.0f} tok/s, {config.parallel} parallel, "
+              f"truncate {config.truncate_rate:.0%}, errors {config.error_rate:.0%}")
+        try:
+            for backend in args.backend:
+                for concurrency in args.concurrency:
+                    report(run(backend, concurrency, args.requests, args.per_subject, args.model, args.save,
+                               servers[backend]))
+        finally:
+            if args.save:
+                _cleanup_saved()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Measure decode time and peak RSS of load_image at full size vs. max_side.
+
+    python -m benchmarks.image_decode [--max-side 1024] [--repeat 3]
+
+Synthetic photo-like JPEGs (12, 16 and 24 MP) are written to a temp directory.
+Each measurement runs in a fresh subprocess. On Linux the peak-RSS counter (VmHWM) is
+reset after imports via /proc/self/clear_refs, so the reported figure is the decode's
+own peak growth; elsewhere it falls back to ru_maxrss, which includes import overhead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from .synthetic import photo_like
+
+SIZES_MP = {12: (4000, 3000), 16: (4608, 3456), 24: (6000, 4000)}
+
+_CHILD = """
+import json, resource, sys, time
+from helpers.images import load_image
+
+def status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+
+def reset_peak():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return status_kb("VmRSS")
+    except OSError:
+        return 0
+
+path, max_side, repeat = sys.argv[1], sys.argv[2], int(sys.argv[3])
+max_side = None if max_side == "none" else int(max_side)
+times, growth = [], []
+for _ in range(repeat):
+    base = reset_peak()
+    t0 = time.perf_counter()
+    img = load_image(path, max_side=max_side)
+    times.append(time.perf_counter() - t0)
+    try:
+        peak = status_kb("VmHWM")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    growth.append(peak - base)
+    size = img.size
+    del img
+print(json.dumps({"seconds": min(times), "rss_mb": max(growth) / 1024, "size": size}))
+"""
+
+
+def _measure(path: Path, max_side: int | None, repeat: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, str(path), str(max_side or "none"), str(repeat)],
+        capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent.parent,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-side", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'image':<10}{'mode':<16}{'decode':>10}{'peak RSS':>12}  result size")
+        for mp, (w, h) in SIZES_MP.items():
+            path = Path(tmp) / f"photo_{mp}mp.jpg"
+            photo_like(w, h, seed=mp).save(path, quality=90)
+            for label, max_side in (("full", None), (f"max_side={args.max_side}", args.max_side)):
+                r = _measure(path, max_side, args.repeat)
+                size = "×".join(str(v) for v in r["size"])
+                print(f"{mp:>3} MP    {label:<16}{r['seconds'] * 1000:>8.0f}ms{r['rss_mb']:>10.0f}MB  {size}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
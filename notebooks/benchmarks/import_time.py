@@ -0,0 +1,114 @@
+"""Cold import cost of the helpers package: time, RSS growth and which heavy libraries load.
+
+    python -m benchmarks.import_time [--repeat 5] [--compare REV]
+
+Each statement runs in a fresh interpreter (interpreter start-up itself is not
+counted), and the best of --repeat runs is reported. With --compare, the helpers
+package from git revision REV is extracted to a temp directory and measured the same
+way, for a before/after table.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+NOTEBOOKS = Path(__file__).resolve().parent.parent
+
+STATEMENTS = [
+    "import helpers",
+    "import helpers.models",
+    "from helpers import Composition, validate",
+    "from helpers.validate import score_arrays",
+    "from helpers import call_ollama",
+    "from helpers import save_compositions",
+    "from helpers import trace_image",
+    "from helpers import draw_grid",
+    "from helpers import call_claude",
+]
+
+HEAVY = ["anthropic", "matplotlib", "svgpathtools", "scipy", "cv2", "vtracer", "psycopg2", "httpx", "numpy", "PIL"]
+
+_CHILD = """
+import json, sys, time
+
+def rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return 0
+
+before = rss_kb()
+t0 = time.perf_counter()
+exec(sys.argv[1])
+seconds = time.perf_counter() - t0
+heavy = [m for m in json.loads(sys.argv[2]) if m in sys.modules]
+print(json.dumps({"seconds": seconds, "rss_mb": (rss_kb() - before) / 1024, "heavy": heavy}))
+"""
+
+
+def measure(statement: str, cwd: Path, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD, statement, json.dumps(HEAVY)],
+            capture_output=True, text=True, cwd=cwd,
+        )
+        if out.returncode != 0:
+            return {"error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "failed"}
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda r: r["seconds"])
+
+
+def extract_revision(rev: str, dest: Path) -> Path:
+    """Write notebooks/helpers as of rev under dest; returns the directory to run from."""
+    repo = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, check=True, cwd=NOTEBOOKS,
+    ).stdout.strip()
+    prefix = NOTEBOOKS.relative_to(repo).as_posix()
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", rev, f"{prefix}/helpers"], capture_output=True, check=True, cwd=repo,
+    ).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(dest)
+    return dest / prefix
+
+
+def _cell(r: dict) -> str:
+    if "error" in r:
+        return f"{'error':>9}{'':>8}"
+    return f"{r['seconds'] * 1000:>7.0f}ms{r['rss_mb']:>6.0f}MB"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compare", metavar="REV", help="also measure the helpers package at this git revision")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_cwd = extract_revision(args.compare, Path(tmp)) if args.compare else None
+        width = max(len(s) for s in STATEMENTS) + 2
+        header = f"{'statement':<{width}}" + (f"{args.compare:>17}" if old_cwd else "") + f"{'now':>17}  heavy modules loaded"
+        print(header)
+        for statement in STATEMENTS:
+            now = measure(statement, NOTEBOOKS, args.repeat)
+            line = f"{statement:<{width}}"
+            if old_cwd:
+                line += _cell(measure(statement, old_cwd, args.repeat))
+            line += _cell(now) + "  " + ", ".join(now.get("heavy", []))
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Fuzz and benchmark the shared LLM JSON salvage parser (helpers.jsonparse).
+
+    python -m benchmarks.json_salvage [--cases 2000] [--seed 0]
+
+Fuzz: random ~8k-token composition responses, wrapped in fences / prose / trailing
+junk and truncated at random offsets. For every case the parser must return exactly
+the compositions that were complete before the cut, and never raise on a response
+that contains at least one complete composition.
+
+Benchmark: the old nested-quantifier regex against the new scanner on pathological
+inputs (repeated composition openers, long runs of "]", unterminated strokes) at
+sizes up to 8k tokens, showing the regex's quadratic growth next to the scanner's
+linear scaling, plus how many compositions each recovers from truncated responses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+
+from helpers.jsonparse import salvage_json
+
+# The salvage regex helpers/ollama.py used before the shared parser
+_LEGACY_PATTERN = re.compile(
+    r'\{"subject"\s*:\s*"[^"]*"\s*,\s*"strokes"\s*:\s*\[(?:[^\]]*\])*\s*\]\s*\}'
+)
+
+# ~4 chars per token for this kind of JSON
+TARGET_CHARS = 8192 * 4
+
+
+def _composition(rng: random.Random, subject: str) -> dict:
+    strokes = []
+    for _ in range(rng.randint(4, 14)):
+        n = rng.randint(8, 40)
+        strokes.append({
+            "xs": [round(rng.random(), 3) for _ in range(n)],
+            "ys": [round(rng.random(), 3) for _ in range(n)],
+        })
+    return {"subject": subject, "strokes": strokes}
+
+
+def _response(rng: random.Random) -> tuple[str, list[dict], list[int]]:
+    """Build one large response. Returns (text, compositions, end offset of each composition)."""
+    subject = rng.choice(["cat", "dog", 'quote "q"', "back\\slash", "brace } [ ]", "ünï"])
+    compact = rng.random() < 0.5
+    sep = ", " if compact else ",\n    "
+
+    text = rng.choice(["", "", "Here you go:\n", "```json\n", "```\n", "Sure! ```json\n"])
+    text += '{"compositions": [' if compact else '{\n  "compositions": [\n    '
+    comps, ends = [], []
+    while len(text) < TARGET_CHARS:
+        c = _composition(rng, subject)
+        if comps:
+            text += sep
+        text += json.dumps(c, ensure_ascii=rng.random() < 0.5)
+        comps.append(c)
+        ends.append(len(text))
+    text += "]}" if compact else "\n  ]\n}"
+    text += rng.choice(["", "\n```", "\n```\nHope that helps {", " trailing ]]] junk"])
+    return text, comps, ends
+
+
+def fuzz(cases: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    for i in range(cases):
+        text, comps, ends = _response(rng)
+
+        if rng.random() < 0.3:
+            cut = len(text)
+            expected, expect_truncated = comps, False
+        else:
+            cut = rng.randint(1, ends[-1])
+            expected = comps[:sum(1 for e in ends if e <= cut)]
+            expect_truncated = True
+
+        try:
+            data, truncated = salvage_json(text[:cut])
+            got = data.get("compositions", [])
+        except json.JSONDecodeError:
+            got, truncated = [], expect_truncated
+
+        if got != expected or truncated != expect_truncated:
+            failures += 1
+            if failures <= 5:
+                print(f"  case {i}: cut={cut}/{len(text)} expected {len(expected)} got {len(got)}", file=sys.stderr)
+    return failures
+
+
+def _pathological(n: int) -> list[tuple[str, str]]:
+    return [
+        ("repeated-openers", '{"compositions": [' + '{"subject": "x", "strokes": [0.1] ' * (n // 36)),
+        ("unclosed-brackets", '{"compositions": [{"subject": "x", "strokes": [' + "]" * n),
+        ("ragged-strokes", '{"compositions": [{"subject": "x", "strokes": [' + "[0.1]," * (n // 6)),
+    ]
+
+
+def _time(fn, text: str) -> float:
+    t0 = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - t0
+
+
+def _new(text: str) -> None:
+    try:
+        salvage_json(text)
+    except json.JSONDecodeError:
+        pass
+
+
+def _legacy(text: str) -> list[dict]:
+    found = []
+    for m in _LEGACY_PATTERN.finditer(text):
+        try:
+            found.append(json.loads(m.group()))
+        except json.JSONDecodeError:
+            pass
+    return found
+
+
+def benchmark() -> None:
+    print(f"{'input':<20}{'chars':>9}{'legacy regex':>15}{'scanner':>12}")
+    for n in (TARGET_CHARS // 8, TARGET_CHARS // 4, TARGET_CHARS // 2, TARGET_CHARS):
+        for name, text in _pathological(n):
+            legacy = _time(_legacy, text)
+            new = _time(_new, text)
+            print(f"{name:<20}{len(text):>9}{legacy * 1000:>13.2f}ms{new * 1000:>10.2f}ms")
+
+    rng = random.Random(1)
+    responses = [_response(rng) for _ in range(20)]
+    texts = [r[0] for r in responses]
+    truncated = [t[: len(t) * 2 // 3] for t in texts]
+    for label, batch in (("valid 8k-token", texts), ("truncated 8k-token", truncated)):
+        t0 = time.perf_counter()
+        for t in batch:
+            _new(t)
+        per = (time.perf_counter() - t0) / len(batch)
+        print(f"{label:<20}{len(batch[0]):>9}{'':>15}{per * 1000:>10.2f}ms")
+
+    legacy_found = sum(len(_legacy(t)) for t in truncated)
+    new_found = sum(len(salvage_json(t)[0]["compositions"]) for t in truncated)
+    print(f"recovered from {len(truncated)} truncated responses: legacy {legacy_found}, scanner {new_found}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-bench", action="store_true")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    failures = fuzz(args.cases, args.seed)
+    print(f"fuzz: {args.cases} cases, {failures} failures ({time.perf_counter() - t0:.1f}s)")
+
+    if not args.no_bench:
+        benchmark()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
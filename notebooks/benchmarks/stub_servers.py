@@ -0,0 +1,293 @@
+"""Local stand-ins for an Ollama host and the Anthropic Messages API.
+
+    python -m benchmarks.stub_servers [--ollama-port 11435] [--anthropic-port 11436]
+                                      [--latency 0.05] [--token-rate 2000] [--parallel 4]
+                                      [--truncate 0.0] [--errors 0.0] [--variety N]
+
+Ollama: GET /api/tags and non-streaming POST /api/chat. Anthropic: POST /v1/messages
+(point the SDK at it with ANTHROPIC_BASE_URL=http://127.0.0.1:11436). Replies hold
+synthetic compositions (benchmarks.synthetic) for the subject and count named in the
+last user message ("Draw N distinct variations of: <subject>"), so the usual parsing
+and validation run on them.
+
+Each reply takes latency + output_tokens / token_rate seconds, and at most `parallel`
+requests are served at once (the rest queue, like OLLAMA_NUM_PARALLEL). Replies longer
+than num_predict / max_tokens are cut off and marked done_reason "length" /
+stop_reason "max_tokens"; --truncate cuts a random share of replies short the same way,
+and --errors fails a random share with HTTP 500 (Ollama) or 529 overloaded (Anthropic).
+With --variety N, every drawing is one of N fixed ones per subject, so repeats become
+common as a run goes on (for exercising diversity-based early stopping).
+GET /stub/stats returns the request, error and truncation counters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import synthetic
+
+CHARS_PER_TOKEN = 4
+DEFAULT_SUBJECT = "thing"
+DEFAULT_COUNT = 3
+
+_REQUEST = re.compile(r"Draw (\d+) distinct variations? of: ([^\n]+)")
+
+
+@dataclass
+class StubConfig:
+    latency: float = 0.05        # seconds before the first token
+    token_rate: float = 2000.0   # output tokens per second per request
+    parallel: int = 4            # requests generated concurrently; the rest wait
+    truncate_rate: float = 0.0   # share of replies cut off mid-JSON
+    error_rate: float = 0.0      # share of requests failed with a 5xx
+    variety: int | None = None   # distinct drawings per subject; None for all-new every time
+    models: list[str] = field(default_factory=lambda: ["qwen2.5:14b", "llama3.1:8b"])
+    seed: int = 0
+
+
+@dataclass
+class StubStats:
+    requests: int = 0
+    errors: int = 0
+    truncated: int = 0
+    output_tokens: int = 0
+
+
+def _prompt(messages: list[dict]) -> tuple[int, str]:
+    """(count, subject) asked for in the last user message."""
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        content = message.get("content", "")
+        if isinstance(content, list):  # Anthropic content blocks
+            content = " ".join(block.get("text", "") for block in content if isinstance(block, dict))
+        match = _REQUEST.search(content)
+        if match:
+            return int(match.group(1)), match.group(2).strip()
+        break
+    return DEFAULT_COUNT, DEFAULT_SUBJECT
+
+
+_instances = itertools.count()
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, port: int, handler: type[BaseHTTPRequestHandler], config: StubConfig):
+        super().__init__(("127.0.0.1", port), handler)
+        self.config = config
+        self.stats = StubStats()
+        self._slots = threading.BoundedSemaphore(max(1, config.parallel))
+        self._lock = threading.Lock()
+        # Distinct but reproducible streams when several stubs share one config
+        self._rng = random.Random(config.seed * 1_000_003 + next(_instances))
+        self._counter = 0
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> _StubServer:
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> _StubServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def generate(self, messages: list[dict], max_tokens: int | None) -> tuple[str, str, int, int] | None:
+        """Produce (text, finish, input_tokens, output_tokens) after the simulated delay,
+        or None for an injected failure. finish is "stop" or "length"."""
+        with self._lock:
+            self._counter += 1
+            seed = self.config.seed * 1_000_003 + self._counter
+            fail = self._rng.random() < self.config.error_rate
+            cut = self._rng.uniform(0.3, 0.9) if self._rng.random() < self.config.truncate_rate else None
+            picks = [self._rng.randrange(self.config.variety) for _ in range(64)] if self.config.variety else None
+            self.stats.requests += 1
+            if fail:
+                self.stats.errors += 1
+
+        with self._slots:
+            if fail:
+                time.sleep(self.config.latency)
+                return None
+
+            count, subject = _prompt(messages)
+            if picks is None:
+                comps = synthetic.composition_dicts(count, seed, subject)
+            else:
+                base = sum(map(ord, subject)) * 1_000_003
+                comps = [synthetic.composition_dicts(1, base + picks[i % len(picks)], subject)[0] for i in range(count)]
+            text = json.dumps({"compositions": comps})
+            finish = "stop"
+            if cut is not None:
+                text, finish = text[:int(len(text) * cut)], "length"
+            if max_tokens is not None and len(text) > max_tokens * CHARS_PER_TOKEN:
+                text, finish = text[:max_tokens * CHARS_PER_TOKEN], "length"
+            output_tokens = math.ceil(len(text) / CHARS_PER_TOKEN)
+            input_tokens = math.ceil(len(json.dumps(messages)) / CHARS_PER_TOKEN)
+            time.sleep(self.config.latency + output_tokens / self.config.token_rate)
+
+        with self._lock:
+            self.stats.output_tokens += output_tokens
+            if finish == "length":
+                self.stats.truncated += 1
+        return text, finish, input_tokens, output_tokens
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _StubServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self) -> None:
+        if self.path == "/stub/stats":
+            self._send(200, asdict(self.server.stats))
+        else:
+            self._send(404, {"error": f"no route {self.path}"})
+
+
+class _OllamaHandler(_Handler):
+    def do_GET(self) -> None:
+        if self.path == "/api/tags":
+            self._send(200, {"models": [{"name": m, "model": m} for m in self.server.config.models]})
+        else:
+            super().do_GET()
+
+    def do_POST(self) -> None:
+        if self.path != "/api/chat":
+            self._send(404, {"error": f"no route {self.path}"})
+            return
+        body = self._body()
+        model = body.get("model", "")
+        if model not in self.server.config.models:
+            self._send(404, {"error": f"model '{model}' not found, try pulling it first"})
+            return
+        started = time.perf_counter()
+        result = self.server.generate(body.get("messages", []), body.get("options", {}).get("num_predict"))
+        if result is None:
+            self._send(500, {"error": "stub: injected failure"})
+            return
+        text, finish, input_tokens, output_tokens = result
+        self._send(200, {
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": text},
+            "done": True,
+            "done_reason": finish,
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "prompt_eval_count": input_tokens,
+            "eval_count": output_tokens,
+        })
+
+
+class _AnthropicHandler(_Handler):
+    def do_POST(self) -> None:
+        if self.path.split("?")[0] != "/v1/messages":
+            self._send(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+            return
+        body = self._body()
+        result = self.server.generate(body.get("messages", []), body.get("max_tokens"))
+        if result is None:
+            self._send(529, {"type": "error", "error": {"type": "overloaded_error", "message": "stub: injected failure"}})
+            return
+        text, finish, input_tokens, output_tokens = result
+        self._send(200, {
+            "id": f"msg_stub_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", ""),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn" if finish == "stop" else "max_tokens",
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        })
+
+
+def ollama_server(config: StubConfig | None = None, port: int = 0) -> _StubServer:
+    """An Ollama stand-in on 127.0.0.1 (port 0 picks a free port). Use as a context manager or call start()."""
+    return _StubServer(port, _OllamaHandler, config or StubConfig())
+
+
+def anthropic_server(config: StubConfig | None = None, port: int = 0) -> _StubServer:
+    """An Anthropic Messages API stand-in on 127.0.0.1; set ANTHROPIC_BASE_URL to its .url."""
+    return _StubServer(port, _AnthropicHandler, config or StubConfig())
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = StubConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="seconds before the first token")
+    parser.add_argument("--token-rate", type=float, default=defaults.token_rate, help="output tokens per second")
+    parser.add_argument("--parallel", type=int, default=defaults.parallel, help="concurrent requests per server")
+    parser.add_argument("--truncate", type=float, default=defaults.truncate_rate, help="share of replies cut short")
+    parser.add_argument("--errors", type=float, default=defaults.error_rate, help="share of requests failed")
+    parser.add_argument("--variety", type=int, default=defaults.variety, help="distinct drawings per subject")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency=args.latency, token_rate=args.token_rate, parallel=args.parallel,
+        truncate_rate=args.truncate, error_rate=args.errors, variety=args.variety, seed=args.seed,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ollama-port", type=int, default=11435)
+    parser.add_argument("--anthropic-port", type=int, default=11436)
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config = config_from_args(args)
+    with ollama_server(config, args.ollama_port) as ollama, anthropic_server(config, args.anthropic_port) as claude:
+        print(f"Ollama stub:    OLLAMA_URL={ollama.url}")
+        print(f"Anthropic stub: ANTHROPIC_BASE_URL={claude.url}")
+        print("Ctrl-C to stop")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""Microbenchmarks for the helpers hot paths, with a saved baseline and a pass/fail check.
+
+    python -m benchmarks.suite [--quick] [--only validate trace_image ...]
+                               [--save-baseline] [--baseline PATH] [--threshold 0.25]
+
+Inputs come from benchmarks.synthetic at several scales (10 / 1k / 100k compositions,
+0.3 / 3 / 12 MP images); --quick drops the largest scale of every case. Each case is
+repeated until it has run for --min-time seconds (at most --max-repeat times) and
+the best time is kept. Results are written as JSON to CACHE_DIR/benchmarks/latest.json;
+--save-baseline stores them as the baseline instead. When a baseline exists, every
+case is compared against it and the run fails (exit 1) if any case is slower than
+baseline × (1 + threshold). Baselines are per machine — compare like with like.
+
+No network or database is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+from helpers.cache import CACHE_DIR  # noqa: E402
+from helpers.models import (  # noqa: E402
+    AiComposition, Composition, ai_to_scored_composition, ai_to_scored_compositions, compositions_to_few_shot,
+)
+from helpers.ollama import _parse_response_json  # noqa: E402
+from helpers.trace import _douglas_peucker, svg_to_strokes, trace_image  # noqa: E402
+from helpers.validate import validate  # noqa: E402
+from helpers.visualize import draw_grid  # noqa: E402
+
+from . import synthetic  # noqa: E402
+
+RESULTS_DIR = CACHE_DIR / "benchmarks"
+DEFAULT_THRESHOLD = 0.25
+
+# Shortest timed sample; faster calls are looped to reach it
+MIN_SAMPLE = 0.02
+
+
+@dataclass
+class Case:
+    """One benchmark: setup(scale) builds the inputs untimed and returns the callable to time."""
+    name: str
+    scales: tuple
+    unit: str
+    setup: Callable[[object], Callable[[], object]]
+
+
+@dataclass
+class Result:
+    name: str
+    scale: float
+    unit: str
+    best: float
+    median: float
+    repeats: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}/{self.scale:g}"
+
+
+_compositions_cache: dict[int, list[Composition]] = {}
+
+
+def _compositions(n: int) -> list[Composition]:
+    if n not in _compositions_cache:
+        _compositions_cache[n] = synthetic.compositions(n, seed=n)
+    return _compositions_cache[n]
+
+
+def _validate(n):
+    comps = _compositions(n)
+    return lambda: [validate(c) for c in comps]
+
+
+def _from_dict(n):
+    dicts = [c.to_dict() for c in _compositions(n)]
+    return lambda: [Composition.from_dict(d) for d in dicts]
+
+
+def _to_dict(n):
+    comps = _compositions(n)
+    return lambda: [c.to_dict() for c in comps]
+
+
+def _few_shot(n):
+    comps = _compositions(n)
+    return lambda: compositions_to_few_shot("thing", comps)
+
+
+def _parse_response(n):
+    text = synthetic.model_response(n, seed=n)
+    return lambda: _parse_response_json(text)
+
+
+def _convert(batched):
+    def setup(n):
+        payload = synthetic.composition_dicts(n, seed=n, subject="thing")
+        if batched:
+            return lambda: ai_to_scored_compositions(payload)
+        ai_comps = [AiComposition.from_dict(d) for d in payload]
+        return lambda: [ai_to_scored_composition(c) for c in ai_comps]
+    return setup
+
+
+def _simplify(n):
+    points = synthetic.polyline(n, seed=n)
+    return lambda: _douglas_peucker(points, 0.005)
+
+
+def _svg_to_strokes(n):
+    svg = synthetic.svg(n, seed=n)
+    return lambda: svg_to_strokes(svg)
+
+
+def _trace(mp):
+    img = synthetic.line_drawing(*synthetic.IMAGE_SCALES_MP[mp], seed=1)
+    return lambda: trace_image(img)
+
+
+def _grid(fast):
+    def setup(n):
+        comps = _compositions(1_000)[:n]
+
+        def run():
+            fig = draw_grid(comps, cols=10, fast=fast)
+            fig.canvas.draw()
+            plt.close(fig)
+        return run
+    return setup
+
+
+CASES = [
+    Case("validate", synthetic.COMPOSITION_SCALES, "compositions", _validate),
+    Case("from_dict", synthetic.COMPOSITION_SCALES, "compositions", _from_dict),
+    Case("to_dict", synthetic.COMPOSITION_SCALES, "compositions", _to_dict),
+    Case("few_shot", (10, 100, 1_000), "compositions", _few_shot),
+    Case("parse_response", (10, 100, 1_000), "compositions", _parse_response),
+    Case("convert", (10, 100, 1_000), "compositions", _convert(batched=False)),
+    Case("convert_batched", (10, 100, 1_000), "compositions", _convert(batched=True)),
+    Case("douglas_peucker", (100, 1_000, 10_000), "points", _simplify),
+    Case("svg_to_strokes", (10, 100, 1_000), "paths", _svg_to_strokes),
+    Case("trace_image", tuple(synthetic.IMAGE_SCALES_MP), "MP", _trace),
+    Case("draw_grid", (10, 50), "compositions", _grid(fast=False)),
+    Case("draw_grid_fast", (10, 100, 1_000), "compositions", _grid(fast=True)),
+]
+
+
+def _time(fn: Callable[[], object], min_time: float, max_repeat: int) -> tuple[float, float, int]:
+    """(best, median, repeats) seconds per call: repeat fn until min_time has elapsed or max_repeat is hit.
+
+    Calls faster than MIN_SAMPLE are looped so each sample lasts about that long, as
+    timeit's autorange does; single calls of a few microseconds are mostly timer noise.
+    """
+    def sample(number: int) -> float:
+        # As timeit does: collect up front and keep the cyclic GC out of the timed region
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            return (time.perf_counter() - t0) / number
+        finally:
+            gc.enable()
+
+    first = sample(1)
+    number = max(1, math.ceil(MIN_SAMPLE / first)) if first > 0 else 1000
+    times = [first] if number == 1 else []
+    while len(times) < max_repeat and (not times or sum(times) * number < min_time):
+        times.append(sample(number))
+    return min(times), statistics.median(times), len(times)
+
+
+def run_suite(
+    only: list[str] | None = None,
+    quick: bool = False,
+    min_time: float = 0.5,
+    max_repeat: int = 7,
+    verbose: bool = True,
+) -> list[Result]:
+    results: list[Result] = []
+    for case in CASES:
+        if only and case.name not in only:
+            continue
+        scales = case.scales[:-1] if quick else case.scales
+        for scale in scales:
+            fn = case.setup(scale)
+            best, median, repeats = _time(fn, min_time, max_repeat)
+            result = Result(case.name, scale, case.unit, best, median, repeats)
+            results.append(result)
+            if verbose:
+                print(f"  {result.key:<28}{_fmt(best):>10}{_fmt(median):>10}  ×{repeats}")
+    return results
+
+
+def _fmt(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds * 1e6:.0f}µs"
+
+
+def _machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save_results(results: list[Result], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": _machine(),
+        "results": {r.key: asdict(r) for r in results},
+    }, indent=2))
+
+
+def compare(results: list[Result], baseline: dict, threshold: float) -> bool:
+    """Print current vs baseline per case; True if no case regressed beyond threshold."""
+    if baseline.get("machine") != _machine():
+        print(f"  note: baseline was recorded on {baseline.get('machine')}, not this machine")
+    saved = baseline.get("results", {})
+    ok = True
+    print(f"  {'case':<28}{'baseline':>10}{'now':>10}{'ratio':>8}")
+    for r in results:
+        if r.key not in saved:
+            print(f"  {r.key:<28}{'—':>10}{_fmt(r.best):>10}{'new':>8}")
+            continue
+        ratio = r.best / saved[r.key]["best"]
+        status = ""
+        if ratio > 1 + threshold:
+            status, ok = "  FAIL", False
+        elif ratio < 1 / (1 + threshold):
+            status = "  faster"
+        print(f"  {r.key:<28}{_fmt(saved[r.key]['best']):>10}{_fmt(r.best):>10}{ratio:>7.2f}×{status}")
+    return ok
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="*", choices=[c.name for c in CASES], help="run only these cases")
+    parser.add_argument("--quick", action="store_true", help="skip the largest scale of every case")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to keep repeating each case")
+    parser.add_argument("--max-repeat", type=int, default=7)
+    parser.add_argument("--baseline", type=Path, default=RESULTS_DIR / "baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown vs. baseline (0.25 = 25%%)")
+    parser.add_argument("--out", type=Path, default=RESULTS_DIR / "latest.json")
+    args = parser.parse_args(argv)
+
+    print(f"  {'case':<28}{'best':>10}{'median':>10}  runs")
+    results = run_suite(args.only, args.quick, args.min_time, args.max_repeat)
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    save_results(results, args.out)
+    print(f"Results saved to {args.out}")
+    if not args.baseline.exists():
+        print("No baseline to compare against (run with --save-baseline first)")
+        return 0
+
+    ok = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+    print("PASS" if ok else f"FAIL: slower than baseline by more than {args.threshold:.0%}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
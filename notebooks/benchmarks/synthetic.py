@@ -0,0 +1,170 @@
+"""Deterministic synthetic inputs for the benchmarks: compositions, model responses, SVGs and images.
+
+Everything is generated from a seed, so two runs (or two machines) time exactly the
+same work. Compositions look like model output — 4–12 strokes of 8–40 points drawn as
+wobbly arcs, zigzags and lines spanning most of the canvas — and images are line
+drawings over a photo-like background, so edge detection and tracing find real contours.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from helpers.models import Composition, DoodleFragment, Stroke
+
+COMPOSITION_SCALES = (10, 1_000, 100_000)
+
+IMAGE_SCALES_MP = {0.3: (640, 480), 3: (2000, 1500), 12: (4000, 3000)}
+
+# Compositions are generated this many at a time to bound the NumPy temporaries
+_CHUNK = 10_000
+
+_COORDINATES = np.array([round(v / 1000, 3) for v in range(1001)], dtype=object)
+
+
+def _strokes(rng: np.random.Generator, counts: np.ndarray) -> list[tuple[list[float], list[float]]]:
+    """Strokes for a whole batch at once: counts[i] is the point count of stroke i.
+
+    Each stroke is a wobbly arc (50%), zigzag (30%) or straight line (20%); all the
+    geometry is computed over one flat array so 100k compositions take seconds.
+    """
+    n = len(counts)
+    kind = rng.random(n)
+    cx, cy = rng.uniform(0.2, 0.8, n), rng.uniform(0.2, 0.8, n)
+    radius, a0, sweep = rng.uniform(0.1, 0.45, n), rng.uniform(0, 2 * np.pi, n), rng.uniform(1.0, 2 * np.pi, n)
+    x0, x1, amp = rng.uniform(0.05, 0.4, n), rng.uniform(0.6, 0.95, n), rng.uniform(0.02, 0.1, n)
+    angle, half = rng.uniform(0, np.pi, n), rng.uniform(0.2, 0.45, n)
+
+    stroke = np.repeat(np.arange(n), counts)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    i = np.arange(len(stroke)) - offsets[stroke]
+    t = i / (counts[stroke] - 1)
+    k = kind[stroke]
+
+    arc_x = cx[stroke] + radius[stroke] * np.cos(a0[stroke] + sweep[stroke] * t)
+    arc_y = cy[stroke] + radius[stroke] * np.sin(a0[stroke] + sweep[stroke] * t)
+    zig_x = x0[stroke] + (x1 - x0)[stroke] * t
+    zig_y = cy[stroke] + np.where(i % 4 < 2, amp[stroke], -amp[stroke])
+    line_x = cx[stroke] + half[stroke] * (2 * t - 1) * np.cos(angle[stroke])
+    line_y = cy[stroke] + half[stroke] * (2 * t - 1) * np.sin(angle[stroke])
+
+    x = np.where(k < 0.5, arc_x, np.where(k < 0.8, zig_x, line_x)) + rng.normal(0, 0.005, len(stroke))
+    y = np.where(k < 0.5, arc_y, np.where(k < 0.8, zig_y, line_y)) + rng.normal(0, 0.005, len(stroke))
+    # Coordinates are 3-decimal values, so every list shares the same 1001 float objects
+    xs = _COORDINATES[np.rint(np.clip(x, 0.0, 1.0) * 1000).astype(np.int64)].tolist()
+    ys = _COORDINATES[np.rint(np.clip(y, 0.0, 1.0) * 1000).astype(np.int64)].tolist()
+    return [(xs[lo:hi], ys[lo:hi]) for lo, hi in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def _stroke_layout(rng: np.random.Generator, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """(strokes per composition, points per stroke): 4–12 strokes of 8–40 points."""
+    per_comp = rng.integers(4, 13, n)
+    return per_comp, rng.integers(8, 41, int(per_comp.sum()))
+
+
+def compositions(n: int, seed: int = 0) -> list[Composition]:
+    """n model-like compositions (one fragment each)."""
+    rng = np.random.default_rng(seed)
+    out: list[Composition] = []
+    for start in range(0, n, _CHUNK):
+        per_comp, counts = _stroke_layout(rng, min(_CHUNK, n - start))
+        strokes = iter(_strokes(rng, counts))
+        out.extend(
+            Composition(
+                width=255, height=255,
+                doodle_fragments=[DoodleFragment(strokes=[
+                    Stroke(xs=xs, ys=ys, ts=[0.0]) for xs, ys in (next(strokes) for _ in range(k))
+                ])],
+                tags=["ai-generated", "benchmark", "thing"],
+            )
+            for k in per_comp.tolist()
+        )
+    return out
+
+
+def composition_dicts(n: int, seed: int = 0, subject: str = "thing") -> list[dict]:
+    """n compositions in the model's output format: {"subject", "strokes": [{"xs", "ys"}, ...]}."""
+    rng = np.random.default_rng(seed)
+    per_comp, counts = _stroke_layout(rng, n)
+    strokes = iter(_strokes(rng, counts))
+    return [
+        {"subject": subject, "strokes": [{"xs": xs, "ys": ys} for xs, ys in (next(strokes) for _ in range(k))]}
+        for k in per_comp.tolist()
+    ]
+
+
+def model_response(n: int, seed: int = 0, subject: str = "thing") -> str:
+    """An Ollama-style reply holding n compositions, in a ```json fence with a line of prose around it."""
+    comps = composition_dicts(n, seed, subject)
+    return f"Here are the drawings:\n```json\n{json.dumps({'compositions': comps})}\n```\nLet me know if you need more."
+
+
+def polyline(n: int, seed: int = 0) -> list[tuple[float, float]]:
+    """A noisy n-point curve in [0, 1]², like a densely sampled traced path."""
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 4 * np.pi, n)
+    x = 0.5 + 0.4 * np.cos(t) * (1 - t / (8 * np.pi)) + rng.normal(0, 0.002, n)
+    y = 0.5 + 0.4 * np.sin(1.5 * t) * (1 - t / (8 * np.pi)) + rng.normal(0, 0.002, n)
+    return list(zip(np.clip(x, 0, 1).tolist(), np.clip(y, 0, 1).tolist()))
+
+
+def svg(paths: int, seed: int = 0, size: int = 1000) -> str:
+    """An SVG of `paths` closed paths of mixed line and cubic Bézier segments, as vtracer emits."""
+    rng = random.Random(seed)
+    elements = []
+    for _ in range(paths):
+        x, y = rng.uniform(0, size), rng.uniform(0, size)
+        d = [f"M{x:.3f} {y:.3f}"]
+        for _ in range(rng.randint(3, 12)):
+            if rng.random() < 0.5:
+                x, y = x + rng.uniform(-60, 60), y + rng.uniform(-60, 60)
+                d.append(f"L{x:.3f} {y:.3f}")
+            else:
+                c = [v + rng.uniform(-60, 60) for v in (x, y, x, y, x, y)]
+                d.append("C" + " ".join(f"{v:.3f}" for v in c))
+                x, y = c[4], c[5]
+        elements.append(f'<path d="{" ".join(d)} Z" fill="#000000"/>')
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg version="1.1" xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}">\n'
+        + "\n".join(elements) + "\n</svg>"
+    )
+
+
+def photo_like(width: int, height: int, seed: int = 0) -> Image.Image:
+    """Smooth gradients plus mild noise — compresses and decodes like a real photo."""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, size=(height // 64 + 1, width // 64 + 1, 3), dtype=np.uint8)
+    img = Image.fromarray(small).resize((width, height), Image.BICUBIC)
+    arr = np.asarray(img, dtype=np.int16)
+    arr += rng.integers(-12, 12, size=arr.shape, dtype=np.int16)
+    return Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8))
+
+
+def line_drawing(width: int, height: int, seed: int = 0, shapes: int = 40) -> Image.Image:
+    """Dark outlines (ellipses, polygons, curves) over a low-contrast photo-like background."""
+    rng = random.Random(seed)
+    background = np.asarray(photo_like(width, height, seed), dtype=np.float32)
+    img = Image.fromarray((200 + background * 0.2).astype(np.uint8))
+    draw = ImageDraw.Draw(img)
+    scale = min(width, height)
+    stroke_width = max(2, scale // 300)
+    for _ in range(shapes):
+        cx, cy = rng.uniform(0, width), rng.uniform(0, height)
+        r = rng.uniform(0.03, 0.2) * scale
+        kind = rng.random()
+        if kind < 0.4:
+            draw.ellipse([cx - r, cy - r * rng.uniform(0.5, 1), cx + r, cy + r], outline=(20, 20, 20), width=stroke_width)
+        elif kind < 0.7:
+            k = rng.randint(3, 7)
+            pts = [(cx + r * math.cos(2 * math.pi * i / k), cy + r * math.sin(2 * math.pi * i / k)) for i in range(k)]
+            draw.polygon(pts, outline=(20, 20, 20), width=stroke_width)
+        else:
+            pts = [(cx + r * i / 10, cy + r * 0.3 * math.sin(i)) for i in range(11)]
+            draw.line(pts, fill=(20, 20, 20), width=stroke_width)
+    return img
@@ -1,9 +1,67 @@
+"""Notebook helpers for generating, tracing, scoring and storing compositions.
+
+The public names below resolve lazily: `import helpers` loads only models and
+validate, and each other submodule (with its third-party dependencies — matplotlib,
+OpenCV, vtracer, svgpathtools, anthropic, psycopg2, httpx) is imported the first time
+one of its names is used. `from helpers import draw_grid` works as before.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+# models and validate are light and loaded eagerly; the validate submodule must be
+# imported before the validate() function is bound, or a later submodule import
+# would replace helpers.validate with the module
 from .models import Composition, AiComposition, AiStroke, ai_to_composition, compositions_to_few_shot
-from .ollama import call_ollama, COMPOSITION_SCHEMA, OLLAMA_SYSTEM_PROMPT, FOCUSED_SYSTEM_PROMPT
-from .db import get_curated, get_curated_words, save_compositions, get_connection
 from .validate import validate, bounding_box, count_strokes, count_points
-from .visualize import draw, draw_grid, draw_comparison
-from .claude import call_claude, call_claude_with_few_shot, UsageTracker, CLAUDE_SYSTEM_PROMPT
-from .subjects import COMPOSABLE_SUBJECTS, SUBJECT_CATEGORIES
-from .images import load_image, download_image, search_images, show_image, show_image_grid, show_side_by_side
-from .trace import detect_edges, trace_to_svg, svg_to_strokes, trace_image, trace_with_params
+
+_LAZY = {
+    "ollama": ["call_ollama", "call_ollama_with_usage", "COMPOSITION_SCHEMA", "OLLAMA_SYSTEM_PROMPT", "FOCUSED_SYSTEM_PROMPT"],
+    "db": ["get_curated", "get_curated_words", "save_compositions", "get_connection", "set_backend"],
+    "visualize": ["draw", "draw_grid", "draw_comparison"],
+    "raster": ["render", "render_batch"],
+    "claude": ["call_claude", "call_claude_with_few_shot", "UsageTracker", "CLAUDE_SYSTEM_PROMPT"],
+    "subjects": ["COMPOSABLE_SUBJECTS", "SUBJECT_CATEGORIES"],
+    "images": ["load_image", "download_image", "search_images", "show_image", "show_image_grid", "show_side_by_side"],
+    "trace": ["detect_edges", "trace_to_svg", "svg_to_strokes", "trace_image", "trace_with_params"],
+}
+_ORIGIN = {name: module for module, names in _LAZY.items() for name in names}
+
+__all__ = [
+    "Composition", "AiComposition", "AiStroke", "ai_to_composition", "compositions_to_few_shot",
+    "validate", "bounding_box", "count_strokes", "count_points",
+    *_ORIGIN,
+]
+
+
+def __getattr__(name: str):
+    module = _ORIGIN.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(f".{module}", __name__), name)
+    else:
+        # Submodules not imported yet, e.g. helpers.db after a bare `import helpers`
+        try:
+            value = importlib.import_module(f".{name}", __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .ollama import call_ollama, call_ollama_with_usage, COMPOSITION_SCHEMA, OLLAMA_SYSTEM_PROMPT, FOCUSED_SYSTEM_PROMPT
+    from .db import get_curated, get_curated_words, save_compositions, get_connection, set_backend
+    from .visualize import draw, draw_grid, draw_comparison
+    from .raster import render, render_batch
+    from .claude import call_claude, call_claude_with_few_shot, UsageTracker, CLAUDE_SYSTEM_PROMPT
+    from .subjects import COMPOSABLE_SUBJECTS, SUBJECT_CATEGORIES
+    from .images import load_image, download_image, search_images, show_image, show_image_grid, show_side_by_side
+    from .trace import detect_edges, trace_to_svg, svg_to_strokes, trace_image, trace_with_params
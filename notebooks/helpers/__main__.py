@@ -0,0 +1,7 @@
+"""python -m helpers — headless job runner; see helpers.jobs."""
+
+import sys
+
+from .jobs import main
+
+sys.exit(main())
@@ -0,0 +1,94 @@
+"""Incremental stroke collection with the scoring summary kept up to date.
+
+validate() walks every stroke three times (counts, range check, bounding box). A
+StrokeBuilder folds each stroke into those aggregates as it is added, so the finished
+composition's score is an O(1) call to validate.score_summary():
+
+    builder = StrokeBuilder()
+    for s in ai_comp.strokes:
+        builder.add(s.xs, s.ys)            # clamped to [0, 1], rounded to 3 places
+    comp = builder.build(tags=["ai-generated", subject])
+    is_valid, score = builder.score()      # == validate(comp)
+
+Streaming parsers can add strokes as they arrive and give up early: with clamp=False,
+builder.in_range turns False at the first out-of-range coordinate, after which the
+composition can no longer be valid.
+"""
+
+from __future__ import annotations
+
+from .models import Composition, DoodleFragment, Stroke
+from .validate import score_summary
+
+
+class StrokeBuilder:
+    """Strokes for one composition plus running counts, bounding box and range check."""
+
+    __slots__ = ("precision", "clamp", "min_points", "strokes", "stroke_count", "point_count",
+                 "min_x", "min_y", "max_x", "max_y", "in_range")
+
+    def __init__(self, precision: int | None = 3, clamp: bool = True, min_points: int = 2):
+        self.precision = precision
+        self.clamp = clamp
+        self.min_points = min_points
+        self.strokes: list[Stroke] = []
+        self.stroke_count = 0
+        self.point_count = 0
+        self.min_x = self.min_y = float("inf")
+        self.max_x = self.max_y = float("-inf")
+        self.in_range = True
+
+    def add(self, xs: list[float], ys: list[float]) -> bool:
+        """Append one stroke, clamping and rounding its coordinates as configured.
+
+        Strokes with fewer than min_points points or mismatched xs/ys are skipped;
+        returns whether the stroke was kept.
+        """
+        if len(xs) < self.min_points or len(xs) != len(ys):
+            return False
+        if self.clamp:
+            xs = [max(0.0, min(1.0, x)) for x in xs]
+            ys = [max(0.0, min(1.0, y)) for y in ys]
+        if self.precision is not None:
+            p = self.precision
+            xs = [round(x, p) for x in xs]
+            ys = [round(y, p) for y in ys]
+        self._fold(xs, ys)
+        self.strokes.append(Stroke(xs=xs, ys=ys, ts=[0.0]))
+        return True
+
+    def add_stroke(self, stroke: Stroke) -> None:
+        """Append an existing Stroke as is (no clamping, rounding or length check)."""
+        self._fold(stroke.xs, stroke.ys)
+        self.strokes.append(stroke)
+
+    def _fold(self, xs: list[float], ys: list[float]) -> None:
+        self.stroke_count += 1
+        self.point_count += len(xs)
+        if xs:
+            lo, hi = min(xs), max(xs)
+            self.min_x, self.max_x = min(self.min_x, lo), max(self.max_x, hi)
+            self.in_range = self.in_range and lo >= 0.0 and hi <= 1.0
+        if ys:
+            lo, hi = min(ys), max(ys)
+            self.min_y, self.max_y = min(self.min_y, lo), max(self.max_y, hi)
+            self.in_range = self.in_range and lo >= 0.0 and hi <= 1.0
+
+    def bounding_box(self) -> tuple[float, float, float, float]:
+        """(min_x, min_y, max_x, max_y) so far, matching validate.bounding_box()."""
+        if self.min_x == float("inf"):
+            return (0.0, 0.0, 0.0, 0.0)
+        return (self.min_x, self.min_y, self.max_x, self.max_y)
+
+    def score(self) -> tuple[bool, float]:
+        """(is_valid, quality_score) of the strokes so far, identical to validate() on build()."""
+        return score_summary(self.stroke_count, self.point_count, *self.bounding_box(), self.in_range)
+
+    def build(self, tags: list[str], width: int = 255, height: int = 255) -> Composition:
+        """A Composition holding the strokes as one doodle fragment."""
+        return Composition(
+            width=width,
+            height=height,
+            doodle_fragments=[DoodleFragment(strokes=self.strokes)],
+            tags=tags,
+        )
@@ -0,0 +1,6 @@
+"""Local on-disk cache location shared by the helpers (features, images, indexes)."""
+
+import os
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("GROVETRACKS_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache"))
@@ -2,39 +2,14 @@
 
 from __future__ import annotations
 
-import json
 import os
 from dataclasses import dataclass
 
-import re
-
-import anthropic
-
+from . import metrics
+from .jsonparse import salvage_json
 from .models import AiComposition
 from .ollama import COMPOSITION_SCHEMA
 
-
-def _extract_json(text: str) -> dict:
-    """Extract JSON from response text, handling markdown fencing and extra text."""
-    # Try raw parse first
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-
-    # Strip markdown code fences
-    match = re.search(r"```(?:json)?\s*\n?(.*?)\n?\s*```", text, re.DOTALL)
-    if match:
-        return json.loads(match.group(1))
-
-    # Find first { to last } as a fallback
-    start = text.find("{")
-    end = text.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        return json.loads(text[start:end + 1])
-
-    raise json.JSONDecodeError("No valid JSON found in response", text, 0)
-
 DEFAULT_MODEL = os.environ.get("CLAUDE_MODEL", "claude-sonnet-4-5-20250929")
 
 CLAUDE_SYSTEM_PROMPT = (
@@ -109,20 +84,23 @@ def call_claude(
     tracker: UsageTracker | None = None,
 ) -> tuple[list[AiComposition], dict]:
     """Call Claude API with structured output. Returns (compositions, usage_info)."""
+    import anthropic
+
     client = anthropic.Anthropic()
 
-    response = client.messages.create(
-        model=model,
-        max_tokens=max_tokens,
-        system=system_prompt,
-        messages=[{"role": "user", "content": user_prompt}],
-        output_config={
-            "format": {
-                "type": "json_schema",
-                "schema": COMPOSITION_SCHEMA,
-            }
-        },
-    )
+    with metrics.span("claude.http"):
+        response = client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_prompt}],
+            output_config={
+                "format": {
+                    "type": "json_schema",
+                    "schema": COMPOSITION_SCHEMA,
+                }
+            },
+        )
 
     usage_info = {
         "input_tokens": response.usage.input_tokens,
@@ -134,8 +112,10 @@ def call_claude(
         tracker.record(response.usage.input_tokens, response.usage.output_tokens)
 
     content_text = response.content[0].text
-    data = _extract_json(content_text)
-    compositions = [AiComposition.from_dict(c) for c in data.get("compositions", [])]
+    with metrics.span("claude.parse"):
+        data, salvaged = salvage_json(content_text)
+        compositions = [AiComposition.from_dict(c) for c in data.get("compositions", [])]
+    usage_info["truncated"] = salvaged or response.stop_reason == "max_tokens"
 
     return compositions, usage_info
 
@@ -149,6 +129,8 @@ def call_claude_with_few_shot(
     tracker: UsageTracker | None = None,
 ) -> tuple[list[AiComposition], dict]:
     """Call Claude API with few-shot examples in conversation history."""
+    import anthropic
+
     client = anthropic.Anthropic()
 
     messages = []
@@ -157,18 +139,19 @@ def call_claude_with_few_shot(
         messages.append({"role": "assistant", "content": assistant_msg})
     messages.append({"role": "user", "content": user_prompt})
 
-    response = client.messages.create(
-        model=model,
-        max_tokens=max_tokens,
-        system=system_prompt,
-        messages=messages,
-        output_config={
-            "format": {
-                "type": "json_schema",
-                "schema": COMPOSITION_SCHEMA,
-            }
-        },
-    )
+    with metrics.span("claude.http"):
+        response = client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=messages,
+            output_config={
+                "format": {
+                    "type": "json_schema",
+                    "schema": COMPOSITION_SCHEMA,
+                }
+            },
+        )
 
     usage_info = {
         "input_tokens": response.usage.input_tokens,
@@ -180,14 +163,18 @@ def call_claude_with_few_shot(
         tracker.record(response.usage.input_tokens, response.usage.output_tokens)
 
     content_text = response.content[0].text
-    data = _extract_json(content_text)
-    compositions = [AiComposition.from_dict(c) for c in data.get("compositions", [])]
+    with metrics.span("claude.parse"):
+        data, salvaged = salvage_json(content_text)
+        compositions = [AiComposition.from_dict(c) for c in data.get("compositions", [])]
+    usage_info["truncated"] = salvaged or response.stop_reason == "max_tokens"
 
     return compositions, usage_info
 
 
 def check_connection(model: str = DEFAULT_MODEL) -> str:
     """Check Anthropic API connectivity and model access."""
+    import anthropic
+
     try:
         client = anthropic.Anthropic()
         response = client.messages.create(
@@ -0,0 +1,252 @@
+"""Columnar export of seed_compositions to Parquet / Arrow IPC, and memory-mapped reading.
+
+Metadata (id, word, quality_score, counts, source_type, generation_method, curated_at)
+are flat columns; stroke coordinates are nested list columns — xs, ys and ts are
+list<list<double>>, one inner list per stroke with its own offsets per column (so a
+stroke's xs and ys need not be the same length), and fragment_sizes records how many
+strokes belong to each doodle fragment so compositions round-trip exactly.
+
+Arrow IPC files (.arrow / .feather) are uncompressed and memory-mapped on read, so
+batches are zero-copy views of the file; Parquet (.parquet) is compressed and
+smaller but decoded on read. Needs pyarrow (optional; see requirements.txt).
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+
+from .models import Composition, DoodleFragment, Stroke
+
+EXPORT_BATCH = 5000
+
+_IPC_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Arrow/Parquet export needs pyarrow: pip install pyarrow") from e
+    return pa
+
+
+def schema():
+    pa = _pyarrow()
+    coords = pa.list_(pa.list_(pa.float64()))
+    return pa.schema([
+        ("id", pa.string()),
+        ("word", pa.string()),
+        ("source_type", pa.string()),
+        ("generation_method", pa.string()),
+        ("quality_score", pa.float64()),
+        ("stroke_count", pa.int32()),
+        ("total_point_count", pa.int32()),
+        ("curated_at", pa.timestamp("us", tz="UTC")),
+        ("width", pa.int32()),
+        ("height", pa.int32()),
+        ("tags", pa.list_(pa.string())),
+        ("fragment_sizes", pa.list_(pa.int32())),
+        ("xs", coords),
+        ("ys", coords),
+        ("ts", coords),
+    ])
+
+
+def _nested(values: list[float], point_offsets: list[int], stroke_offsets: list[int]):
+    """list<list<double>> from flat values plus per-stroke and per-composition offsets."""
+    pa = _pyarrow()
+    inner = pa.ListArray.from_arrays(pa.array(point_offsets, pa.int32()), pa.array(values, pa.float64()))
+    return pa.ListArray.from_arrays(pa.array(stroke_offsets, pa.int32()), inner)
+
+
+def _record_batch(rows: list[tuple]):
+    """Build one RecordBatch from (id, word, source_type, method, score, strokes, points, curated_at, json) rows."""
+    pa = _pyarrow()
+    xs: list[float] = []
+    ys: list[float] = []
+    ts: list[float] = []
+    x_offsets, y_offsets, t_offsets, stroke_offsets = [0], [0], [0], [0]
+    widths, heights, tags, fragment_sizes = [], [], [], []
+
+    for *_, data in rows:
+        if isinstance(data, str):
+            data = json.loads(data)
+        widths.append(data.get("width", 255))
+        heights.append(data.get("height", 255))
+        tags.append(data.get("tags", []))
+        sizes = []
+        for frag in data.get("doodleFragments", []):
+            strokes = frag.get("strokes", [])
+            sizes.append(len(strokes))
+            for stroke in strokes:
+                coords = stroke.get("data", [[], [], [0]])
+                sx = coords[0] if len(coords) > 0 else []
+                sy = coords[1] if len(coords) > 1 else []
+                st = coords[2] if len(coords) > 2 else [0.0]
+                # Each axis has its own offsets, so strokes with uneven xs / ys round-trip as stored
+                xs.extend(sx)
+                ys.extend(sy)
+                ts.extend(st)
+                x_offsets.append(len(xs))
+                y_offsets.append(len(ys))
+                t_offsets.append(len(ts))
+        fragment_sizes.append(sizes)
+        stroke_offsets.append(len(x_offsets) - 1)
+
+    s = schema()
+    columns = [
+        pa.array([str(r[0]) for r in rows], pa.string()),
+        pa.array([r[1] for r in rows], pa.string()),
+        pa.array([r[2] for r in rows], pa.string()),
+        pa.array([r[3] for r in rows], pa.string()),
+        pa.array([r[4] for r in rows], pa.float64()),
+        pa.array([r[5] for r in rows], pa.int32()),
+        pa.array([r[6] for r in rows], pa.int32()),
+        pa.array([r[7] for r in rows], s.field("curated_at").type),
+        pa.array(widths, pa.int32()),
+        pa.array(heights, pa.int32()),
+        pa.array(tags, pa.list_(pa.string())),
+        pa.array(fragment_sizes, pa.list_(pa.int32())),
+        _nested(xs, x_offsets, stroke_offsets),
+        _nested(ys, y_offsets, stroke_offsets),
+        _nested(ts, t_offsets, stroke_offsets),
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=s)
+
+
+def _writer(path: Path):
+    pa = _pyarrow()
+    if path.suffix in _IPC_SUFFIXES:
+        return pa.ipc.new_file(str(path), schema())
+    import pyarrow.parquet as pq
+    return pq.ParquetWriter(str(path), schema(), compression="zstd")
+
+
+def export_compositions(
+    path: str | Path,
+    word: str | None = None,
+    source_type: str | None = None,
+    batch_size: int = EXPORT_BATCH,
+    verbose: bool = True,
+    on_batch: Callable[[int], None] | None = None,
+) -> int:
+    """Stream seed_compositions (optionally one word / source_type) into a Parquet or Arrow file.
+
+    The format follows the suffix: .parquet, or .arrow / .feather / .ipc for Arrow IPC.
+    Rows are read with a server-side cursor and written batch by batch, so memory use
+    stays flat. on_batch, if given, is called with the running row count after each
+    batch. Returns the number of rows written.
+    """
+    from .db import get_connection
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with get_connection() as conn, conn.cursor(name="export_compositions") as cur:
+        cur.itersize = batch_size
+        cur.execute(
+            """
+            SELECT id, word, source_type, generation_method, quality_score,
+                   stroke_count, total_point_count, curated_at, composition_json
+            FROM seed_compositions
+            WHERE (%(word)s::text IS NULL OR word = %(word)s)
+              AND (%(source_type)s::text IS NULL OR source_type = %(source_type)s)
+            ORDER BY word, curated_at
+            """,
+            {"word": word, "source_type": source_type},
+        )
+        with _writer(path) as writer:
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                writer.write_batch(_record_batch(rows))
+                written += len(rows)
+                if on_batch is not None:
+                    on_batch(written)
+                if verbose:
+                    print(f"  exported {written:,} rows")
+    return written
+
+
+class CompositionDataset:
+    """Read-side handle for an exported file. Arrow IPC files are memory-mapped (zero-copy)."""
+
+    def __init__(self, path: str | Path):
+        pa = _pyarrow()
+        self.path = Path(path)
+        if self.path.suffix in _IPC_SUFFIXES:
+            self._source = pa.memory_map(str(self.path), "r")
+            self._ipc = pa.ipc.open_file(self._source)
+            self._parquet = None
+        else:
+            import pyarrow.parquet as pq
+            self._ipc = None
+            self._parquet = pq.ParquetFile(str(self.path), memory_map=True)
+
+    @property
+    def num_rows(self) -> int:
+        if self._ipc is not None:
+            return sum(self._ipc.get_batch(i).num_rows for i in range(self._ipc.num_record_batches))
+        return self._parquet.metadata.num_rows
+
+    def batches(self, columns: list[str] | None = None) -> Iterator:
+        """Yield RecordBatches, optionally only some columns (views into the map for IPC)."""
+        if self._parquet is not None:
+            yield from self._parquet.iter_batches(columns=columns)
+            return
+        for i in range(self._ipc.num_record_batches):
+            batch = self._ipc.get_batch(i)
+            yield batch.select(columns) if columns else batch
+
+    def table(self, columns: list[str] | None = None):
+        """The whole file as one pyarrow Table (still zero-copy for IPC)."""
+        if self._parquet is not None:
+            return self._parquet.read(columns=columns)
+        table = self._ipc.read_all()
+        return table.select(columns) if columns else table
+
+
+def open_dataset(path: str | Path) -> CompositionDataset:
+    return CompositionDataset(path)
+
+
+def coordinates(batch, axis: str = "xs") -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flat coordinate values plus stroke and composition offsets for one batch, as NumPy views.
+
+    values[point_offsets[s]:point_offsets[s + 1]] is stroke s, and strokes
+    stroke_offsets[c]:stroke_offsets[c + 1] belong to composition c. Point offsets are
+    per axis. No copies are made for batches read from Arrow IPC files.
+    """
+    outer = batch.column(axis)
+    inner = outer.values
+    return (
+        inner.values.to_numpy(zero_copy_only=True),
+        inner.offsets.to_numpy(zero_copy_only=True),
+        outer.offsets.to_numpy(zero_copy_only=True),
+    )
+
+
+def to_compositions(batch) -> list[Composition]:
+    """Rebuild Composition objects from a batch (the inverse of export)."""
+    xs = batch.column("xs").to_pylist()
+    ys = batch.column("ys").to_pylist()
+    ts = batch.column("ts").to_pylist()
+    sizes = batch.column("fragment_sizes").to_pylist()
+    widths = batch.column("width").to_pylist()
+    heights = batch.column("height").to_pylist()
+    tags = batch.column("tags").to_pylist()
+
+    comps = []
+    for i in range(batch.num_rows):
+        strokes = [Stroke(xs=sx, ys=sy, ts=st) for sx, sy, st in zip(xs[i], ys[i], ts[i])]
+        fragments, start = [], 0
+        for n in sizes[i]:
+            fragments.append(DoodleFragment(strokes=strokes[start:start + n]))
+            start += n
+        comps.append(Composition(width=widths[i], height=heights[i], doodle_fragments=fragments, tags=tags[i]))
+    return comps
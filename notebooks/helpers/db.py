@@ -1,14 +1,28 @@
-"""PostgreSQL database access for seed compositions."""
+"""PostgreSQL database access for seed compositions.
+
+With the backend set to "sqlite" (set_backend() or GROVETRACKS_DB_BACKEND=sqlite),
+get_curated, get_curated_words, get_curated_stats and save_compositions use the local
+mirror kept by helpers.mirror instead, and saved rows wait there for upload_pending().
+"""
 
 import os
+import hashlib
 import json
+import time
 import uuid
 from datetime import datetime, timezone
 from contextlib import contextmanager
+from . import metrics
 from .models import Composition
 
-import psycopg2
-import psycopg2.extras
+
+BACKENDS = ("postgres", "sqlite")
+BACKEND = os.environ.get("GROVETRACKS_DB_BACKEND", "postgres")
+
+# get_all_stats() results are reused for up to this long if the table looks unchanged
+STATS_MAX_AGE = 300.0
+
+_stats_cache: dict[tuple, tuple[float, tuple, dict]] = {}
 
 
 def _conn_params() -> dict:
@@ -21,9 +35,23 @@ def _conn_params() -> dict:
     }
 
 
+def set_backend(name: str) -> None:
+    """Switch the curated-data helpers between "postgres" and the "sqlite" mirror."""
+    global BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend {name!r} (expected one of {', '.join(BACKENDS)})")
+    BACKEND = name
+
+
+def using_mirror() -> bool:
+    return BACKEND == "sqlite"
+
+
 @contextmanager
 def get_connection():
     """Context manager for database connections."""
+    import psycopg2
+
     conn = psycopg2.connect(**_conn_params())
     try:
         yield conn
@@ -31,10 +59,16 @@ def get_connection():
         conn.close()
 
 
+@metrics.timed("db.query")
 def get_curated(word: str, limit: int = 50) -> list[Composition]:
     """Load curated compositions for a word, ordered by quality score descending."""
+    if using_mirror():
+        from . import mirror
+        return mirror.get_curated(word, limit)
+    from psycopg2.extras import DictCursor
+
     with get_connection() as conn:
-        with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+        with conn.cursor(cursor_factory=DictCursor) as cur:
             cur.execute(
                 """
                 SELECT composition_json, quality_score, stroke_count, total_point_count
@@ -56,8 +90,12 @@ def get_curated(word: str, limit: int = 50) -> list[Composition]:
     return results
 
 
+@metrics.timed("db.query")
 def get_curated_words() -> list[str]:
     """Get all words that have curated compositions."""
+    if using_mirror():
+        from . import mirror
+        return mirror.get_curated_words()
     with get_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(
@@ -70,10 +108,16 @@ def get_curated_words() -> list[str]:
             return [row[0] for row in cur.fetchall()]
 
 
+@metrics.timed("db.query")
 def get_curated_stats(word: str) -> dict:
     """Get statistics for curated compositions of a word."""
+    if using_mirror():
+        from . import mirror
+        return mirror.get_curated_stats(word)
+    from psycopg2.extras import DictCursor
+
     with get_connection() as conn:
-        with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+        with conn.cursor(cursor_factory=DictCursor) as cur:
             cur.execute(
                 """
                 SELECT COUNT(*) as total,
@@ -91,47 +135,202 @@ def get_curated_stats(word: str) -> dict:
             return dict(row) if row else {}
 
 
+def _table_version(cur) -> tuple:
+    """Cheap change marker for seed_compositions, read from pg_stat without scanning the table."""
+    # Other backends flush these counters about once a second, so a change can go
+    # unseen briefly; get_all_stats()' max_age bounds how long
+    cur.execute(
+        """
+        SELECT (SELECT n_tup_ins + n_tup_upd + n_tup_del FROM pg_stat_user_tables
+                WHERE relname = 'seed_compositions')
+        """
+    )
+    return tuple(cur.fetchone())
+
+
+@metrics.timed("db.query")
+def get_all_stats(bins: int = 20, source_type: str | None = None, max_age: float = STATS_MAX_AGE) -> dict:
+    """Columnar quality/stroke/point statistics and quality histograms per (word, source_type, generation_method)."""
+    import numpy as np
+
+    key = (bins, source_type)
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            version = _table_version(cur)
+            # Reused per (bins, source_type) until max_age passes or the table changes
+            cached = _stats_cache.get(key)
+            if cached and cached[1] == version and time.monotonic() - cached[0] < max_age:
+                return cached[2]
+
+            # Count rows per quality-score bucket, then fold the buckets into per-group
+            # aggregates and the histogram
+            cur.execute(
+                """
+                SELECT word, source_type, generation_method,
+                       SUM(n) AS total,
+                       SUM(sum_quality) / SUM(n) AS avg_quality,
+                       MIN(min_quality) AS min_quality,
+                       MAX(max_quality) AS max_quality,
+                       SUM(sum_strokes) / SUM(n) AS avg_strokes,
+                       SUM(sum_points) / SUM(n) AS avg_points,
+                       array_agg(bucket) AS buckets,
+                       array_agg(n) AS bucket_counts
+                FROM (
+                    SELECT word, source_type, generation_method,
+                           LEAST(GREATEST(width_bucket(COALESCE(quality_score, 0), 0.0, 1.0, %(bins)s), 1), %(bins)s) AS bucket,
+                           COUNT(*) AS n,
+                           SUM(quality_score) AS sum_quality,
+                           MIN(quality_score) AS min_quality,
+                           MAX(quality_score) AS max_quality,
+                           SUM(stroke_count) AS sum_strokes,
+                           SUM(total_point_count) AS sum_points
+                    FROM seed_compositions
+                    WHERE %(source_type)s::text IS NULL OR source_type = %(source_type)s
+                    GROUP BY 1, 2, 3, 4
+                ) buckets
+                GROUP BY 1, 2, 3
+                ORDER BY 1, 2, 3
+                """,
+                {"bins": bins, "source_type": source_type},
+            )
+            rows = cur.fetchall()
+
+    histogram = np.zeros((len(rows), bins), dtype=np.int64)
+    for i, row in enumerate(rows):
+        histogram[i, np.asarray(row[9]) - 1] = row[10]
+
+    def column(j: int, dtype) -> np.ndarray:
+        return np.array([np.nan if r[j] is None else float(r[j]) for r in rows], dtype=dtype)
+
+    stats = {
+        "word": [r[0] for r in rows],
+        "source_type": [r[1] for r in rows],
+        "generation_method": [r[2] for r in rows],
+        "total": np.array([r[3] for r in rows], dtype=np.int64),
+        "avg_quality": column(4, np.float64),
+        "min_quality": column(5, np.float64),
+        "max_quality": column(6, np.float64),
+        "avg_strokes": column(7, np.float64),
+        "avg_points": column(8, np.float64),
+        "histogram": histogram,
+        "bin_edges": np.linspace(0.0, 1.0, bins + 1),
+    }
+    _stats_cache[key] = (time.monotonic(), version, stats)
+    return stats
+
+
+def invalidate_stats() -> None:
+    """Drop cached get_all_stats() results (e.g. after a bulk rescore)."""
+    _stats_cache.clear()
+
+
+def seed_id_checksum(cur) -> tuple[int, int]:
+    """(row count, sum of id hashes) of seed_compositions; see id_checksum()."""
+    cur.execute(
+        """
+        SELECT COUNT(*), COALESCE(SUM(('x' || substr(md5(id::text), 1, 15))::bit(60)::bigint), 0)
+        FROM seed_compositions
+        """
+    )
+    count, total = cur.fetchone()
+    return int(count), int(total)
+
+
+def id_checksum(ids) -> tuple[int, int]:
+    """seed_id_checksum() computed over ids held locally, to tell whether they match the table."""
+    ids = list(ids)
+    return len(ids), sum(int(hashlib.md5(i.encode()).hexdigest()[:15], 16) for i in ids)
+
+
 def save_compositions(
     word: str,
     compositions: list[Composition],
     generation_method: str = "notebook-ollama",
     quality_scores: list[float] | None = None,
+    dedupe: bool = False,
+    resample_spacing: float | None = None,
 ) -> int:
-    """Save validated compositions to seed_compositions table. Returns count saved."""
+    """Save validated compositions to seed_compositions table. Returns count saved.
+
+    With dedupe=True, compositions that are near-duplicates of a stored row for the
+    word (or of an earlier one in the batch) are skipped and reported. With
+    resample_spacing, strokes are evened out along their arc length before
+    validation (see helpers.resample), which drops redundant points. With the sqlite
+    backend the rows are written to the local mirror and queued for
+    mirror.upload_pending().
+    """
     from .validate import validate, count_strokes, count_points
 
-    saved = 0
+    if resample_spacing is not None:
+        from .resample import resample_compositions
+        compositions = resample_compositions(compositions, spacing=resample_spacing)
+
+    ids = [str(uuid.uuid4()) for _ in compositions]
+    duplicates: set[int] = set()
+    if dedupe:
+        from .dedup import filter_duplicates
+
+        valid = [i for i, comp in enumerate(compositions) if validate(comp)[0]]
+        # Stored rows join the shared index only after the write succeeds (see below)
+        _, rejected = filter_duplicates(word, [compositions[i] for i in valid], refs=[ids[i] for i in valid],
+                                        add=False)
+        for j, match in rejected:
+            duplicates.add(valid[j])
+            print(f"  Skipped #{valid[j]}: near-duplicate of {match.ref} (similarity {match.similarity:.2f})")
+
+    rows = []
+    stored: list[Composition] = []
+    for i, comp in enumerate(compositions):
+        if i in duplicates:
+            continue
+        is_valid, score = validate(comp)
+        if not is_valid:
+            continue
+
+        if quality_scores and i < len(quality_scores):
+            score = quality_scores[i]
+
+        rows.append((
+            ids[i],
+            word,
+            "ai-generated",
+            score,
+            count_strokes(comp),
+            count_points(comp),
+            json.dumps(comp.to_dict()),
+            datetime.now(timezone.utc),
+            "ai-generated",
+            generation_method,
+        ))
+        stored.append(comp)
+
+    if using_mirror():
+        from . import mirror
+        saved = mirror.queue_rows(rows)
+    else:
+        saved = _insert_rows(rows)
+    if dedupe:
+        from .dedup import remember
+        remember(word, stored, [row[0] for row in rows])
+    return saved
+
+
+def _insert_rows(rows: list[tuple]) -> int:
+    """INSERT save_compositions() rows into Postgres in one transaction."""
     with get_connection() as conn:
         with conn.cursor() as cur:
-            for i, comp in enumerate(compositions):
-                is_valid, score = validate(comp)
-                if not is_valid:
-                    continue
-
-                if quality_scores and i < len(quality_scores):
-                    score = quality_scores[i]
-
-                comp_json = json.dumps(comp.to_dict())
-                cur.execute(
-                    """
-                    INSERT INTO seed_compositions
-                    (id, word, source_key_id, quality_score, stroke_count, total_point_count,
-                     composition_json, curated_at, source_type, generation_method)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        str(uuid.uuid4()),
-                        word,
-                        "ai-generated",
-                        score,
-                        count_strokes(comp),
-                        count_points(comp),
-                        comp_json,
-                        datetime.now(timezone.utc),
-                        "ai-generated",
-                        generation_method,
-                    ),
-                )
-                saved += 1
-        conn.commit()
-    return saved
+            for row in rows:
+                with metrics.span("db.insert"):
+                    cur.execute(
+                        """
+                        INSERT INTO seed_compositions
+                        (id, word, source_key_id, quality_score, stroke_count, total_point_count,
+                         composition_json, curated_at, source_type, generation_method)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        """,
+                        row,
+                    )
+        with metrics.span("db.commit"):
+            conn.commit()
+    metrics.incr("db.rows_inserted", len(rows))
+    return len(rows)
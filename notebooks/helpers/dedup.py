@@ -0,0 +1,181 @@
+"""Near-duplicate detection for compositions via raster SimHash fingerprints and banded LSH.
+
+A fingerprint is FINGERPRINT_BITS random-hyperplane bits of a small blurred raster, so
+its Hamming distance tracks the angle between two drawings' ink layouts: jitter,
+re-rounded coordinates and reordered strokes barely move it, different drawings
+land far apart. The index splits fingerprints into BANDS exact-match buckets; any
+pair within BANDS - 1 bits shares at least one bucket, so lookups with the default
+threshold never miss a match and only compare a handful of candidates.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from .models import Composition
+from .raster import render
+
+FINGERPRINT_BITS = 128
+BANDS = 8
+BAND_BYTES = FINGERPRINT_BITS // 8 // BANDS
+
+# Largest Hamming distance still treated as a duplicate; < BANDS keeps LSH recall exact
+DEFAULT_MAX_DISTANCE = BANDS - 1
+
+_RASTER_SIZE = 32
+_GRID = 16
+
+# Fixed projection so fingerprints are comparable across processes and runs
+_PLANES = np.random.default_rng(0x6E0D).standard_normal((_GRID * _GRID, FINGERPRINT_BITS)).astype(np.float32)
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def fingerprint(comp: Composition) -> np.ndarray:
+    """FINGERPRINT_BITS-bit fingerprint of a composition as a uint8 array."""
+    ink = 255 - render(comp, size=_RASTER_SIZE, linewidth=1.0).astype(np.float32)
+    grid = cv2.resize(ink, (_GRID, _GRID), interpolation=cv2.INTER_AREA)
+    grid = cv2.GaussianBlur(grid, (3, 3), 0).ravel()
+    grid -= grid.mean()
+    return np.packbits(grid @ _PLANES > 0)
+
+
+def hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Bitwise Hamming distance between packed fingerprints (broadcasts over rows)."""
+    return _POPCOUNT[np.bitwise_xor(a, b)].sum(axis=-1, dtype=np.int32)
+
+
+@dataclass
+class DuplicateMatch:
+    """The closest indexed composition to a candidate."""
+    ref: str
+    distance: int
+
+    @property
+    def similarity(self) -> float:
+        return 1.0 - self.distance / FINGERPRINT_BITS
+
+
+class DuplicateIndex:
+    """Fingerprints for one word, bucketed by band for constant-time candidate lookup."""
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.refs: list[str] = []
+        self._prints = np.zeros((64, FINGERPRINT_BITS // 8), dtype=np.uint8)
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    def add(self, comp: Composition, ref: str, fp: np.ndarray | None = None) -> None:
+        fp = fingerprint(comp) if fp is None else fp
+        row = len(self.refs)
+        if row == len(self._prints):
+            self._prints = np.concatenate([self._prints, np.zeros_like(self._prints)])
+        self._prints[row] = fp
+        self.refs.append(ref)
+        raw = fp.tobytes()
+        for band, buckets in enumerate(self._buckets):
+            buckets.setdefault(raw[band * BAND_BYTES:(band + 1) * BAND_BYTES], []).append(row)
+
+    def nearest(self, comp: Composition, fp: np.ndarray | None = None) -> DuplicateMatch | None:
+        """Closest indexed composition within max_distance, or None."""
+        fp = fingerprint(comp) if fp is None else fp
+        raw = fp.tobytes()
+        candidates: set[int] = set()
+        for band, buckets in enumerate(self._buckets):
+            candidates.update(buckets.get(raw[band * BAND_BYTES:(band + 1) * BAND_BYTES], ()))
+        if not candidates:
+            return None
+
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        distances = hamming(self._prints[rows], fp)
+        best = int(distances.argmin())
+        if distances[best] > self.max_distance:
+            return None
+        return DuplicateMatch(ref=self.refs[rows[best]], distance=int(distances[best]))
+
+
+def load_index(word: str, max_distance: int = DEFAULT_MAX_DISTANCE) -> DuplicateIndex:
+    """Build an index over every stored composition for a word, keyed by row id."""
+    from .db import get_connection, using_mirror
+
+    index = DuplicateIndex(max_distance)
+    if using_mirror():
+        from .mirror import word_compositions
+        for row_id, data in word_compositions(word):
+            index.add(Composition.from_dict(json.loads(data)), row_id)
+        return index
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT id, composition_json FROM seed_compositions WHERE word = %s",
+                (word,),
+            )
+            for row_id, data in cur:
+                if isinstance(data, str):
+                    data = json.loads(data)
+                index.add(Composition.from_dict(data), str(row_id))
+    return index
+
+
+_indexes: dict[tuple[str, str], DuplicateIndex] = {}
+
+
+def _index_key(word: str) -> tuple[str, str]:
+    # Per backend too, so set_backend() never dedupes against the other store's rows
+    from . import db
+
+    return db.BACKEND, word
+
+
+def get_index(word: str) -> DuplicateIndex:
+    """Process-wide index for a word in the current backend, loaded on first use."""
+    key = _index_key(word)
+    if key not in _indexes:
+        _indexes[key] = load_index(word)
+    return _indexes[key]
+
+
+def filter_duplicates(
+    word: str,
+    compositions: list[Composition],
+    refs: list[str] | None = None,
+    index: DuplicateIndex | None = None,
+    add: bool = True,
+) -> tuple[list[int], list[tuple[int, DuplicateMatch]]]:
+    """Split a batch into kept and rejected positions.
+
+    Each kept composition is added to the index (under refs[i], default "batch:<i>"),
+    so repeats within the same batch are caught too and later batches see it.
+    With add=False the index is left untouched (repeats within the batch are still
+    caught); call remember() once the kept rows are actually stored.
+    Returns (kept indices, [(index, nearest match)]).
+    """
+    index = get_index(word) if index is None else index
+    batch = index if add else DuplicateIndex(index.max_distance)
+    refs = refs if refs is not None else [f"batch:{i}" for i in range(len(compositions))]
+    kept: list[int] = []
+    rejected: list[tuple[int, DuplicateMatch]] = []
+    for i, comp in enumerate(compositions):
+        fp = fingerprint(comp)
+        match = index.nearest(comp, fp) or (None if add else batch.nearest(comp, fp))
+        if match is not None:
+            rejected.append((i, match))
+        else:
+            batch.add(comp, refs[i], fp)
+            kept.append(i)
+    return kept, rejected
+
+
+def remember(word: str, compositions: list[Composition], refs: list[str]) -> None:
+    """Add stored compositions to the word's process-wide index (if it is loaded)."""
+    index = _indexes.get(_index_key(word))
+    if index is not None:
+        for comp, ref in zip(compositions, refs):
+            index.add(comp, ref)
@@ -0,0 +1,133 @@
+"""Running visual diversity per subject, to stop generating once new drawings repeat old ones.
+
+Each valid composition is fingerprinted (dedup.fingerprint, a raster SimHash) and its
+novelty is the Hamming distance to the nearest composition already seen for the
+subject, as a share of FINGERPRINT_BITS: about 0.2 between unrelated drawings, under
+0.06 for a jittered copy. A call's novelty is the mean over its valid compositions;
+after `patience` calls in a row below min_novelty the subject counts as saturated
+and further calls can be skipped; skip() records how many actually were.
+
+    tracker = DiversityTracker("cat", planned_calls=10)
+    for i in range(10):
+        if tracker.saturated:
+            tracker.skip(10 - i)
+            break
+        ...generate...
+        tracker.observe([c for c in comps if validate(c)[0]])
+    print(tracker.summary())   # cat: saturated after 4/10 calls, 6 skipped, novelty 0.21 → 0.05
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from .dedup import FINGERPRINT_BITS, fingerprint, hamming
+from .models import Composition
+
+DEFAULT_MIN_NOVELTY = 0.08
+DEFAULT_PATIENCE = 2
+DEFAULT_MIN_CALLS = 2
+
+
+@dataclass
+class CallNovelty:
+    """Novelty of each valid composition from one call, in the order observed."""
+    call: int
+    novelty: list[float]
+
+    @property
+    def mean(self) -> float:
+        return sum(self.novelty) / len(self.novelty) if self.novelty else 0.0
+
+
+class DiversityTracker:
+    """Fingerprints seen so far for one subject and the novelty each call added."""
+
+    def __init__(
+        self,
+        subject: str,
+        planned_calls: int | None = None,
+        min_novelty: float = DEFAULT_MIN_NOVELTY,
+        patience: int = DEFAULT_PATIENCE,
+        min_calls: int = DEFAULT_MIN_CALLS,
+    ):
+        self.subject = subject
+        self.planned_calls = planned_calls
+        self.min_novelty = min_novelty
+        self.patience = patience
+        self.min_calls = min_calls
+        self.calls: list[CallNovelty] = []
+        self.stale = 0  # consecutive calls below min_novelty
+        self.skipped = 0
+        self._prints = np.zeros((64, FINGERPRINT_BITS // 8), dtype=np.uint8)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _append(self, prints: np.ndarray) -> None:
+        needed = self._count + len(prints)
+        if needed > len(self._prints):
+            grown = np.zeros((max(needed, 2 * len(self._prints)), self._prints.shape[1]), dtype=np.uint8)
+            grown[:self._count] = self._prints[:self._count]
+            self._prints = grown
+        self._prints[self._count:needed] = prints
+        self._count = needed
+
+    def seed(self, comps: list[Composition]) -> None:
+        """Count existing compositions (e.g. the curated set) as already seen, without a call."""
+        if comps:
+            with self._lock:
+                self._append(np.array([fingerprint(c) for c in comps]))
+
+    def observe(self, comps: list[Composition]) -> CallNovelty:
+        """Record one call's valid compositions; returns their novelty.
+
+        Each is compared with everything seen before it, including earlier ones from
+        the same call. A call with no valid compositions leaves the stale streak as is.
+        """
+        prints = np.array([fingerprint(c) for c in comps]).reshape(len(comps), FINGERPRINT_BITS // 8)
+        with self._lock:
+            novelty = []
+            for i, fp in enumerate(prints):
+                seen = self._prints[:self._count]
+                earlier = prints[:i]
+                nearest = min(
+                    int(hamming(seen, fp).min()) if len(seen) else FINGERPRINT_BITS,
+                    int(hamming(earlier, fp).min()) if len(earlier) else FINGERPRINT_BITS,
+                )
+                novelty.append(nearest / FINGERPRINT_BITS)
+            self._append(prints)
+            result = CallNovelty(call=len(self.calls), novelty=novelty)
+            self.calls.append(result)
+            if novelty:
+                self.stale = self.stale + 1 if result.mean < self.min_novelty else 0
+        return result
+
+    @property
+    def saturated(self) -> bool:
+        """True once the last `patience` calls with output all fell below min_novelty."""
+        return len(self.calls) >= self.min_calls and self.stale >= self.patience
+
+    def skip(self, calls: int = 1) -> None:
+        """Record planned calls that were not made because the subject is saturated."""
+        with self._lock:
+            self.skipped += calls
+
+    @property
+    def calls_saved(self) -> int:
+        """Calls actually skipped (as recorded with skip())."""
+        return self.skipped
+
+    def summary(self) -> str:
+        means = [c.mean for c in self.calls if c.novelty]
+        trend = f", novelty {means[0]:.2f} → {means[-1]:.2f}" if means else ""
+        planned = f"/{self.planned_calls}" if self.planned_calls is not None else ""
+        if self.saturated:
+            skipped = f", {self.skipped} skipped" if self.skipped else ""
+            return f"{self.subject}: saturated after {len(self.calls)}{planned} calls{skipped}{trend}"
+        return f"{self.subject}: {len(self.calls)}{planned} calls, still novel{trend}"
@@ -0,0 +1,175 @@
+"""Per-composition shape features and token-cost estimates, cached on disk per word."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .cache import CACHE_DIR
+from .models import Composition, compositions_to_few_shot
+from .validate import validate
+
+GRID_SIZE = 6
+DIRECTION_BINS = 8
+FEATURE_DIM = GRID_SIZE * GRID_SIZE + DIRECTION_BINS + 6
+
+# Few-shot JSON is mostly short decimals and punctuation, which tokenizes densely
+CHARS_PER_TOKEN = 3.2
+
+
+def composition_key(comp: Composition) -> str:
+    """Stable content hash of a composition, used as the feature cache key."""
+    payload = json.dumps(comp.to_dict(), separators=(",", ":"), sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def shape_features(comp: Composition) -> np.ndarray:
+    """Fixed-length, L2-normalized shape descriptor.
+
+    Layout: GRID_SIZE×GRID_SIZE point occupancy, length-weighted direction histogram,
+    then [strokes, points, bbox width, bbox height, center x, center y].
+    """
+    strokes = [
+        (np.asarray(s.xs, dtype=np.float32), np.asarray(s.ys, dtype=np.float32))
+        for frag in comp.doodle_fragments
+        for s in frag.strokes
+        if len(s.xs) > 0 and len(s.xs) == len(s.ys)
+    ]
+    vec = np.zeros(FEATURE_DIM, dtype=np.float32)
+    if not strokes:
+        return vec
+
+    xs = np.clip(np.concatenate([s[0] for s in strokes]), 0.0, 1.0)
+    ys = np.clip(np.concatenate([s[1] for s in strokes]), 0.0, 1.0)
+
+    cells = np.minimum((ys * GRID_SIZE).astype(np.int32), GRID_SIZE - 1) * GRID_SIZE
+    cells += np.minimum((xs * GRID_SIZE).astype(np.int32), GRID_SIZE - 1)
+    occupancy = np.bincount(cells, minlength=GRID_SIZE * GRID_SIZE).astype(np.float32)
+    vec[: GRID_SIZE * GRID_SIZE] = occupancy / len(xs)
+
+    directions = np.zeros(DIRECTION_BINS, dtype=np.float32)
+    for sx, sy in strokes:
+        if len(sx) < 2:
+            continue
+        dx, dy = np.diff(sx), np.diff(sy)
+        lengths = np.hypot(dx, dy)
+        # Undirected angle in [0, pi) so a stroke drawn backwards looks the same
+        angles = np.mod(np.arctan2(dy, dx), np.pi)
+        bins = np.minimum((angles / np.pi * DIRECTION_BINS).astype(np.int32), DIRECTION_BINS - 1)
+        directions += np.bincount(bins, weights=lengths, minlength=DIRECTION_BINS).astype(np.float32)
+    total_length = directions.sum()
+    if total_length > 0:
+        directions /= total_length
+    offset = GRID_SIZE * GRID_SIZE
+    vec[offset: offset + DIRECTION_BINS] = directions
+
+    min_x, max_x, min_y, max_y = xs.min(), xs.max(), ys.min(), ys.max()
+    vec[offset + DIRECTION_BINS:] = (
+        min(len(strokes) / 20.0, 1.0),
+        min(len(xs) / 200.0, 1.0),
+        max_x - min_x,
+        max_y - min_y,
+        (min_x + max_x) / 2,
+        (min_y + max_y) / 2,
+    )
+
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+def estimate_tokens(subject: str, comp: Composition) -> int:
+    """Estimate the prompt tokens one composition adds as a few-shot example."""
+    return max(1, int(len(compositions_to_few_shot(subject, [comp])) / CHARS_PER_TOKEN))
+
+
+@dataclass
+class FeatureTable:
+    """Features for a list of compositions, row-aligned with that list."""
+    keys: list[str]
+    features: np.ndarray
+    tokens: np.ndarray
+    quality: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class FeatureStore:
+    """Computes features once per composition and persists them as one .npz per word.
+
+    Later lookups for already-seen compositions are a hash and a dict hit, so selection
+    over a word's curated set costs milliseconds instead of a full rescan.
+    """
+
+    def __init__(self, cache_dir: str | Path | None = None):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR / "features"
+        self._loaded: dict[str, dict[str, tuple[np.ndarray, int, float]]] = {}
+
+    def _path(self, word: str) -> Path:
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in word)
+        return self.cache_dir / f"{safe}.npz"
+
+    def _load(self, word: str) -> dict[str, tuple[np.ndarray, int, float]]:
+        if word in self._loaded:
+            return self._loaded[word]
+
+        rows: dict[str, tuple[np.ndarray, int, float]] = {}
+        path = self._path(word)
+        if path.exists():
+            data = np.load(path)
+            if data["features"].shape[1:] == (FEATURE_DIM,):
+                for key, feat, tok, q in zip(data["keys"], data["features"], data["tokens"], data["quality"]):
+                    rows[str(key)] = (feat, int(tok), float(q))
+        self._loaded[word] = rows
+        return rows
+
+    def _save(self, word: str) -> None:
+        rows = self._loaded[word]
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        keys = list(rows)
+        np.savez(
+            self._path(word),
+            keys=np.array(keys),
+            features=np.stack([rows[k][0] for k in keys]).astype(np.float32),
+            tokens=np.array([rows[k][1] for k in keys], dtype=np.int32),
+            quality=np.array([rows[k][2] for k in keys], dtype=np.float32),
+        )
+
+    def table(self, word: str, compositions: list[Composition]) -> FeatureTable:
+        """Return features for compositions, computing and persisting any that are missing."""
+        rows = self._load(word)
+        keys = [composition_key(c) for c in compositions]
+
+        added = False
+        for key, comp in zip(keys, compositions):
+            if key not in rows:
+                _, score = validate(comp)
+                rows[key] = (shape_features(comp), estimate_tokens(word, comp), score)
+                added = True
+        if added:
+            self._save(word)
+
+        if not keys:
+            return FeatureTable([], np.zeros((0, FEATURE_DIM), np.float32), np.zeros(0, np.int32), np.zeros(0, np.float32))
+
+        return FeatureTable(
+            keys=keys,
+            features=np.stack([rows[k][0] for k in keys]),
+            tokens=np.array([rows[k][1] for k in keys], dtype=np.int32),
+            quality=np.array([rows[k][2] for k in keys], dtype=np.float32),
+        )
+
+
+_default_store: FeatureStore | None = None
+
+
+def default_store() -> FeatureStore:
+    """Process-wide FeatureStore under CACHE_DIR/features."""
+    global _default_store
+    if _default_store is None:
+        _default_store = FeatureStore()
+    return _default_store
@@ -2,24 +2,265 @@
 
 from __future__ import annotations
 
-import io
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import httpx
-import matplotlib.pyplot as plt
-import numpy as np
 from PIL import Image
 
+from .cache import CACHE_DIR
+
+# httpx and matplotlib are imported where used, keeping `import helpers.images` light
+if TYPE_CHECKING:
+    import httpx
+
 _HTTP_HEADERS = {"User-Agent": "Grovetracks/2.0 (image-tracing-notebook)"}
 
+STORE_MAX_BYTES = int(os.environ.get("GROVETRACKS_IMAGE_CACHE_MB", "2048")) * 1024 * 1024
+
+# Long side that edge detection, vision labeling (1024px encode) and display all work within
+WORKING_MAX_SIDE = 1024
+
+# Re-check a cached URL with the origin (If-None-Match / If-Modified-Since) at most this often
+REVALIDATE_AFTER = 24 * 3600.0
+
+# Access times from cache hits are written to the index at most this often (and at exit)
+ACCESS_FLUSH_INTERVAL = 30.0
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> httpx.Client:
+    """Shared, connection-pooling HTTP client for image downloads (thread-safe)."""
+    import httpx
+
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(
+                headers=_HTTP_HEADERS,
+                follow_redirects=True,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            )
+        return _client
+
+
+class ImageStore:
+    """Content-addressed local store for downloaded images, keyed by a hash of the URL.
+
+    Entries remember their ETag / Last-Modified so stale copies are revalidated with a
+    conditional GET instead of re-downloaded. When the store grows past max_bytes the
+    least-recently-used files are evicted (never the one just stored). Access times
+    from cache hits are persisted every ACCESS_FLUSH_INTERVAL seconds and by flush(),
+    so the LRU order carries over between sessions.
+    """
+
+    def __init__(self, root: str | Path | None = None, max_bytes: int = STORE_MAX_BYTES):
+        self.root = Path(root) if root is not None else CACHE_DIR / "images"
+        self.max_bytes = max_bytes
+        self._index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+        self._index: dict[str, dict] = {}
+        self._saved_at = time.monotonic()
+        self._dirty = False
+        if self._index_path.exists():
+            try:
+                self._index = json.loads(self._index_path.read_text())
+            except (OSError, json.JSONDecodeError):
+                self._index = {}
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+    def path(self, url: str) -> Path:
+        k = self.key(url)
+        return self.root / k[:2] / k
+
+    def content_type(self, url: str) -> str | None:
+        entry = self._index.get(self.key(url))
+        return entry.get("content_type") if entry else None
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index))
+        tmp.replace(self._index_path)
+        self._saved_at = time.monotonic()
+        self._dirty = False
+
+    def _touch(self, k: str) -> None:
+        """Record a cache hit (caller holds the lock), persisting the index now and then."""
+        if k not in self._index:
+            return
+        self._index[k]["accessed"] = time.time()
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= ACCESS_FLUSH_INTERVAL:
+            self._save_index()
+
+    def _evict(self, keep: str) -> None:
+        total = sum(e["size"] for e in self._index.values())
+        for k, entry in sorted(self._index.items(), key=lambda kv: kv[1]["accessed"]):
+            if total <= self.max_bytes:
+                break
+            if k == keep:
+                continue
+            (self.root / k[:2] / k).unlink(missing_ok=True)
+            total -= entry["size"]
+            del self._index[k]
+
+    def _put(self, url: str, response: httpx.Response) -> Path:
+        path = self.path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(response.content)
+        tmp.replace(path)
+
+        now = time.time()
+        with self._lock:
+            self._index[self.key(url)] = {
+                "url": url,
+                "size": len(response.content),
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "content_type": response.headers.get("content-type"),
+                "validated": now,
+                "accessed": now,
+            }
+            self._evict(keep=self.key(url))
+            self._save_index()
+        return path
+
+    def fetch(self, url: str, revalidate_after: float = REVALIDATE_AFTER) -> Path:
+        """Return the local path of url's content, downloading or revalidating as needed."""
+        import httpx
+
+        k = self.key(url)
+        path = self.path(url)
+        with self._lock:
+            entry = dict(self._index.get(k) or {})
+        cached = bool(entry) and path.exists()
+
+        if cached and time.time() - entry["validated"] < revalidate_after:
+            with self._lock:
+                self._touch(k)
+            return path
+
+        headers = {}
+        if cached:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = get_client().get(url, headers=headers)
+            if cached and response.status_code == 304:
+                with self._lock:
+                    if k in self._index:
+                        now = time.time()
+                        self._index[k]["validated"] = now
+                        self._index[k]["accessed"] = now
+                        self._save_index()
+                return path
+            response.raise_for_status()
+        except httpx.HTTPError:
+            if cached:
+                # Origin unreachable or erroring — a stale copy beats no image
+                return path
+            raise
 
-def load_image(path_or_url: str) -> Image.Image:
-    """Load an image from a local file path or URL."""
+        return self._put(url, response)
+
+    def flush(self) -> None:
+        """Persist access times recorded since the last write."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+
+_store: ImageStore | None = None
+
+
+def get_store() -> ImageStore:
+    """The shared image store under CACHE_DIR/images."""
+    global _store
+    with _client_lock:
+        if _store is None:
+            _store = ImageStore()
+            atexit.register(_store.flush)
+        return _store
+
+
+def download_many(urls: list[str], concurrency: int = 8) -> list[Path | None]:
+    """Fetch many URLs into the image store concurrently over one pooled client.
+
+    Returns local paths in the same order as urls; failed downloads are None.
+    """
+    store = get_store()
+
+    def fetch(url: str) -> Path | None:
+        try:
+            return store.fetch(url)
+        except Exception as e:
+            print(f"Download failed: {url[:80]} — {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        paths = list(pool.map(fetch, urls))
+    store.flush()
+    return paths
+
+
+def _open_scaled(source, max_side: int | None) -> Image.Image:
+    """Decode an image so its long side is at most max_side, doing as little work as possible.
+
+    JPEGs use draft mode, so libjpeg decodes at 1/2, 1/4 or 1/8 scale without ever
+    materializing the full-resolution bitmap. Whatever is still too large is shrunk
+    with an integer reduce() (box averaging) and a final LANCZOS resize, which is cheap
+    by then because the image is already within 2x of the target. Images in other
+    modes than RGB or L (palette, 1-bit, 16-bit, alpha) are converted to RGB first.
+    """
+    img = Image.open(source)
+    if max_side is None or max(img.size) <= max_side:
+        return img.convert("RGB")
+
+    w, h = img.size
+    ratio = max_side / max(w, h)
+    target = (max(1, round(w * ratio)), max(1, round(h * ratio)))
+
+    if img.format == "JPEG":
+        img.draft("RGB", target)
+    if img.mode not in ("RGB", "L"):
+        # reduce() rejects palette, 1-bit and 16-bit modes; the result ends up RGB anyway
+        img = img.convert("RGB")
+
+    factor = min(img.size[0] // target[0], img.size[1] // target[1])
+    if factor >= 2:
+        img = img.reduce(factor)
+    if img.size != target:
+        img = img.resize(target, Image.LANCZOS)
+    return img.convert("RGB")
+
+
+def load_image(path_or_url: str, max_side: int | None = None) -> Image.Image:
+    """Load an image from a local file path or URL. URLs are read through the image store.
+
+    With max_side set (WORKING_MAX_SIDE suits tracing, vision labeling and display alike),
+    the image is decoded directly near that size instead of at full resolution — load
+    once at the working size and pass the same image to every later stage.
+    """
     if path_or_url.startswith(("http://", "https://")):
-        response = httpx.get(path_or_url, headers=_HTTP_HEADERS, follow_redirects=True, timeout=30.0)
-        response.raise_for_status()
-        return Image.open(io.BytesIO(response.content)).convert("RGB")
-    return Image.open(path_or_url).convert("RGB")
+        path_or_url = str(get_store().fetch(path_or_url))
+    return _open_scaled(path_or_url, max_side)
 
 
 def download_image(url: str, save_dir: str = "images/", filename: str | None = None) -> Path:
@@ -27,8 +268,8 @@ def download_image(url: str, save_dir: str = "images/", filename: str | None = N
     save_path = Path(save_dir)
     save_path.mkdir(parents=True, exist_ok=True)
 
-    response = httpx.get(url, headers=_HTTP_HEADERS, follow_redirects=True, timeout=30.0)
-    response.raise_for_status()
+    store = get_store()
+    cached = store.fetch(url)
 
     if filename is None:
         # Extract filename from URL or generate one
@@ -36,15 +277,14 @@ def download_image(url: str, save_dir: str = "images/", filename: str | None = N
         if "." in url_path and len(url_path) < 100:
             filename = url_path
         else:
-            content_type = response.headers.get("content-type", "image/jpeg")
+            content_type = store.content_type(url) or "image/jpeg"
             ext = content_type.split("/")[-1].split(";")[0]
             if ext not in ("jpeg", "jpg", "png", "webp", "gif"):
                 ext = "jpg"
-            import hashlib
             filename = hashlib.md5(url.encode()).hexdigest()[:12] + f".{ext}"
 
     file_path = save_path / filename
-    file_path.write_bytes(response.content)
+    file_path.write_bytes(cached.read_bytes())
     return file_path
 
 
@@ -53,6 +293,8 @@ def search_images(query: str, count: int = 10) -> list[dict]:
 
     Returns list of dicts: [{url, thumb_url, description, photographer, unsplash_link}]
     """
+    import httpx
+
     params = {"query": query, "per_page": min(count, 30)}
 
     try:
@@ -85,6 +327,9 @@ def search_images(query: str, count: int = 10) -> list[dict]:
 
 def show_image(img: Image.Image, title: str | None = None, figsize: tuple = (6, 6)) -> None:
     """Display a PIL Image inline in the notebook."""
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     fig, ax = plt.subplots(1, 1, figsize=figsize)
     ax.imshow(np.array(img))
     ax.set_xticks([])
@@ -105,6 +350,9 @@ def show_image_grid(
     """Display multiple PIL Images in a grid."""
     import math
 
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     n = len(images)
     if n == 0:
         print("No images to display.")
@@ -147,6 +395,9 @@ def show_side_by_side(
     figsize: tuple = (12, 5),
 ) -> None:
     """Show two images side by side."""
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=figsize)
 
     ax1.imshow(np.array(img1))
@@ -0,0 +1,651 @@
+"""Headless batch runner: generation, tracing, rescoring and export jobs outside Jupyter.
+
+    python -m helpers generate --spec jobs/cats.yaml [--workers 8] [--jsonl]
+    python -m helpers generate --subjects cat dog --backend claude --calls 3 --per-call 4
+    python -m helpers trace photos/ https://example.com/cat.jpg --subject cat [--workers 4]
+    python -m helpers rescore [--words cat dog] [--workers 4] [--dry-run]
+    python -m helpers export data/cats.parquet [--word cat]
+
+A spec file (.yaml / .yml, needs PyYAML, or .json) is a mapping of the same options
+the subcommand takes, with underscores or dashes; flags given on the command line win
+over the spec. For example:
+
+    subjects: [cat, dog, owl]     # or "all" for every COMPOSABLE_SUBJECTS entry
+    backend: ollama
+    model: qwen2.5:14b
+    calls: 10                     # requests per subject
+    per_call: 5
+    few_shot: 6                   # curated examples per subject, 0 for none
+    workers: 8
+    style: cartoon
+
+Generation calls run on a thread pool (they wait on the model hosts); tracing runs on
+a process pool (it is CPU-bound). Valid results are written with
+db.save_compositions unless dry_run is set. Progress goes to stdout as readable
+lines, or with --jsonl as one JSON object per line ({"event": ..., "elapsed": ...});
+in that mode anything else the helpers print is sent to stderr, so stdout stays
+machine-readable. The run ends with a "done" event holding the totals and a
+"metrics" event with the helpers.metrics per-stage timings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from contextlib import nullcontext, redirect_stdout
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import TextIO
+
+from . import metrics
+from .models import AiComposition, Composition, ai_to_scored_compositions
+from .validate import validate
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif")
+
+
+# --- Job specs ---
+
+@dataclass
+class GenerateJob:
+    subjects: list[str] = field(default_factory=list)
+    backend: str = "ollama"               # "ollama" or "claude"
+    model: str | None = None              # default: OLLAMA_MODEL / CLAUDE_MODEL
+    calls: int = 1                        # requests per subject
+    per_call: int = 5                     # compositions asked for per request
+    few_shot: int = 0                     # curated examples per subject
+    chunk_size: int = 2                   # examples per few-shot turn
+    token_budget: int | None = None       # cap on few-shot prompt tokens
+    style: str | None = None              # plugins.STYLE_PRESETS key or free text
+    complexity: str | None = None         # plugins.COMPLEXITY_PRESETS key or free text
+    temperature: float = 0.3
+    top_p: float = 0.9
+    repeat_penalty: float = 1.1
+    max_tokens: int | None = None         # num_predict / max_tokens, default per backend
+    resample_spacing: float | None = None
+    generation_method: str | None = None  # default: "batch-<model>"
+    dedupe: bool = True
+    min_novelty: float | None = None      # stop a subject once calls add less (see helpers.diversity)
+    patience: int = 2                     # low-novelty calls in a row before stopping
+    adaptive: bool = False                # tune per_call / token limit per call (see helpers.tuning)
+    workers: int = 4
+    dry_run: bool = False
+
+
+@dataclass
+class TraceJob:
+    images: list = field(default_factory=list)  # paths, directories, URLs, or {"path"/"url", "subject"}
+    subject: str = "traced"
+    params: list[dict] = field(default_factory=lambda: [{}])  # trace_image kwargs, one set per attempt
+    keep: str = "best"                    # "best" valid attempt per image, or "all" valid attempts
+    max_side: int | None = 1024
+    generation_method: str | None = None  # default: "traced-<method>"
+    dedupe: bool = True
+    workers: int | None = None            # default: os.cpu_count()
+    dry_run: bool = False
+
+
+@dataclass
+class RescoreJob:
+    words: list[str] | None = None
+    workers: int = 4
+    batch_size: int = 2000
+    dry_run: bool = False
+    restart: bool = False
+
+
+@dataclass
+class ExportJob:
+    path: str | None = None
+    word: str | None = None
+    source_type: str | None = None
+    batch_size: int = 5000
+
+
+JOBS = {"generate": GenerateJob, "trace": TraceJob, "rescore": RescoreJob, "export": ExportJob}
+
+
+def load_spec(path: str | Path) -> dict:
+    """Read a job spec from YAML (.yaml / .yml) or JSON."""
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("YAML job specs need PyYAML: pip install pyyaml (or write the spec as JSON)") from e
+        data = yaml.safe_load(text) or {}
+    else:
+        data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: a job spec must be a mapping of option names to values")
+    return data
+
+
+def make_job(kind: str, spec: dict | None = None, **overrides):
+    """Build the job dataclass for kind from a spec mapping, with overrides applied on top."""
+    cls = JOBS[kind]
+    values = {k.replace("-", "_"): v for k, v in (spec or {}).items()}
+    declared = values.pop("job", kind)
+    if declared != kind:
+        raise ValueError(f"spec is for a {declared!r} job, not {kind!r}")
+    values.update(overrides)
+    known = {f.name for f in fields(cls)}
+    unknown = sorted(set(values) - known)
+    if unknown:
+        raise ValueError(f"unknown {kind} option(s): {', '.join(unknown)} (expected: {', '.join(sorted(known))})")
+    return cls(**values)
+
+
+# --- Progress ---
+
+class Progress:
+    """Job events on a stream: readable lines, or one JSON object per line."""
+
+    def __init__(self, jsonl: bool = False, stream: TextIO | None = None):
+        self.jsonl = jsonl
+        self.stream = stream or sys.stdout
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, message: str | None = None, **fields) -> None:
+        elapsed = time.perf_counter() - self._t0
+        if self.jsonl:
+            line = json.dumps({"event": event, "elapsed": round(elapsed, 3), **fields}, default=str)
+        elif message is not None:
+            line = message
+        else:
+            line = f"[{elapsed:7.1f}s] {event}: " + ", ".join(f"{k}={v}" for k, v in fields.items())
+        with self._lock:
+            print(line, file=self.stream, flush=True)
+
+
+def _rate(n: float, seconds: float) -> float:
+    return round(n / seconds, 2) if seconds > 0 else 0.0
+
+
+# --- generate ---
+
+def _system_prompt(job: GenerateJob) -> str:
+    from .plugins import combine_system_prompt, complexity_plugin, style_plugin
+
+    if job.backend == "claude":
+        from .claude import CLAUDE_SYSTEM_PROMPT as base
+    else:
+        from .ollama import FOCUSED_SYSTEM_PROMPT as base
+    plugins = []
+    if job.style:
+        plugins.append(style_plugin(job.style))
+    if job.complexity:
+        plugins.append(complexity_plugin(job.complexity))
+    return combine_system_prompt(base, plugins)
+
+
+def run_generate(job: GenerateJob, progress: Progress) -> dict:
+    """Run calls × subjects generation requests on a thread pool and save the valid results."""
+    from .plugins import build_few_shot_pairs_from_curated
+
+    if job.backend not in ("ollama", "claude"):
+        raise ValueError(f"unknown backend {job.backend!r} (expected ollama or claude)")
+    subjects = job.subjects
+    if subjects == "all" or subjects == ["all"]:
+        from .subjects import COMPOSABLE_SUBJECTS
+        subjects = list(COMPOSABLE_SUBJECTS)
+    if isinstance(subjects, str):
+        subjects = [subjects]
+    if not subjects:
+        raise ValueError("generate needs at least one subject")
+
+    if job.backend == "claude":
+        from . import claude as client
+    else:
+        from . import ollama as client
+    model = job.model or client.DEFAULT_MODEL
+    method = job.generation_method or f"batch-{model}"
+    system_prompt = _system_prompt(job)
+
+    lock = threading.Lock()
+    pairs_cache: dict[str, list[tuple[str, str]]] = {}
+    save_locks: dict[str, threading.Lock] = {}
+    totals = {"requests": 0, "failed": 0, "compositions": 0, "valid": 0, "saved": 0,
+              "input_tokens": 0, "output_tokens": 0, "truncated": 0}
+
+    ceiling = job.max_tokens or (4096 if job.backend == "claude" else 8192)
+    tuner = None
+    if job.adaptive:
+        from .tuning import get_tuner
+        tuner = get_tuner()
+
+    trackers = {}
+    if job.min_novelty is not None:
+        from .diversity import DiversityTracker
+        trackers = {s: DiversityTracker(s, planned_calls=job.calls, min_novelty=job.min_novelty,
+                                        patience=job.patience) for s in subjects}
+
+    def few_shot_pairs(subject: str) -> list[tuple[str, str]]:
+        if job.few_shot <= 0:
+            return []
+        with lock:
+            if subject in pairs_cache:
+                return pairs_cache[subject]
+        from .db import get_curated
+        pairs = build_few_shot_pairs_from_curated(
+            subject, get_curated(subject, limit=job.few_shot), chunk_size=job.chunk_size,
+            token_budget=job.token_budget,
+        )
+        with lock:
+            return pairs_cache.setdefault(subject, pairs)
+
+    def request(subject: str, per_call: int, limit: int) -> tuple[list[AiComposition | dict], dict]:
+        pairs = few_shot_pairs(subject)
+        if job.backend == "ollama":
+            messages = client.build_few_shot_messages(subject, per_call, pairs, system_prompt)
+            data, usage = client.call_ollama_with_usage(
+                messages, model=model, schema=client.COMPOSITION_SCHEMA,
+                temperature=job.temperature, top_p=job.top_p, repeat_penalty=job.repeat_penalty,
+                num_predict=limit,
+            )
+            return data.get("compositions", []), usage
+        user_prompt = client.build_user_prompt(subject, per_call)
+        if pairs:
+            return client.call_claude_with_few_shot(
+                system_prompt, pairs, user_prompt, model=model, max_tokens=limit,
+            )
+        return client.call_claude(system_prompt, user_prompt, model=model, max_tokens=limit)
+
+    def one(subject: str, call: int) -> None:
+        tracker = trackers.get(subject)
+        if tracker is not None and tracker.saturated:
+            tracker.skip()
+            return
+
+        per_call, limit = job.per_call, ceiling
+        if tuner is not None:
+            per_call, limit = tuner.suggest(job.backend, model, subject, job.per_call, ceiling)
+        t0 = time.perf_counter()
+        novelty = None
+        try:
+            ai_comps, usage = request(subject, per_call, limit)
+            scored = ai_to_scored_compositions(ai_comps, generation_method=method,
+                                               resample_spacing=job.resample_spacing)
+            comps = [c for c, _, _ in scored]
+            valid = [c for c, ok, _ in scored if ok]
+            if tuner is not None:
+                tuner.record(job.backend, model, subject, per_call, len(comps), len(valid),
+                             usage.get("output_tokens", 0), usage.get("truncated", False),
+                             time.perf_counter() - t0)
+            if tracker is not None:
+                was_saturated = tracker.saturated
+                novelty = tracker.observe(valid).mean if valid else None
+                if tracker.saturated and not was_saturated:
+                    progress.emit("saturated", f"  {tracker.summary()}", subject=subject,
+                                  calls=len(tracker.calls), planned=job.calls)
+            saved = 0
+            if valid and not job.dry_run:
+                from .db import save_compositions
+                with lock:
+                    save_lock = save_locks.setdefault(subject, threading.Lock())
+                # One writer per word: the near-duplicate index for a word is not thread-safe
+                with save_lock:
+                    saved = save_compositions(subject, valid, generation_method=method, dedupe=job.dedupe)
+        except Exception as e:
+            with lock:
+                totals["failed"] += 1
+            progress.emit("error", f"  {subject} #{call + 1}: ERROR {type(e).__name__}: {e}",
+                          subject=subject, call=call, error=f"{type(e).__name__}: {e}")
+            return
+
+        scores = [s for _, ok, s in scored if ok]
+        with lock:
+            totals["requests"] += 1
+            totals["compositions"] += len(comps)
+            totals["valid"] += len(valid)
+            totals["saved"] += saved
+            totals["input_tokens"] += usage.get("input_tokens", 0)
+            totals["output_tokens"] += usage.get("output_tokens", 0)
+            totals["truncated"] += bool(usage.get("truncated"))
+        seconds = time.perf_counter() - t0
+        mean = sum(scores) / len(scores) if scores else 0.0
+        progress.emit(
+            "request",
+            f"  {subject} #{call + 1}: {len(valid)}/{len(comps)} valid, mean {mean:.3f}, "
+            f"{saved} saved" + (f", novelty {novelty:.3f}" if novelty is not None else "")
+            + (f", {per_call} @ {limit} tokens" if tuner is not None else "")
+            + (" (truncated)" if usage.get("truncated") else "") + f" ({seconds:.1f}s)",
+            subject=subject, call=call, compositions=len(comps), valid=len(valid), saved=saved,
+            mean_score=round(mean, 4), seconds=round(seconds, 3), per_call=per_call, limit=limit,
+            truncated=bool(usage.get("truncated")),
+            **({"novelty": round(novelty, 4)} if novelty is not None else {}),
+        )
+
+    progress.emit("start", f"generate: {len(subjects)} subjects × {job.calls} calls × {job.per_call} "
+                           f"on {job.backend} ({model}), {job.workers} workers",
+                  job="generate", subjects=len(subjects), calls=job.calls, per_call=job.per_call,
+                  backend=job.backend, model=model, workers=job.workers)
+    t0 = time.perf_counter()
+    # Calls are handed to the pool as workers free up, round-robin over subjects. With
+    # early stopping a subject has at most `patience` calls in flight, so once it
+    # saturates only those finish and its remaining calls are never sent.
+    workers = max(1, job.workers)
+    per_subject = max(1, job.patience) if trackers else job.calls
+    queued = {subject: list(range(job.calls)) for subject in subjects}
+    running = dict.fromkeys(subjects, 0)
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            for subject, calls in queued.items():
+                tracker = trackers.get(subject)
+                if calls and tracker is not None and tracker.saturated:
+                    tracker.skip(len(calls))
+                    calls.clear()
+            submitted = True
+            while submitted and len(in_flight) < workers:
+                submitted = False
+                for subject in subjects:
+                    if queued[subject] and running[subject] < per_subject and len(in_flight) < workers:
+                        in_flight[pool.submit(one, subject, queued[subject].pop(0))] = subject
+                        running[subject] += 1
+                        submitted = True
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                running[in_flight.pop(future)] -= 1
+    seconds = time.perf_counter() - t0
+    if tuner is not None:
+        tuner.save()
+        progress.emit("tuning", tuner.summary(job.backend, model), model=model)
+
+    totals["seconds"] = round(seconds, 3)
+    totals["valid_per_second"] = _rate(totals["valid"], seconds)
+    if job.backend == "claude":
+        from .claude import UsageTracker
+        totals["cost_usd"] = round(UsageTracker(
+            calls=totals["requests"], input_tokens=totals["input_tokens"], output_tokens=totals["output_tokens"],
+        ).total_cost, 4)
+    savings = ""
+    if trackers:
+        saturated = [t for t in trackers.values() if t.saturated]
+        totals["saturated_subjects"] = len(saturated)
+        totals["calls_saved"] = sum(t.calls_saved for t in trackers.values())
+        savings = (f"; {len(saturated)}/{len(trackers)} subjects saturated, {totals['calls_saved']} of "
+                   f"{job.calls * len(subjects)} planned calls saved")
+    progress.emit("done", f"Done: {totals['valid']}/{totals['compositions']} valid from {totals['requests']} "
+                          f"requests ({totals['failed']} failed), {totals['saved']} saved in {seconds:.1f}s "
+                          f"({totals['valid_per_second']:.2f} valid/s){savings}", **totals)
+    return totals
+
+
+# --- trace ---
+
+def _image_sources(job: TraceJob) -> list[tuple[str, str]]:
+    """(path or URL, subject) for every image in the job, directories expanded."""
+    sources = []
+    for item in job.images:
+        if isinstance(item, dict):
+            source = item.get("path") or item.get("url")
+            subject = item.get("subject", job.subject)
+        else:
+            source, subject = str(item), job.subject
+        if not source:
+            raise ValueError(f"trace image entry without a path or url: {item!r}")
+        path = Path(source).expanduser()
+        if not source.startswith(("http://", "https://")) and path.is_dir():
+            sources += [(str(p), subject) for p in sorted(path.iterdir()) if p.suffix.lower() in IMAGE_SUFFIXES]
+        else:
+            sources.append((source, subject))
+    return sources
+
+
+def _trace_one(path: str, subject: str, params_list: list[dict], max_side: int | None) -> list[tuple]:
+    """Trace one local image with each parameter set. Runs in a worker process.
+
+    Returns [(params index, composition, is_valid, score, seconds, error)]; a failed
+    attempt has composition None and the exception text as error.
+    """
+    from .images import load_image
+    from .trace import trace_image
+
+    img = load_image(path, max_side=max_side)
+    attempts = []
+    for i, params in enumerate(params_list):
+        t0 = time.perf_counter()
+        try:
+            comp = trace_image(img, **{"subject": subject, **params})
+        except Exception as e:
+            attempts.append((i, None, False, 0.0, time.perf_counter() - t0, f"{type(e).__name__}: {e}"))
+            continue
+        attempts.append((i, comp, *validate(comp), time.perf_counter() - t0, None))
+    return attempts
+
+
+def run_trace(job: TraceJob, progress: Progress) -> dict:
+    """Trace every image on a process pool and save the kept valid compositions."""
+    if job.keep not in ("best", "all"):
+        raise ValueError(f"keep must be 'best' or 'all', not {job.keep!r}")
+    params_list = job.params or [{}]
+    sources = _image_sources(job)
+    if not sources:
+        raise ValueError("trace needs at least one image")
+
+    # Downloads happen here, on threads over one pooled client, so that worker
+    # processes only read local files and never write the shared image store index
+    urls = [s for s, _ in sources if s.startswith(("http://", "https://"))]
+    if urls:
+        from .images import download_many
+        local = dict(zip(urls, download_many(urls)))
+    else:
+        local = {}
+
+    workers = job.workers or os.cpu_count() or 1
+    totals = {"images": len(sources), "failed": 0, "attempts": 0, "valid": 0, "saved": 0}
+    progress.emit("start", f"trace: {len(sources)} images × {len(params_list)} parameter sets, {workers} workers",
+                  job="trace", images=len(sources), param_sets=len(params_list), workers=workers)
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for source, subject in sources:
+            path = local.get(source, source)
+            if path is None:
+                totals["failed"] += 1
+                progress.emit("error", f"  {source[:80]}: download failed", source=source, error="download failed")
+                continue
+            futures[pool.submit(_trace_one, str(path), subject, params_list, job.max_side)] = (source, subject)
+
+        for future in as_completed(futures):
+            source, subject = futures[future]
+            try:
+                attempts = future.result()
+            except Exception as e:
+                totals["failed"] += 1
+                progress.emit("error", f"  {source[:80]}: ERROR {type(e).__name__}: {e}",
+                              source=source, error=f"{type(e).__name__}: {e}")
+                continue
+
+            valid = [a for a in attempts if a[2]]
+            if job.keep == "best":
+                valid = sorted(valid, key=lambda a: -a[3])[:1]
+            saved = 0
+            if valid and not job.dry_run:
+                from .db import save_compositions
+                by_method: dict[str, list[Composition]] = {}
+                for i, comp, *_ in valid:
+                    method = job.generation_method or f"traced-{params_list[i].get('method', 'canny')}"
+                    by_method.setdefault(method, []).append(comp)
+                for method, comps in by_method.items():
+                    saved += save_compositions(subject, comps, generation_method=method, dedupe=job.dedupe)
+
+            totals["attempts"] += len(attempts)
+            totals["valid"] += len(valid)
+            totals["saved"] += saved
+            best = max((a[3] for a in valid), default=0.0)
+            seconds = sum(a[4] for a in attempts)
+            errors = [a[5] for a in attempts if a[5]]
+            progress.emit(
+                "image",
+                f"  {source[:60]}: {len(valid)} kept of {len(attempts)}, best q={best:.3f}, {saved} saved "
+                f"({seconds:.1f}s)" + (f", {len(errors)} errors: {errors[0]}" if errors else ""),
+                source=source, subject=subject, attempts=len(attempts), kept=len(valid), saved=saved,
+                best_score=round(best, 4), seconds=round(seconds, 3), errors=errors,
+            )
+    seconds = time.perf_counter() - t0
+
+    totals["seconds"] = round(seconds, 3)
+    totals["images_per_second"] = _rate(totals["images"] - totals["failed"], seconds)
+    progress.emit("done", f"Done: {totals['images'] - totals['failed']}/{totals['images']} images traced, "
+                          f"{totals['valid']} kept, {totals['saved']} saved in {seconds:.1f}s "
+                          f"({totals['images_per_second']:.2f} images/s)", **totals)
+    return totals
+
+
+# --- rescore / export ---
+
+def run_rescore(job: RescoreJob, progress: Progress) -> dict:
+    from .rescore import rescore
+
+    def on_result(r) -> None:
+        progress.emit("word", f"  {r.word}: {r.rows} rows, {r.changed} changed ({r.seconds:.1f}s)",
+                      word=r.word, rows=r.rows, changed=r.changed, invalid=r.invalid, seconds=round(r.seconds, 3))
+
+    progress.emit("start", f"rescore: {len(job.words) if job.words else 'all'} words, {job.workers} workers",
+                  job="rescore", words=job.words, workers=job.workers, dry_run=job.dry_run)
+    report = rescore(words=job.words or None, workers=job.workers, batch_size=job.batch_size,
+                     dry_run=job.dry_run, restart=job.restart, on_result=on_result)
+    rows = sum(r.rows for r in report.results)
+    totals = {
+        "words": len(report.results), "resumed": report.resumed, "rows": rows,
+        "changed": sum(r.changed for r in report.results), "invalid": sum(r.invalid for r in report.results),
+        "seconds": round(report.seconds, 3),
+    }
+    progress.emit("done", report.format(), **totals)
+    return totals
+
+
+def run_export(job: ExportJob, progress: Progress) -> dict:
+    from .dataset import export_compositions
+
+    if not job.path:
+        raise ValueError("export needs an output path (.parquet, .arrow, .feather or .ipc)")
+    progress.emit("start", f"export: {job.word or 'all words'} → {job.path}",
+                  job="export", path=job.path, word=job.word, source_type=job.source_type)
+    t0 = time.perf_counter()
+    rows = export_compositions(
+        job.path, word=job.word, source_type=job.source_type, batch_size=job.batch_size, verbose=False,
+        on_batch=lambda n: progress.emit("batch", f"  exported {n:,} rows", rows=n),
+    )
+    seconds = time.perf_counter() - t0
+    totals = {"rows": rows, "path": job.path, "seconds": round(seconds, 3), "rows_per_second": _rate(rows, seconds)}
+    progress.emit("done", f"Done: {rows:,} rows → {job.path} in {seconds:.1f}s", **totals)
+    return totals
+
+
+RUNNERS = {"generate": run_generate, "trace": run_trace, "rescore": run_rescore, "export": run_export}
+
+
+def run_job(kind: str, job, progress: Progress | None = None) -> dict:
+    """Run a job dataclass (see make_job) and return its totals."""
+    return RUNNERS[kind](job, progress or Progress())
+
+
+# --- CLI ---
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m helpers", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def command(name: str, help: str) -> argparse.ArgumentParser:
+        # Unset flags are left out of the namespace, so the spec's values stand
+        sub = commands.add_parser(name, help=help, argument_default=argparse.SUPPRESS)
+        sub.add_argument("--spec", help="job spec file (.yaml, .yml or .json)")
+        sub.add_argument("--jsonl", action="store_true", help="progress as JSON lines on stdout")
+        sub.add_argument("--no-metrics", action="store_true", help="skip per-stage timings")
+        return sub
+
+    gen = command("generate", "generate compositions with Ollama or Claude")
+    gen.add_argument("--subjects", nargs="+", help='subjects to draw, or "all"')
+    gen.add_argument("--backend", choices=["ollama", "claude"])
+    gen.add_argument("--model")
+    gen.add_argument("--calls", type=int, help="requests per subject")
+    gen.add_argument("--per-call", dest="per_call", type=int, help="compositions per request")
+    gen.add_argument("--few-shot", dest="few_shot", type=int, help="curated examples per subject")
+    gen.add_argument("--style")
+    gen.add_argument("--complexity")
+    gen.add_argument("--temperature", type=float)
+    gen.add_argument("--max-tokens", dest="max_tokens", type=int)
+    gen.add_argument("--min-novelty", dest="min_novelty", type=float,
+                     help="stop a subject once its calls add less visual novelty than this (e.g. 0.08)")
+    gen.add_argument("--patience", type=int, help="low-novelty calls in a row before stopping a subject")
+    gen.add_argument("--adaptive", action="store_true",
+                     help="tune per-call count and token limit from earlier calls (--per-call is the start)")
+    gen.add_argument("--workers", type=int, help="concurrent requests")
+    gen.add_argument("--dry-run", dest="dry_run", action="store_true", help="validate but do not save")
+
+    trace = command("trace", "trace images into compositions")
+    trace.add_argument("images", nargs="*", help="image files, directories or URLs")
+    trace.add_argument("--subject")
+    trace.add_argument("--keep", choices=["best", "all"])
+    trace.add_argument("--max-side", dest="max_side", type=int)
+    trace.add_argument("--workers", type=int, help="worker processes")
+    trace.add_argument("--dry-run", dest="dry_run", action="store_true", help="trace but do not save")
+
+    rescore = command("rescore", "recompute stored quality scores")
+    rescore.add_argument("--words", nargs="+")
+    rescore.add_argument("--workers", type=int)
+    rescore.add_argument("--batch-size", dest="batch_size", type=int)
+    rescore.add_argument("--dry-run", dest="dry_run", action="store_true", help="score and report without writing")
+    rescore.add_argument("--restart", action="store_true", help="ignore progress from an interrupted run")
+
+    export = command("export", "export seed_compositions to Parquet / Arrow")
+    export.add_argument("path", nargs="?", help="output file (.parquet, .arrow, .feather or .ipc)")
+    export.add_argument("--word")
+    export.add_argument("--source-type", dest="source_type")
+    export.add_argument("--batch-size", dest="batch_size", type=int)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = vars(_parser().parse_args(argv))
+    kind = args.pop("command")
+    spec_path = args.pop("spec", None)
+    jsonl = args.pop("jsonl", False)
+    with_metrics = not args.pop("no_metrics", False)
+    if kind == "trace" and not args.get("images"):
+        args.pop("images", None)  # keep the spec's image list
+    if kind == "export" and args.get("path") is None:
+        args.pop("path", None)
+
+    progress = Progress(jsonl=jsonl, stream=sys.stdout)
+    try:
+        job = make_job(kind, load_spec(spec_path) if spec_path else None, **args)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"{kind}: {e}", file=sys.stderr)
+        return 2
+
+    if with_metrics:
+        metrics.enable()
+    # In JSON-lines mode stdout carries events only; the helpers' own prints go to stderr
+    with redirect_stdout(sys.stderr) if jsonl else nullcontext():
+        try:
+            totals = run_job(kind, job, progress)
+        except Exception as e:
+            progress.emit("error", f"{kind}: {type(e).__name__}: {e}", error=f"{type(e).__name__}: {e}", fatal=True)
+            return 1
+    snapshot = metrics.snapshot()
+    # Trace work happens in worker processes, whose timings stay there
+    if with_metrics and (snapshot["stages"] or snapshot["counters"]):
+        progress.emit("metrics", metrics.summary(), **snapshot)
+
+    # Partial failures are reported in the events; only a run where nothing succeeded fails
+    failed = totals.get("failed", 0)
+    succeeded = totals["requests"] if kind == "generate" else totals.get("images", failed + 1) - failed
+    return 1 if failed and not succeeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Tolerant JSON extraction shared by every LLM client (Ollama, Claude, vision labelers).
+
+Model output arrives wrapped in markdown fences, followed by chatter, or cut off at
+the token limit. parse_json() handles all three in linear time: it decodes the first
+JSON value it finds and ignores anything after it, and when the value is truncated
+it recovers every complete element of the top-level array (the
+"compositions" list) instead of losing the whole response.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+
+_DECODER = json.JSONDecoder()
+
+# One token per string literal (unrolled-loop form, so matching is linear even for
+# unterminated strings) or per structural bracket. Numbers, literals, commas and
+# colons are skipped over by finditer without being looked at.
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"?|[{}\[\]]')
+
+_FENCE_OPEN = re.compile(r"```[A-Za-z0-9_-]*[ \t]*\r?\n?")
+
+
+def _strip_fence(text: str) -> str:
+    """Return the body of the first ``` fence, or text unchanged if there is none.
+
+    A fence with no closing ``` (truncated output) yields everything after the opener.
+    """
+    m = _FENCE_OPEN.search(text)
+    if m is None:
+        return text
+    end = text.find("```", m.end())
+    return text[m.end():] if end == -1 else text[m.end():end]
+
+
+def _first_value_start(text: str) -> int:
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    return min(starts) if starts else -1
+
+
+def _salvage_elements(text: str, start: int) -> list:
+    """Decode every complete element of the top-level array in a (truncated) document.
+
+    The top-level array is either the document itself ([...]) or the first array
+    directly inside the root object ({"compositions": [...]}). Scans once, tracking
+    bracket depth outside of strings, and json-decodes each element span as it closes.
+    """
+    depth = 0
+    array_depth = -1
+    element_start = -1
+    items: list = []
+
+    for m in _TOKEN.finditer(text, start):
+        tok = m.group()
+        ch = tok[0]
+        if ch == '"':
+            continue
+        if ch in "{[":
+            depth += 1
+            if array_depth == -1 and ch == "[" and depth <= 2:
+                array_depth = depth
+            elif depth == array_depth + 1 and array_depth != -1:
+                element_start = m.start()
+        else:
+            if depth == array_depth + 1 and element_start != -1:
+                try:
+                    items.append(json.loads(text[element_start:m.end()]))
+                except json.JSONDecodeError:
+                    pass
+                element_start = -1
+            elif depth == array_depth:
+                if items:
+                    break
+                # That array held no objects (e.g. a "tags" list); look for the next one
+                array_depth = -1
+            depth -= 1
+            if depth <= 0:
+                break
+
+    return items
+
+
+def _decode_first(text: str) -> dict | None:
+    """Decode the first JSON value in text, ignoring leading and trailing junk."""
+    start = _first_value_start(text)
+    if start == -1:
+        return None
+    try:
+        value, _ = _DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, list):
+        return {"compositions": value}
+    return None
+
+
+def salvage_json(text: str) -> tuple[dict, bool]:
+    """Parse model output into a dict. Returns (data, truncated).
+
+    truncated is True when the response did not contain one complete JSON value and
+    the result was rebuilt from the complete elements of its top-level array as
+    {"compositions": [...]}. Raises json.JSONDecodeError if nothing is recoverable.
+    """
+    value = _decode_first(text)
+    if value is not None:
+        return value, False
+
+    body = _strip_fence(text)
+    if body is not text:
+        value = _decode_first(body)
+        if value is not None:
+            return value, False
+
+    start = _first_value_start(body)
+    if start != -1:
+        items = [item for item in _salvage_elements(body, start) if isinstance(item, dict)]
+        if items:
+            return {"compositions": items}, True
+
+    raise json.JSONDecodeError("No valid JSON found in response", text, 0)
+
+
+def parse_json(text: str, salvage: bool = True) -> dict:
+    """Parse model output into a dict, tolerating code fences and trailing text.
+
+    With salvage=False a truncated response raises instead of being partially recovered
+    (for replies like vision labels, where a partial object is not useful).
+    """
+    if salvage:
+        data, _ = salvage_json(text)
+        return data
+
+    value = _decode_first(text)
+    if value is None:
+        value = _decode_first(_strip_fence(text))
+    if value is None:
+        raise json.JSONDecodeError("No valid JSON found in response", text, 0)
+    return value
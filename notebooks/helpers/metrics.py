@@ -0,0 +1,227 @@
+"""Per-stage timing for the helpers pipeline: spans, histograms and exports.
+
+Off by default. Turn it on with metrics.enable() or GROVETRACKS_METRICS=1; when off,
+span() hands back a shared no-op context manager and @timed functions make one extra
+global check, so instrumented code costs next to nothing.
+
+    from helpers import metrics
+    metrics.enable()
+    ...run a generation cell...
+    print(metrics.summary())   # ollama.http 12× p50 1.9s p95 2.4s | ollama.parse 12× p50 0.4ms ...
+    metrics.to_prometheus()    # text exposition format, one summary per stage
+
+Stage names are dotted, module first: ollama.http, ollama.parse, claude.http,
+claude.parse, vision.http, vision.parse, trace.edges, trace.vtracer,
+trace.svg_to_strokes (with trace.svg_parse and trace.simplify inside it), db.query,
+db.insert, db.commit, validate and validate.batch. Counters: db.rows_inserted.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+# Log-spaced buckets: 0.1µs × 1.05^i covers 0.1µs .. ~1 hour in 500 buckets, ±2.5% per percentile
+_MIN_SECONDS = 1e-7
+_GROWTH = 1.05
+_BUCKETS = 500
+_LOG_GROWTH = math.log(_GROWTH)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_enabled = os.environ.get("GROVETRACKS_METRICS", "").lower() in ("1", "true", "yes", "on")
+_NOOP = nullcontext()
+
+
+class Histogram:
+    """Count, sum, min, max and log-bucketed durations for one stage."""
+
+    __slots__ = ("count", "total", "min", "max", "_buckets", "_lock")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._buckets = [0] * _BUCKETS
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        i = int(math.log(seconds / _MIN_SECONDS) / _LOG_GROWTH) if seconds > _MIN_SECONDS else 0
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.min = min(self.min, seconds)
+            self.max = max(self.max, seconds)
+            self._buckets[min(i, _BUCKETS - 1)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (the geometric middle of its bucket, clamped to min/max)."""
+        with self._lock:
+            if not self.count:
+                return math.nan
+            rank = q * self.count
+            seen = 0
+            for i, n in enumerate(self._buckets):
+                seen += n
+                if n and seen >= rank:
+                    value = _MIN_SECONDS * _GROWTH ** (i + 0.5)
+                    return min(max(value, self.min), self.max)
+            return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            **{f"p{round(q * 100)}": self.quantile(q) if self.count else None for q in QUANTILES},
+        }
+
+
+_histograms: dict[str, Histogram] = {}
+_counters: dict[str, float] = {}
+_registry_lock = threading.Lock()
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Drop everything recorded so far (the enabled state is kept)."""
+    with _registry_lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def _histogram(name: str) -> Histogram:
+    hist = _histograms.get(name)
+    if hist is None:
+        with _registry_lock:
+            hist = _histograms.setdefault(name, Histogram())
+    return hist
+
+
+def observe(name: str, seconds: float) -> None:
+    """Record one duration for a stage (no-op when disabled)."""
+    if _enabled:
+        _histogram(name).observe(seconds)
+
+
+def incr(name: str, value: float = 1) -> None:
+    """Add to a counter, e.g. truncated responses or rows inserted (no-op when disabled)."""
+    if _enabled:
+        with _registry_lock:
+            _counters[name] = _counters.get(name, 0) + value
+
+
+class _Span:
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> _Span:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _histogram(self.name).observe(time.perf_counter() - self._start)
+
+
+def span(name: str):
+    """Context manager timing the enclosed block under name. Exceptions are timed too."""
+    return _Span(name) if _enabled else _NOOP
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of span() for whole functions."""
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _histogram(name).observe(time.perf_counter() - start)
+        return wrapper  # type: ignore[return-value]
+    return decorate
+
+
+def snapshot() -> dict:
+    """{"stages": {name: {count, sum, min, max, p50, p95, p99}}, "counters": {name: value}}."""
+    with _registry_lock:
+        histograms = dict(_histograms)
+        counters = dict(_counters)
+    return {
+        "stages": {name: histograms[name].snapshot() for name in sorted(histograms)},
+        "counters": {name: counters[name] for name in sorted(counters)},
+    }
+
+
+def to_json(indent: int | None = None) -> str:
+    return json.dumps(snapshot(), indent=indent)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(prefix: str = "grovetracks") -> str:
+    """Prometheus text exposition: one summary (quantiles, _sum, _count) per stage, plus counters."""
+    snap = snapshot()
+    lines = [
+        f"# HELP {prefix}_stage_seconds Wall time per pipeline stage.",
+        f"# TYPE {prefix}_stage_seconds summary",
+    ]
+    for name, s in snap["stages"].items():
+        label = f'stage="{_escape(name)}"'
+        for q in QUANTILES:
+            lines.append(f'{prefix}_stage_seconds{{{label},quantile="{q}"}} {s[f"p{round(q * 100)}"]!r}')
+        lines.append(f"{prefix}_stage_seconds_sum{{{label}}} {s['sum']!r}")
+        lines.append(f"{prefix}_stage_seconds_count{{{label}}} {s['count']}")
+    if snap["counters"]:
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in snap["counters"].items():
+            lines.append(f'{prefix}_events_total{{event="{_escape(name)}"}} {value!r}')
+    return "\n".join(lines) + "\n"
+
+
+def _fmt(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.1f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds * 1e6:.0f}µs"
+
+
+def summary() -> str:
+    """One line per notebook cell: every stage's count, p50 and p95, busiest first."""
+    snap = snapshot()
+    if not snap["stages"] and not snap["counters"]:
+        return "metrics: nothing recorded" + ("" if _enabled else " (disabled — metrics.enable())")
+    stages = sorted(snap["stages"].items(), key=lambda kv: -kv[1]["sum"])
+    parts = [f"{name} {s['count']}× p50 {_fmt(s['p50'])} p95 {_fmt(s['p95'])}" for name, s in stages]
+    parts += [f"{name} {value:g}" for name, value in snap["counters"].items()]
+    return " | ".join(parts)
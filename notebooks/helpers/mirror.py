@@ -0,0 +1,462 @@
+"""Local SQLite mirror of the seed data, for offline use and queries without a round-trip.
+
+    python -m helpers.mirror sync [--quickdraw] [--full]
+    python -m helpers.mirror upload
+    python -m helpers.mirror status
+
+sync() copies seed_compositions (and with quickdraw=True, quickdraw_simple_doodles)
+from Postgres into CACHE_DIR/mirror.sqlite3 (or GROVETRACKS_MIRROR), with indexes on
+word, quality_score and source_type like the Postgres tables. After the first run it
+only pulls seed rows whose curated_at is at or after the previous sync's newest
+curated_at, less SYNC_OVERLAP to cover transactions that committed late. Re-pulled
+rows are simply upserted. Two cheap checks trigger more than that:
+- If rows were updated in place since the last sync (the pg_stat update counter
+  moved, e.g. after a rescore), everything is pulled again.
+- If the ids disagree afterwards (by db.seed_id_checksum, so a delete plus an insert
+  is caught even though the count is unchanged), they are compared one by one: local
+  rows deleted upstream are dropped, and remote rows missing locally are pulled by id.
+  The latter happens when another mirror uploads rows whose curated_at predates the
+  watermark.
+QuickDraw rows are never updated, so a word is re-copied only when its row count differs.
+
+With the db backend set to "sqlite" (db.set_backend("sqlite"), or
+GROVETRACKS_DB_BACKEND=sqlite), get_curated, get_curated_words, get_curated_stats and
+save_compositions run against the mirror. Saved rows go into the local table straight
+away and are queued in pending_uploads; upload_pending() inserts them into Postgres
+(ON CONFLICT (id) DO NOTHING, so retrying is safe) and clears the queue.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from . import metrics
+from .cache import CACHE_DIR
+from .models import Composition
+
+MIRROR_PATH = Path(os.environ.get("GROVETRACKS_MIRROR", CACHE_DIR / "mirror.sqlite3"))
+SYNC_BATCH = 5000
+SYNC_OVERLAP = 300.0  # seconds re-read before the last watermark
+
+SEED_COLUMNS = (
+    "id", "word", "source_key_id", "quality_score", "stroke_count", "total_point_count",
+    "composition_json", "curated_at", "source_type", "generation_method", "source_composition_ids",
+)
+QUICKDRAW_COLUMNS = ("key_id", "word", "country_code", "timestamp", "recognized", "drawing")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seed_compositions (
+    id TEXT PRIMARY KEY,
+    word TEXT NOT NULL,
+    source_key_id TEXT NOT NULL,
+    quality_score REAL NOT NULL,
+    stroke_count INTEGER NOT NULL,
+    total_point_count INTEGER NOT NULL,
+    composition_json TEXT NOT NULL,
+    curated_at TEXT NOT NULL,
+    source_type TEXT NOT NULL DEFAULT 'curated',
+    generation_method TEXT,
+    source_composition_ids TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_seed_compositions_word ON seed_compositions (word);
+CREATE INDEX IF NOT EXISTS ix_seed_compositions_quality_score ON seed_compositions (quality_score);
+CREATE INDEX IF NOT EXISTS ix_seed_compositions_source_type ON seed_compositions (source_type);
+CREATE INDEX IF NOT EXISTS ix_seed_compositions_word_source_quality
+    ON seed_compositions (word, source_type, quality_score DESC);
+
+CREATE TABLE IF NOT EXISTS quickdraw_simple_doodles (
+    key_id TEXT PRIMARY KEY,
+    word TEXT NOT NULL,
+    country_code TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    recognized INTEGER NOT NULL,
+    drawing TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_quickdraw_simple_doodles_word ON quickdraw_simple_doodles (word);
+
+CREATE TABLE IF NOT EXISTS pending_uploads (
+    id TEXT PRIMARY KEY,
+    queued_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_initialized: set[Path] = set()
+_init_lock = threading.Lock()
+
+
+def _iso(value: datetime) -> str:
+    """Fixed-width UTC timestamp, so the text column sorts and compares chronologically."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+@contextmanager
+def connect(path: str | Path | None = None):
+    """Context manager for a connection to the mirror, creating its tables on first use."""
+    path = Path(path) if path is not None else MIRROR_PATH
+    with _init_lock:
+        if path not in _initialized:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            conn.close()
+            _initialized.add(path)
+    conn = sqlite3.connect(path, timeout=30.0)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _state(conn: sqlite3.Connection, name: str) -> str | None:
+    row = conn.execute("SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_state(conn: sqlite3.Connection, name: str, value) -> None:
+    conn.execute(
+        "INSERT INTO sync_state (name, value) VALUES (?, ?) "
+        "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+        (name, None if value is None else str(value)),
+    )
+
+
+# --- Reads and writes used by helpers.db with the sqlite backend ---
+
+def get_curated(word: str, limit: int = 50) -> list[Composition]:
+    with connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT composition_json FROM seed_compositions
+            WHERE word = ? AND source_type = 'curated'
+            ORDER BY quality_score DESC
+            LIMIT ?
+            """,
+            (word, limit),
+        ).fetchall()
+    return [Composition.from_dict(json.loads(data)) for (data,) in rows]
+
+
+def get_curated_words() -> list[str]:
+    with connect() as conn:
+        rows = conn.execute(
+            "SELECT DISTINCT word FROM seed_compositions WHERE source_type = 'curated' ORDER BY word"
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def get_curated_stats(word: str) -> dict:
+    with connect() as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(
+            """
+            SELECT COUNT(*) as total,
+                   AVG(quality_score) as avg_quality,
+                   MIN(quality_score) as min_quality,
+                   MAX(quality_score) as max_quality,
+                   AVG(stroke_count) as avg_strokes,
+                   AVG(total_point_count) as avg_points
+            FROM seed_compositions
+            WHERE word = ? AND source_type = 'curated'
+            """,
+            (word,),
+        ).fetchone()
+    return dict(row) if row else {}
+
+
+def word_compositions(word: str) -> list[tuple[str, str]]:
+    """(id, composition_json) of every mirrored row for a word (for dedup.load_index)."""
+    with connect() as conn:
+        return conn.execute(
+            "SELECT id, composition_json FROM seed_compositions WHERE word = ?", (word,)
+        ).fetchall()
+
+
+def queue_rows(rows: list[tuple]) -> int:
+    """Insert seed rows (SEED_COLUMNS order up to generation_method) locally and queue
+    them for upload_pending(). Returns the number queued."""
+    now = _iso(datetime.now(timezone.utc))
+    with connect() as conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO seed_compositions ({', '.join(SEED_COLUMNS[:10])}) "
+            f"VALUES ({', '.join('?' * 10)})",
+            [(*row[:7], _iso(row[7]) if isinstance(row[7], datetime) else row[7], *row[8:10]) for row in rows],
+        )
+        conn.executemany("INSERT OR IGNORE INTO pending_uploads (id, queued_at) VALUES (?, ?)",
+                         [(row[0], now) for row in rows])
+        conn.commit()
+    metrics.incr("mirror.rows_queued", len(rows))
+    return len(rows)
+
+
+def pending_count() -> int:
+    with connect() as conn:
+        return conn.execute("SELECT COUNT(*) FROM pending_uploads").fetchone()[0]
+
+
+def upload_pending(batch_size: int = 500, verbose: bool = True) -> int:
+    """Insert queued local rows into Postgres and clear them from the queue. Returns rows sent."""
+    import psycopg2.extras
+    from .db import get_connection, invalidate_stats
+
+    columns = ", ".join(SEED_COLUMNS)
+    template = "(%s::uuid, %s, %s, %s, %s, %s, %s::jsonb, %s::timestamptz, %s, %s, %s)"
+    sent = 0
+    with connect() as local, get_connection() as conn:
+        while True:
+            rows = local.execute(
+                f"""
+                SELECT {", ".join(f"s.{c}" for c in SEED_COLUMNS)}
+                FROM pending_uploads p JOIN seed_compositions s ON s.id = p.id
+                ORDER BY p.queued_at
+                LIMIT ?
+                """,
+                (batch_size,),
+            ).fetchall()
+            if not rows:
+                break
+            with metrics.span("mirror.upload"), conn.cursor() as cur:
+                psycopg2.extras.execute_values(
+                    cur,
+                    f"INSERT INTO seed_compositions ({columns}) VALUES %s ON CONFLICT (id) DO NOTHING",
+                    rows, template=template, page_size=batch_size,
+                )
+                conn.commit()
+            local.executemany("DELETE FROM pending_uploads WHERE id = ?", [(row[0],) for row in rows])
+            local.commit()
+            sent += len(rows)
+            if verbose:
+                print(f"  uploaded {sent:,} rows")
+        # Queue entries whose local row is gone cannot be uploaded
+        local.execute("DELETE FROM pending_uploads WHERE id NOT IN (SELECT id FROM seed_compositions)")
+        local.commit()
+    if sent:
+        invalidate_stats()
+    metrics.incr("mirror.rows_uploaded", sent)
+    return sent
+
+
+# --- Sync from Postgres ---
+
+@dataclass
+class SyncReport:
+    seed_pulled: int = 0
+    seed_removed: int = 0
+    seed_recovered: int = 0  # rows older than the watermark found missing by id
+    full: bool = False
+    quickdraw_words: list[str] = field(default_factory=list)
+    quickdraw_rows: int = 0
+    seconds: float = 0.0
+
+    def format(self) -> str:
+        kind = "full" if self.full else "incremental"
+        lines = [f"seed_compositions: {self.seed_pulled:,} rows pulled ({kind}), {self.seed_removed:,} removed"]
+        if self.seed_recovered:
+            lines.append(f"  including {self.seed_recovered:,} older rows that were missing locally")
+        if self.quickdraw_words:
+            lines.append(f"quickdraw_simple_doodles: {self.quickdraw_rows:,} rows for "
+                         f"{len(self.quickdraw_words)} changed words")
+        lines.append(f"{self.seconds:.1f}s")
+        return "\n".join(lines)
+
+
+_SEED_SELECT = """
+    SELECT id::text, word, source_key_id, quality_score, stroke_count, total_point_count,
+           composition_json::text, curated_at, source_type, generation_method, source_composition_ids
+    FROM seed_compositions
+"""
+
+
+def _pull_seed(pg, local: sqlite3.Connection, where: str, params: dict, report: SyncReport,
+               batch_size: int, verbose: bool) -> str | None:
+    """Upsert the seed rows matching `where` into the mirror; returns their newest curated_at."""
+    newest = None
+    insert = (f"INSERT OR REPLACE INTO seed_compositions ({', '.join(SEED_COLUMNS)}) "
+              f"VALUES ({', '.join('?' * len(SEED_COLUMNS))})")
+    with pg.cursor(name="mirror_seed") as cur:
+        cur.itersize = batch_size
+        cur.execute(f"{_SEED_SELECT} WHERE {where}", params)
+        while True:
+            with metrics.span("mirror.fetch"):
+                rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            batch = [(*r[:7], _iso(r[7]), *r[8:]) for r in rows]
+            newest = max([newest or "", *(r[7] for r in batch)])
+            with metrics.span("mirror.write"):
+                local.executemany(insert, batch)
+                local.commit()
+            report.seed_pulled += len(rows)
+            if verbose:
+                print(f"  seed_compositions: {report.seed_pulled:,} rows")
+    return newest
+
+
+def _reconcile_seed(pg, local: sqlite3.Connection, report: SyncReport, batch_size: int, verbose: bool) -> None:
+    """Match the mirror's ids to Postgres: drop rows deleted upstream and pull rows the
+    watermark missed (e.g. uploaded from another mirror with an older curated_at)."""
+    with pg.cursor() as cur:
+        cur.execute("SELECT id::text FROM seed_compositions")
+        ids = [(row[0],) for row in cur]
+    local.execute("CREATE TEMP TABLE remote_ids (id TEXT PRIMARY KEY)")
+    try:
+        local.executemany("INSERT INTO remote_ids VALUES (?)", ids)
+        report.seed_removed = local.execute(
+            "DELETE FROM seed_compositions WHERE id NOT IN (SELECT id FROM pending_uploads) "
+            "AND id NOT IN (SELECT id FROM remote_ids)"
+        ).rowcount
+        missing = [row[0] for row in local.execute(
+            "SELECT id FROM remote_ids WHERE id NOT IN (SELECT id FROM seed_compositions)"
+        )]
+    finally:
+        local.execute("DROP TABLE remote_ids")
+    local.commit()
+
+    pulled = report.seed_pulled
+    for i in range(0, len(missing), batch_size):
+        _pull_seed(pg, local, "id = ANY(%(ids)s::uuid[])", {"ids": missing[i:i + batch_size]},
+                   report, batch_size, verbose)
+    report.seed_recovered = report.seed_pulled - pulled
+
+
+def _sync_seed(pg, local: sqlite3.Connection, report: SyncReport, full: bool, batch_size: int, verbose: bool) -> None:
+    from .db import id_checksum, seed_id_checksum
+
+    with pg.cursor() as cur:
+        cur.execute("SELECT COALESCE((SELECT n_tup_upd FROM pg_stat_user_tables WHERE relname = 'seed_compositions'), 0)")
+        updates = str(cur.fetchone()[0])
+    watermark = _state(local, "seed.watermark")
+    if watermark is None or updates != _state(local, "seed.updates"):
+        full = True
+    since = None
+    if not full:
+        since = datetime.fromisoformat(watermark) - timedelta(seconds=SYNC_OVERLAP)
+    report.full = full
+
+    newest = _pull_seed(pg, local, "%(since)s::timestamptz IS NULL OR curated_at >= %(since)s",
+                        {"since": since}, report, batch_size, verbose)
+    newest = max(newest or "", watermark or "") or None
+
+    with pg.cursor() as cur:
+        remote = seed_id_checksum(cur)
+    mirrored = id_checksum(row[0] for row in local.execute(
+        "SELECT id FROM seed_compositions WHERE id NOT IN (SELECT id FROM pending_uploads)"
+    ))
+    if mirrored != remote:
+        _reconcile_seed(pg, local, report, batch_size, verbose)
+
+    _set_state(local, "seed.watermark", newest)
+    _set_state(local, "seed.updates", updates)
+    local.commit()
+
+
+def _sync_quickdraw(pg, local: sqlite3.Connection, report: SyncReport, batch_size: int, verbose: bool) -> None:
+    with pg.cursor() as cur:
+        cur.execute("SELECT word, COUNT(*) FROM quickdraw_simple_doodles GROUP BY word")
+        remote = dict(cur.fetchall())
+    mirrored = dict(local.execute("SELECT word, COUNT(*) FROM quickdraw_simple_doodles GROUP BY word").fetchall())
+
+    for word in set(mirrored) - set(remote):
+        local.execute("DELETE FROM quickdraw_simple_doodles WHERE word = ?", (word,))
+    changed = sorted(w for w, n in remote.items() if mirrored.get(w) != n)
+    insert = (f"INSERT OR REPLACE INTO quickdraw_simple_doodles ({', '.join(QUICKDRAW_COLUMNS)}) "
+              f"VALUES ({', '.join('?' * len(QUICKDRAW_COLUMNS))})")
+    for word in changed:
+        local.execute("DELETE FROM quickdraw_simple_doodles WHERE word = ?", (word,))
+        with pg.cursor(name="mirror_quickdraw") as cur:
+            cur.itersize = batch_size
+            cur.execute(
+                """
+                SELECT key_id, word, country_code, timestamp, recognized, drawing::text
+                FROM quickdraw_simple_doodles WHERE word = %s
+                """,
+                (word,),
+            )
+            while True:
+                with metrics.span("mirror.fetch"):
+                    rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                with metrics.span("mirror.write"):
+                    local.executemany(insert, [(r[0], r[1], r[2], _iso(r[3]), int(r[4]), r[5]) for r in rows])
+                report.quickdraw_rows += len(rows)
+        local.commit()
+        if verbose:
+            print(f"  quickdraw_simple_doodles: {word} ({remote[word]:,} rows)")
+    report.quickdraw_words = changed
+    local.commit()
+
+
+def sync(quickdraw: bool = False, full: bool = False, batch_size: int = SYNC_BATCH, verbose: bool = True) -> SyncReport:
+    """Bring the mirror up to date with Postgres; see the module docstring for what is pulled."""
+    from .db import get_connection
+
+    report = SyncReport()
+    t0 = time.perf_counter()
+    with metrics.span("mirror.sync"), get_connection() as pg, connect() as local:
+        _sync_seed(pg, local, report, full, batch_size, verbose)
+        if quickdraw:
+            _sync_quickdraw(pg, local, report, batch_size, verbose)
+        _set_state(local, "synced_at", _iso(datetime.now(timezone.utc)))
+        local.commit()
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def status() -> dict:
+    """Row counts, queued uploads and sync times of the mirror."""
+    with connect() as conn:
+        info: dict = {"path": str(MIRROR_PATH)}
+        for table in ("seed_compositions", "quickdraw_simple_doodles", "pending_uploads"):
+            info[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        info["watermark"] = _state(conn, "seed.watermark")
+        info["synced_at"] = _state(conn, "synced_at")
+    return info
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Local SQLite mirror of the seed data")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync_cmd = commands.add_parser("sync", help="pull changes from Postgres")
+    sync_cmd.add_argument("--quickdraw", action="store_true", help="also mirror quickdraw_simple_doodles")
+    sync_cmd.add_argument("--full", action="store_true", help="pull every seed row, not just recent ones")
+    sync_cmd.add_argument("--batch-size", type=int, default=SYNC_BATCH)
+    commands.add_parser("upload", help="send rows saved against the mirror to Postgres")
+    commands.add_parser("status", help="show row counts and sync state")
+    args = parser.parse_args(argv)
+
+    if args.command in ("sync", "upload"):
+        try:
+            if args.command == "sync":
+                print(sync(quickdraw=args.quickdraw, full=args.full, batch_size=args.batch_size).format())
+            else:
+                print(f"Uploaded {upload_pending():,} rows")
+        except Exception as e:  # typically Postgres being unreachable
+            print(f"{args.command} failed: {type(e).__name__}: {e}".strip(), file=sys.stderr)
+            return 1
+    else:
+        for key, value in status().items():
+            print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -84,22 +84,168 @@ class AiStroke:
         return AiStroke(xs=list(d.get("xs", [])), ys=list(d.get("ys", [])))
 
 
-def ai_to_composition(ai_comp: AiComposition, generation_method: str = "notebook") -> Composition:
-    """Convert AiComposition (Ollama output) → Composition (DB format). Port of AiCompositionMapper."""
-    strokes = []
+def ai_to_composition(
+    ai_comp: AiComposition,
+    generation_method: str = "notebook",
+    resample_spacing: float | None = None,
+) -> Composition:
+    """Convert AiComposition (Ollama output) → Composition (DB format). Port of AiCompositionMapper.
+
+    With resample_spacing, strokes are then evened out along their arc length
+    (see helpers.resample), keeping corners.
+    """
+    return ai_to_scored_composition(ai_comp, generation_method, resample_spacing)[0]
+
+
+def ai_to_scored_composition(
+    ai_comp: AiComposition,
+    generation_method: str = "notebook",
+    resample_spacing: float | None = None,
+) -> tuple[Composition, bool, float]:
+    """ai_to_composition() plus its validate() result, scored while the strokes are built."""
+    from .builder import StrokeBuilder
+
+    builder = StrokeBuilder()
     for s in ai_comp.strokes:
-        if len(s.xs) < 2 or len(s.xs) != len(s.ys):
-            continue
-        clamped_xs = [round(max(0.0, min(1.0, x)), 3) for x in s.xs]
-        clamped_ys = [round(max(0.0, min(1.0, y)), 3) for y in s.ys]
-        strokes.append(Stroke(xs=clamped_xs, ys=clamped_ys, ts=[0.0]))
-
-    return Composition(
-        width=255,
-        height=255,
-        doodle_fragments=[DoodleFragment(strokes=strokes)],
-        tags=["ai-generated", generation_method, ai_comp.subject],
-    )
+        builder.add(s.xs, s.ys)
+
+    if resample_spacing is not None:
+        from .resample import resample_strokes
+        resampled = StrokeBuilder(precision=None, clamp=False)
+        for stroke in resample_strokes(builder.strokes, spacing=resample_spacing):
+            resampled.add_stroke(stroke)
+        builder = resampled
+
+    comp = builder.build(tags=["ai-generated", generation_method, ai_comp.subject])
+    return (comp, *builder.score())
+
+
+def _stroke_lists(ai_comp: AiComposition | dict) -> tuple[str, list[tuple[list, list]]]:
+    """(subject, [(xs, ys)]) from an AiComposition or its raw JSON dict."""
+    if isinstance(ai_comp, AiComposition):
+        return ai_comp.subject, [(s.xs, s.ys) for s in ai_comp.strokes]
+    return ai_comp.get("subject", ""), [(s.get("xs", []), s.get("ys", [])) for s in ai_comp.get("strokes", [])]
+
+
+def _clamp_round(values):
+    """round(max(0.0, min(1.0, v)), 3) over a float64 array, bit-for-bit."""
+    import numpy as np
+
+    clamped = np.clip(values, 0.0, 1.0) + 0.0  # + 0.0 turns -0.0 into 0.0, as max(0.0, -0.0) does
+    clamped[np.isnan(values)] = 1.0            # min(1.0, nan) is 1.0
+    rounded = np.round(clamped, 3)
+    # np.round scales by 1000 and rounds half to even, which can land on the other side of
+    # an exact decimal half from round(); redo anything within reach of one in Python
+    scaled = clamped * 1000.0
+    near_half = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in near_half.tolist():
+        rounded[i] = round(float(clamped[i]), 3)
+    return rounded
+
+
+def ai_to_scored_compositions(
+    ai_comps: list[AiComposition | dict],
+    generation_method: str = "notebook",
+    resample_spacing: float | None = None,
+) -> list[tuple[Composition, bool, float]]:
+    """ai_to_scored_composition() over a whole response at once, with NumPy.
+
+    Takes AiCompositions or the raw dicts of a parsed {"compositions": [...]} payload.
+    All kept strokes are clamped and rounded as one array and scored with
+    validate.score_arrays(); the output is identical to calling
+    ai_to_scored_composition() on each item. Payloads with non-numeric coordinates
+    take that per-item path, so they fail (or not) exactly as it does.
+    """
+    import numpy as np
+
+    from .validate import score_arrays
+
+    items = [_stroke_lists(c) for c in ai_comps]
+    flat_x: list = []
+    flat_y: list = []
+    lengths: list[int] = []
+    per_comp: list[int] = []
+    for _, strokes in items:
+        kept = 0
+        for xs, ys in strokes:
+            if len(xs) < 2 or len(xs) != len(ys):
+                continue
+            flat_x.extend(xs)
+            flat_y.extend(ys)
+            lengths.append(len(xs))
+            kept += 1
+        per_comp.append(kept)
+
+    if not {type(v) for v in flat_x} | {type(v) for v in flat_y} <= {float, int}:
+        return [
+            ai_to_scored_composition(c if isinstance(c, AiComposition) else AiComposition.from_dict(c),
+                                     generation_method, resample_spacing)
+            for c in ai_comps
+        ]
+
+    coords = _clamp_round(np.array([flat_x, flat_y], dtype=np.float64).reshape(-1)).reshape(2, -1)
+    xs_all, ys_all = coords[0].tolist(), coords[1].tolist()
+
+    comps: list[Composition] = []
+    offset = 0
+    stroke_iter = iter(lengths)
+    for (subject, _), kept in zip(items, per_comp):
+        strokes = []
+        for _ in range(kept):
+            n = next(stroke_iter)
+            strokes.append(Stroke(xs=xs_all[offset:offset + n], ys=ys_all[offset:offset + n], ts=[0.0]))
+            offset += n
+        if resample_spacing is not None:
+            from .resample import resample_strokes
+            strokes = resample_strokes(strokes, spacing=resample_spacing)
+        comps.append(Composition(
+            width=255,
+            height=255,
+            doodle_fragments=[DoodleFragment(strokes=strokes)],
+            tags=["ai-generated", generation_method, subject],
+        ))
+
+    if resample_spacing is not None:
+        # Resampling changes the points; summarize the final strokes instead
+        strokes = [s for c in comps for s in c.doodle_fragments[0].strokes]
+        per_comp = [len(c.doodle_fragments[0].strokes) for c in comps]
+        lengths = [len(s.xs) for s in strokes]
+        coords = np.array([[v for s in strokes for v in s.xs], [v for s in strokes for v in s.ys]],
+                          dtype=np.float64).reshape(2, -1)
+
+    n_comps = len(comps)
+    stroke_counts = np.array(per_comp, dtype=np.int64)
+    point_counts = np.zeros(n_comps, dtype=np.int64)
+    min_x = np.zeros(n_comps)
+    min_y = np.zeros(n_comps)
+    max_x = np.zeros(n_comps)
+    max_y = np.zeros(n_comps)
+    in_range = np.ones(n_comps, dtype=bool)
+    if lengths:
+        stroke_comp = np.repeat(np.arange(n_comps), stroke_counts)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        x, y = coords
+        has = stroke_counts > 0
+        np.add.at(point_counts, stroke_comp, lengths)
+        # Per-stroke extremes first, then per composition (min/max are exact, so order is free)
+        for out, arr, ufunc, init in ((min_x, x, np.minimum, np.inf), (min_y, y, np.minimum, np.inf),
+                                      (max_x, x, np.maximum, -np.inf), (max_y, y, np.maximum, -np.inf)):
+            acc = np.full(n_comps, init)
+            ufunc.at(acc, stroke_comp, ufunc.reduceat(arr, starts))
+            out[has] = acc[has]
+        in_range = (min_x >= 0.0) & (max_x <= 1.0) & (min_y >= 0.0) & (max_y <= 1.0)
+
+    is_valid, scores = score_arrays(stroke_counts, point_counts, min_x, min_y, max_x, max_y, in_range)
+    return [(comp, bool(ok), float(score)) for comp, ok, score in zip(comps, is_valid, scores)]
+
+
+def ai_to_compositions(
+    ai_comps: list[AiComposition | dict],
+    generation_method: str = "notebook",
+    resample_spacing: float | None = None,
+) -> list[Composition]:
+    """ai_to_composition() over a whole response at once; see ai_to_scored_compositions()."""
+    return [comp for comp, _, _ in ai_to_scored_compositions(ai_comps, generation_method, resample_spacing)]
 
 
 def compositions_to_few_shot(subject: str, compositions: list[Composition]) -> str:
@@ -1,9 +1,10 @@
 """Ollama HTTP client for composition generation."""
 
 import os
-import json
-import re
-import httpx
+
+from . import metrics
+from .jsonparse import parse_json, salvage_json
+from .pool import get_pool
 
 DEFAULT_URL = os.environ.get("OLLAMA_URL", "http://10.0.0.148:11434")
 DEFAULT_MODEL = os.environ.get("OLLAMA_MODEL", "qwen2.5:14b")
@@ -91,37 +92,7 @@ DO NOT:
 
 def _parse_response_json(text: str) -> dict:
     """Parse JSON from model response, handling truncation and markdown fencing."""
-    # Try raw parse first
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-
-    # Strip markdown code fences
-    match = re.search(r"```(?:json)?\s*\n?(.*?)\n?\s*```", text, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group(1))
-        except json.JSONDecodeError:
-            text = match.group(1)
-
-    # Truncated JSON — salvage complete compositions
-    # Find the last complete composition object (ends with })
-    # Pattern: find all complete {"subject":...,"strokes":[...]} objects
-    compositions = []
-    for m in re.finditer(
-        r'\{"subject"\s*:\s*"[^"]*"\s*,\s*"strokes"\s*:\s*\[(?:[^\]]*\])*\s*\]\s*\}',
-        text,
-    ):
-        try:
-            compositions.append(json.loads(m.group()))
-        except json.JSONDecodeError:
-            continue
-
-    if compositions:
-        return {"compositions": compositions}
-
-    raise json.JSONDecodeError("No valid JSON found in response", text, 0)
+    return parse_json(text)
 
 
 def call_ollama(
@@ -132,10 +103,38 @@ def call_ollama(
     top_p: float = 0.9,
     repeat_penalty: float = 1.1,
     num_predict: int = 8192,
-    url: str = DEFAULT_URL,
+    url: str | None = None,
     timeout: float = 600.0,
 ) -> dict:
-    """Call Ollama /api/chat and return the parsed response content as a dict."""
+    """Call Ollama /api/chat and return the parsed response content as a dict.
+
+    With url=None the request goes through the shared OllamaPool (see helpers.pool);
+    pass an explicit url to pin a single host.
+    """
+    data, _ = call_ollama_with_usage(
+        messages, model=model, schema=schema, temperature=temperature, top_p=top_p,
+        repeat_penalty=repeat_penalty, num_predict=num_predict, url=url, timeout=timeout,
+    )
+    return data
+
+
+def call_ollama_with_usage(
+    messages: list[dict],
+    model: str = DEFAULT_MODEL,
+    schema: dict | None = None,
+    temperature: float = 0.3,
+    top_p: float = 0.9,
+    repeat_penalty: float = 1.1,
+    num_predict: int = 8192,
+    url: str | None = None,
+    timeout: float = 600.0,
+) -> tuple[dict, dict]:
+    """Like call_ollama(), but returns (data, usage_info).
+
+    usage_info has input_tokens / output_tokens (prompt_eval_count / eval_count),
+    done_reason ("stop", or "length" when num_predict cut the reply off) and
+    truncated, which is also set when the JSON had to be salvaged from a partial reply.
+    """
     body = {
         "model": model,
         "messages": messages,
@@ -150,17 +149,34 @@ def call_ollama(
     if schema is not None:
         body["format"] = schema
 
-    response = httpx.post(f"{url}/api/chat", json=body, timeout=timeout)
-    response.raise_for_status()
+    def post(host_url: str) -> dict:
+        import httpx
+
+        response = httpx.post(f"{host_url}/api/chat", json=body, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
 
-    result = response.json()
+    with metrics.span("ollama.http"):
+        result = post(url) if url is not None else get_pool().request(model, post)
     content = result.get("message", {}).get("content", "")
 
-    return _parse_response_json(content) if content else {}
+    data, salvaged = {}, False
+    if content:
+        with metrics.span("ollama.parse"):
+            data, salvaged = salvage_json(content)
+    usage_info = {
+        "input_tokens": result.get("prompt_eval_count", 0),
+        "output_tokens": result.get("eval_count", 0),
+        "done_reason": result.get("done_reason"),
+        "truncated": salvaged or result.get("done_reason") == "length",
+    }
+    return data, usage_info
 
 
 def check_connection(url: str = DEFAULT_URL, model: str = DEFAULT_MODEL) -> str:
     """Check Ollama connectivity and model availability."""
+    import httpx
+
     try:
         resp = httpx.get(f"{url}/api/tags", timeout=10)
         resp.raise_for_status()
@@ -172,6 +188,22 @@ def check_connection(url: str = DEFAULT_URL, model: str = DEFAULT_MODEL) -> str:
         return f"Failed to connect to {url}: {e}"
 
 
+def check_pool(model: str = DEFAULT_MODEL) -> str:
+    """Probe every host in the shared pool and report health and model availability."""
+    pool = get_pool()
+    pool.refresh(force=True)
+    lines = []
+    for h in pool.status():
+        if not h["healthy"]:
+            state = f"DOWN (retry in {h['readmit_in']:.0f}s)"
+        elif model.lower() in h["models"] or f"{model.lower()}:latest" in h["models"]:
+            state = f"up, '{model}' available, {h['in_flight']} in flight"
+        else:
+            state = f"up, '{model}' not found"
+        lines.append(f"{h['url']}: {state}")
+    return "\n".join(lines)
+
+
 def build_few_shot_messages(
     subject: str,
     per_subject: int,
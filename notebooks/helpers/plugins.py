@@ -4,6 +4,8 @@ Each plugin is a function that returns a string to append to either the system o
 Plugins can be combined using combine_system_prompt() and combine_user_prompt().
 """
 
+import numpy as np
+
 from .models import Composition, compositions_to_few_shot
 
 
@@ -108,17 +110,81 @@ def subject_tips_plugin(subject: str) -> str:
     return SUBJECT_TIPS.get(subject, "")
 
 
+# --- Few-Shot Selection (token-budgeted, diversity-aware) ---
+
+# Tokens for the "Draw N distinct variations of: X" turn and message framing around each pair
+PAIR_OVERHEAD_TOKENS = 16
+
+
+def select_few_shot(
+    subject: str,
+    curated: list[Composition],
+    token_budget: int,
+    diversity: float = 0.5,
+    cost_weight: float = 0.1,
+    chunk_size: int = 2,
+    store=None,
+) -> list[Composition]:
+    """Pick a high-quality, mutually dissimilar subset of curated that fits token_budget.
+
+    Greedy maximal-marginal-relevance: each step takes the candidate maximizing
+    (1 - diversity) * quality + diversity * novelty - cost_weight * tokens / budget,
+    where novelty is the cosine distance to the nearest already-selected example.
+    Features and token costs come from the FeatureStore, so repeat calls are cheap.
+    Returned in selection order (best first).
+    """
+    from .features import default_store
+
+    if not curated or token_budget <= 0:
+        return []
+
+    table = (store or default_store()).table(subject, curated)
+    feats = table.features
+    quality = table.quality.astype(np.float64)
+    cost = table.tokens.astype(np.float64) + PAIR_OVERHEAD_TOKENS / max(chunk_size, 1)
+
+    q_range = quality.max() - quality.min()
+    quality_norm = (quality - quality.min()) / q_range if q_range > 0 else np.ones_like(quality)
+
+    novelty = np.ones(len(curated))
+    available = np.ones(len(curated), dtype=bool)
+    remaining = float(token_budget)
+    selected: list[int] = []
+
+    while True:
+        candidates = available & (cost <= remaining)
+        if not candidates.any():
+            break
+        utility = (1.0 - diversity) * quality_norm + diversity * novelty - cost_weight * cost / token_budget
+        utility[~candidates] = -np.inf
+        best = int(np.argmax(utility))
+
+        selected.append(best)
+        available[best] = False
+        remaining -= cost[best]
+        novelty = np.minimum(novelty, 1.0 - feats @ feats[best])
+
+    return [curated[i] for i in selected]
+
+
 # --- Few-Shot Builder (returns conversation pairs, not a prompt string) ---
 
 def build_few_shot_pairs_from_curated(
     subject: str,
     curated: list[Composition],
     chunk_size: int = 2,
+    token_budget: int | None = None,
 ) -> list[tuple[str, str]]:
     """Build few-shot conversation pairs from curated compositions.
 
+    With token_budget set, the examples are first narrowed by select_few_shot() so the
+    few-shot turns stay under that many (estimated) prompt tokens.
+
     Returns list of (user_prompt, assistant_response) tuples for multi-turn few-shot.
     """
+    if token_budget is not None:
+        curated = select_few_shot(subject, curated, token_budget, chunk_size=chunk_size)
+
     pairs = []
     for i in range(0, len(curated), chunk_size):
         chunk = curated[i:i + chunk_size]
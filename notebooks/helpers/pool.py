@@ -0,0 +1,202 @@
+"""Multi-host Ollama endpoint pool with health checks and least-loaded routing."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def _urls_from_env() -> list[str]:
+    raw = os.environ.get("OLLAMA_URLS") or os.environ.get("OLLAMA_URL", "http://10.0.0.148:11434")
+    return [u.strip().rstrip("/") for u in raw.split(",") if u.strip()]
+
+
+DEFAULT_URLS = _urls_from_env()
+
+
+class NoHealthyHostError(RuntimeError):
+    """Raised when no healthy host in the pool serves the requested model."""
+
+
+@dataclass
+class OllamaHost:
+    url: str
+    models: set[str] = field(default_factory=set)
+    healthy: bool = False
+    in_flight: int = 0
+    failures: int = 0
+    ejected_until: float = 0.0
+    last_probe: float = 0.0
+
+    def has_model(self, model: str) -> bool:
+        name = model.lower()
+        return name in self.models or (":" not in name and f"{name}:latest" in self.models)
+
+
+class OllamaPool:
+    """Routes each request to the least-loaded healthy host that has the model.
+
+    Hosts are probed via /api/tags for their model list. A host that fails
+    eject_after times in a row is ejected for an exponentially growing cooldown,
+    then re-probed and re-admitted once /api/tags answers again.
+    """
+
+    def __init__(
+        self,
+        urls: list[str] | None = None,
+        probe_interval: float = 60.0,
+        probe_timeout: float = 5.0,
+        eject_after: int = 2,
+        base_cooldown: float = 15.0,
+        max_cooldown: float = 300.0,
+    ):
+        self.hosts = [OllamaHost(url=u.rstrip("/")) for u in (urls or DEFAULT_URLS)]
+        if not self.hosts:
+            raise ValueError("OllamaPool needs at least one host URL")
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.eject_after = eject_after
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+
+    def probe(self, host: OllamaHost) -> bool:
+        """Refresh one host's model list and health from /api/tags."""
+        import httpx
+
+        try:
+            resp = httpx.get(f"{host.url}/api/tags", timeout=self.probe_timeout)
+            resp.raise_for_status()
+            models = {m.get("name", "").lower() for m in resp.json().get("models", [])}
+        except Exception:
+            with self._lock:
+                host.last_probe = time.monotonic()
+                self._record_failure(host)
+            return False
+
+        with self._lock:
+            host.models = models
+            host.last_probe = time.monotonic()
+            host.healthy = True
+            host.failures = 0
+            host.ejected_until = 0.0
+        return True
+
+    def refresh(self, force: bool = False) -> None:
+        """Probe hosts whose info is stale, and ejected hosts whose cooldown has expired."""
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                h for h in self.hosts
+                if force
+                or (h.healthy and now - h.last_probe >= self.probe_interval)
+                or (not h.healthy and now >= h.ejected_until)
+            ]
+        for host in due:
+            self.probe(host)
+
+    def _record_failure(self, host: OllamaHost) -> None:
+        host.failures += 1
+        if host.failures >= self.eject_after or not host.healthy:
+            host.healthy = False
+            cooldown = self.base_cooldown * 2 ** max(0, host.failures - self.eject_after)
+            host.ejected_until = time.monotonic() + min(cooldown, self.max_cooldown)
+
+    def acquire(self, model: str) -> OllamaHost:
+        """Reserve the least-loaded healthy host serving model. Pair with release()."""
+        self.refresh()
+        with self._lock:
+            candidates = [h for h in self.hosts if h.healthy and h.has_model(model)]
+            if not candidates:
+                healthy = [h.url for h in self.hosts if h.healthy]
+                raise NoHealthyHostError(
+                    f"No healthy Ollama host has model '{model}' (healthy hosts: {healthy or 'none'})"
+                )
+            host = min(candidates, key=lambda h: (h.in_flight, h.failures))
+            host.in_flight += 1
+            return host
+
+    def release(self, host: OllamaHost, ok: bool) -> None:
+        with self._lock:
+            host.in_flight -= 1
+            if ok:
+                host.failures = 0
+            else:
+                self._record_failure(host)
+
+    def request(self, model: str, fn: Callable[[str], T]) -> T:
+        """Call fn(host_url) on a pooled host, failing over to other hosts on connection errors.
+
+        HTTP error statuses other than 5xx are the caller's problem and are not retried.
+        """
+        import httpx
+
+        last_error: Exception | None = None
+        for _ in range(len(self.hosts)):
+            try:
+                host = self.acquire(model)
+            except NoHealthyHostError:
+                if last_error is not None:
+                    raise last_error
+                raise
+            try:
+                result = fn(host.url)
+            except httpx.HTTPStatusError as e:
+                failed = e.response.status_code >= 500
+                self.release(host, ok=not failed)
+                if not failed:
+                    raise
+                last_error = e
+            except httpx.TransportError as e:
+                self.release(host, ok=False)
+                last_error = e
+            except BaseException:
+                self.release(host, ok=True)
+                raise
+            else:
+                self.release(host, ok=True)
+                return result
+        assert last_error is not None
+        raise last_error
+
+    def status(self) -> list[dict]:
+        """Snapshot of every host for display in a notebook."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": h.url,
+                    "healthy": h.healthy,
+                    "in_flight": h.in_flight,
+                    "failures": h.failures,
+                    "models": sorted(h.models),
+                    "readmit_in": round(max(0.0, h.ejected_until - now), 1) if not h.healthy else 0.0,
+                }
+                for h in self.hosts
+            ]
+
+
+_pool: OllamaPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> OllamaPool:
+    """The shared pool, configured from OLLAMA_URLS (comma-separated) or OLLAMA_URL."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OllamaPool()
+        return _pool
+
+
+def configure_pool(urls: list[str], **kwargs) -> OllamaPool:
+    """Replace the shared pool with one built from an explicit list of host URLs."""
+    global _pool
+    with _pool_lock:
+        _pool = OllamaPool(urls, **kwargs)
+        return _pool
@@ -0,0 +1,274 @@
+"""Bulk rescoring of seed_compositions after the scoring rules in validate.py change.
+
+    python -m helpers.rescore [--dry-run] [--workers 4] [--words cat dog ...] [--restart]
+
+Each word is handled by its own worker process: rows are streamed with a server-side
+cursor, summarized (counts, bounding box, range check) straight from the JSON, scored
+a batch at a time with validate.score_arrays(), and only rows whose score or counts
+differ are written back with one UPDATE ... FROM (VALUES ...) per batch, each batch in
+its own transaction. Finished words are recorded in a progress file, so an
+interrupted run picks up where it left off; the record is keyed by a hash of
+validate.py, so editing the scoring rules starts a fresh pass.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import psycopg2.extras
+
+from .cache import CACHE_DIR
+from .db import get_connection, invalidate_stats
+from .validate import score_arrays
+
+BATCH_SIZE = 2000
+HIST_BINS = 10
+PROGRESS_PATH = CACHE_DIR / "rescore_progress.json"
+
+_UPDATE_SQL = """
+    UPDATE seed_compositions AS s
+    SET quality_score = v.quality_score,
+        stroke_count = v.stroke_count,
+        total_point_count = v.total_point_count
+    FROM (VALUES %s) AS v(id, quality_score, stroke_count, total_point_count)
+    WHERE s.id = v.id
+"""
+_UPDATE_TEMPLATE = "(%s::uuid, %s::double precision, %s::integer, %s::integer)"
+
+
+def scoring_version() -> str:
+    """Hash of validate.py — progress from a run with different scoring rules is discarded."""
+    return hashlib.sha1(Path(__file__).with_name("validate.py").read_bytes()).hexdigest()[:12]
+
+
+def summarize(data: dict) -> tuple[int, int, float, float, float, float, bool]:
+    """(strokes, points, min_x, min_y, max_x, max_y, in_range) for raw composition JSON.
+
+    Same semantics as count_strokes / count_points / bounding_box / _coords_in_range,
+    without building Composition objects.
+    """
+    strokes = points = 0
+    inf = float("inf")
+    min_x = min_y = inf
+    max_x = max_y = -inf
+    in_range = True
+    for frag in data.get("doodleFragments", []):
+        for stroke in frag.get("strokes", []):
+            strokes += 1
+            coords = stroke.get("data", [[], [], [0]])
+            xs = coords[0] if len(coords) > 0 else []
+            ys = coords[1] if len(coords) > 1 else []
+            points += len(xs)
+            if xs:
+                lo, hi = min(xs), max(xs)
+                min_x, max_x = min(min_x, lo), max(max_x, hi)
+                in_range = in_range and lo >= 0.0 and hi <= 1.0
+            if ys:
+                lo, hi = min(ys), max(ys)
+                min_y, max_y = min(min_y, lo), max(max_y, hi)
+                in_range = in_range and lo >= 0.0 and hi <= 1.0
+    if min_x == inf:
+        return strokes, points, 0.0, 0.0, 0.0, 0.0, in_range
+    return strokes, points, min_x, min_y, max_x, max_y, in_range
+
+
+@dataclass
+class WordResult:
+    """Outcome for one word; histograms are over [0, 1] in HIST_BINS bins."""
+    word: str
+    rows: int = 0
+    changed: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+    old_sum: float = 0.0
+    new_sum: float = 0.0
+    old_hist: list[int] = field(default_factory=lambda: [0] * HIST_BINS)
+    new_hist: list[int] = field(default_factory=lambda: [0] * HIST_BINS)
+
+
+def _histogram(scores: np.ndarray) -> np.ndarray:
+    return np.bincount(np.clip((scores * HIST_BINS).astype(np.int64), 0, HIST_BINS - 1), minlength=HIST_BINS)
+
+
+def _score_batch(rows: list, result: WordResult) -> list[tuple]:
+    """Score one fetched batch, fold it into result, and return the rows to update."""
+    summaries = [summarize(json.loads(data) if isinstance(data, str) else data) for _, data, *_ in rows]
+    columns = list(zip(*summaries))
+    is_valid, new_scores = score_arrays(*columns)
+    strokes = np.asarray(columns[0], dtype=np.int64)
+    points = np.asarray(columns[1], dtype=np.int64)
+
+    old_scores = np.array([r[2] if r[2] is not None else np.nan for r in rows], dtype=np.float64)
+    old_strokes = np.array([r[3] if r[3] is not None else -1 for r in rows], dtype=np.int64)
+    old_points = np.array([r[4] if r[4] is not None else -1 for r in rows], dtype=np.int64)
+    changed = np.flatnonzero((old_scores != new_scores) | (old_strokes != strokes) | (old_points != points))
+
+    known = ~np.isnan(old_scores)
+    result.rows += len(rows)
+    result.changed += len(changed)
+    result.invalid += int((~is_valid).sum())
+    result.old_sum += float(old_scores[known].sum())
+    result.new_sum += float(new_scores.sum())
+    result.old_hist = (np.asarray(result.old_hist) + _histogram(old_scores[known])).tolist()
+    result.new_hist = (np.asarray(result.new_hist) + _histogram(new_scores)).tolist()
+
+    return [(str(rows[i][0]), float(new_scores[i]), int(strokes[i]), int(points[i])) for i in changed]
+
+
+def rescore_word(word: str, batch_size: int = BATCH_SIZE, dry_run: bool = False) -> WordResult:
+    """Rescore every row of one word. Runs in a worker process; opens its own connections."""
+    result = WordResult(word)
+    t0 = time.perf_counter()
+    with get_connection() as read_conn, get_connection() as write_conn:
+        with read_conn.cursor(name=f"rescore_{hashlib.md5(word.encode()).hexdigest()[:8]}") as cur:
+            cur.itersize = batch_size
+            cur.execute(
+                """
+                SELECT id, composition_json, quality_score, stroke_count, total_point_count
+                FROM seed_compositions
+                WHERE word = %s
+                """,
+                (word,),
+            )
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                updates = _score_batch(rows, result)
+                if updates and not dry_run:
+                    with write_conn.cursor() as wcur:
+                        psycopg2.extras.execute_values(
+                            wcur, _UPDATE_SQL, updates, template=_UPDATE_TEMPLATE, page_size=batch_size,
+                        )
+                    write_conn.commit()
+    result.seconds = time.perf_counter() - t0
+    return result
+
+
+def _load_progress(path: Path, version: str) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+    progress = json.loads(path.read_text())
+    if progress.get("scoring") != version:
+        return {}
+    return progress.get("done", {})
+
+
+def _save_progress(path: Path, version: str, done: dict[str, dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"scoring": version, "done": done}))
+    tmp.replace(path)
+
+
+@dataclass
+class RescoreReport:
+    results: list[WordResult]
+    seconds: float
+    resumed: int = 0
+
+    def _total(self, attr: str) -> float:
+        return sum(getattr(r, attr) for r in self.results)
+
+    def format(self) -> str:
+        rows = int(self._total("rows"))
+        old_n = sum(sum(r.old_hist) for r in self.results)
+        old_hist = np.sum([r.old_hist for r in self.results], axis=0) if self.results else np.zeros(HIST_BINS)
+        new_hist = np.sum([r.new_hist for r in self.results], axis=0) if self.results else np.zeros(HIST_BINS)
+        fresh = sum(r.rows for r in self.results[self.resumed:])
+        lines = [
+            f"Rescored {rows} rows across {len(self.results)} words "
+            f"({self.resumed} words from a previous run)",
+            f"  this run: {fresh} rows in {self.seconds:.1f}s ({fresh / self.seconds if self.seconds else 0:.0f} rows/s)",
+            f"  changed: {int(self._total('changed'))}   invalid under current rules: {int(self._total('invalid'))}",
+            f"  mean score: {self._total('old_sum') / old_n if old_n else float('nan'):.4f}"
+            f" -> {self._total('new_sum') / rows if rows else float('nan'):.4f}",
+            "  score bucket     before      after",
+        ]
+        for i in range(HIST_BINS):
+            lo, hi = i / HIST_BINS, (i + 1) / HIST_BINS
+            lines.append(f"  [{lo:.1f}, {hi:.1f})  {int(old_hist[i]):>10}  {int(new_hist[i]):>9}")
+        return "\n".join(lines)
+
+
+def rescore(
+    words: list[str] | None = None,
+    workers: int = 4,
+    batch_size: int = BATCH_SIZE,
+    dry_run: bool = False,
+    restart: bool = False,
+    progress_path: Path = PROGRESS_PATH,
+    on_result: Callable[[WordResult], None] | None = None,
+) -> RescoreReport:
+    """Recompute quality_score / stroke_count / total_point_count for the given words (default all).
+
+    dry_run scores everything and reports the shift without writing rows or progress.
+    on_result, if given, receives each finished WordResult instead of it being printed.
+    """
+    if words is None:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT DISTINCT word FROM seed_compositions ORDER BY word")
+                words = [row[0] for row in cur.fetchall()]
+
+    version = scoring_version()
+    done = {} if restart or dry_run else _load_progress(progress_path, version)
+    results = [WordResult(**done[w]) for w in words if w in done]
+    resumed = len(results)
+    pending = [w for w in words if w not in done]
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(rescore_word, w, batch_size, dry_run): w for w in pending}
+        for future in as_completed(futures):
+            word = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  {word}: ERROR {e}")
+                continue
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+            else:
+                print(f"  {word}: {result.rows} rows, {result.changed} changed ({result.seconds:.1f}s)")
+            if not dry_run:
+                done[word] = result.__dict__
+                _save_progress(progress_path, version, done)
+
+    if not dry_run:
+        invalidate_stats()
+    return RescoreReport(results=results, seconds=time.perf_counter() - t0, resumed=resumed)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute stored quality scores with the current validate.py")
+    parser.add_argument("--words", nargs="*", help="only these words (default: every word in the table)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="score and report without writing")
+    parser.add_argument("--restart", action="store_true", help="ignore progress from an interrupted run")
+    args = parser.parse_args(argv)
+
+    report = rescore(
+        words=args.words or None,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        restart=args.restart,
+    )
+    print(report.format())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""Top-k similarity search over seed_compositions using a local memory-mapped vector index.
+
+Each stored composition is reduced to its shape_features() vector (L2-normalized, so a
+dot product is cosine similarity). Vectors live in one flat float32 file under
+CACHE_DIR/similarity that is appended to by refresh() and memory-mapped for queries;
+a brute-force matrix-vector product over a few hundred thousand 50-dim rows takes a
+few milliseconds, with no ANN structure to build or keep in sync.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from .cache import CACHE_DIR
+from .features import FEATURE_DIM, shape_features
+from .models import Composition
+
+REFRESH_BATCH = 2000
+REFRESH_OVERLAP = 300.0   # seconds re-read before the watermark, for rows that committed late
+INDEX_MAX_AGE = 300.0     # get_index() refreshes once the last refresh is older than this
+
+
+@dataclass
+class SimilarMatch:
+    """One search hit: the seed_compositions row id and its cosine similarity to the query."""
+    id: str
+    word: str
+    source_type: str
+    similarity: float
+
+
+class SimilarityIndex:
+    """Vector index mirroring seed_compositions, refreshed by curated_at.
+
+    Files: vectors.f32 (row-major N×FEATURE_DIM), rows.jsonl (id, word, source_type per
+    row) and state.json (row count, rows.jsonl size and curated_at watermark). New rows
+    are appended; the files are only rewritten when rows are deleted upstream. The state
+    file is written last, so a crash mid-append leaves the previous consistent state,
+    and one mid-rewrite leaves files that disagree with it, which _load() discards.
+    """
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root) if root is not None else CACHE_DIR / "similarity"
+        self._vectors_path = self.root / "vectors.f32"
+        self._rows_path = self.root / "rows.jsonl"
+        self._state_path = self.root / "state.json"
+        self.watermark: str | None = None
+        self._rows_bytes = 0
+        self.ids: list[str] = []
+        self.words: list[str] = []
+        self.source_types: list[str] = []
+        self._vectors = np.zeros((0, FEATURE_DIM), dtype=np.float32)
+        self._groups: dict[tuple[str | None, str | None], np.ndarray] | None = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _load(self) -> None:
+        if not self._state_path.exists():
+            return
+        state = json.loads(self._state_path.read_text())
+        count = state["count"]
+        if state.get("dim") != FEATURE_DIM:
+            # Feature layout changed; start over rather than mix incompatible vectors
+            self.clear()
+            return
+
+        ids, words, sources = [], [], []
+        with open(self._rows_path, encoding="utf-8") as f:
+            for line, _ in zip(f, range(count)):
+                row = json.loads(line)
+                ids.append(row["id"])
+                words.append(row["word"])
+                sources.append(row["source_type"])
+        if len(ids) < count or self._vectors_path.stat().st_size < count * FEATURE_DIM * 4:
+            # Interrupted rewrite (see _remove); rebuild rather than trust the files
+            self.clear()
+            return
+
+        self.watermark = state["watermark"]
+        self._rows_bytes = state["rows_bytes"]
+        self.ids, self.words, self.source_types = ids, words, sources
+        self._map_vectors()
+
+    def _map_vectors(self) -> None:
+        count = len(self.ids)
+        self._vectors = (
+            np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, FEATURE_DIM))
+            if count else np.zeros((0, FEATURE_DIM), dtype=np.float32)
+        )
+        self._groups = None
+
+    def clear(self) -> None:
+        """Delete the on-disk index; the next refresh() rebuilds it from scratch."""
+        for path in (self._vectors_path, self._rows_path, self._state_path):
+            path.unlink(missing_ok=True)
+        self.__init__(self.root)
+
+    def _write_state(self, count: int, rows_bytes: int, watermark: str | None) -> None:
+        self._state_path.write_text(json.dumps({
+            "count": count,
+            "dim": FEATURE_DIM,
+            "rows_bytes": rows_bytes,
+            "watermark": watermark,
+        }))
+
+    def _append(self, rows: list[tuple[str, str, str]], vectors: np.ndarray, watermark: str) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        count = len(self.ids)
+        # Drop anything a previous interrupted append left past the committed count
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(count * FEATURE_DIM * 4)
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self._rows_path, "ab") as f:
+            f.truncate(self._rows_bytes)
+            f.writelines(_row_line(*row) for row in rows)
+            rows_bytes = f.tell()
+        self._write_state(count + len(rows), rows_bytes, watermark)
+
+        self.watermark = watermark
+        self._rows_bytes = rows_bytes
+        for row_id, word, source_type in rows:
+            self.ids.append(row_id)
+            self.words.append(word)
+            self.source_types.append(source_type)
+        self._map_vectors()
+
+    def _remove(self, ids: set[str]) -> None:
+        """Rewrite the files without the given rows."""
+        keep = [i for i, row_id in enumerate(self.ids) if row_id not in ids]
+        vectors = np.ascontiguousarray(self._vectors[keep], dtype=np.float32)
+        rows = [(self.ids[i], self.words[i], self.source_types[i]) for i in keep]
+        tmp_vectors = self._vectors_path.with_suffix(".tmp")
+        tmp_rows = self._rows_path.with_suffix(".tmp")
+        tmp_vectors.write_bytes(vectors.tobytes())
+        with open(tmp_rows, "wb") as f:
+            f.writelines(_row_line(*row) for row in rows)
+            rows_bytes = f.tell()
+        self._vectors = vectors  # let go of the memory map before its file is replaced
+        tmp_vectors.replace(self._vectors_path)
+        tmp_rows.replace(self._rows_path)
+        self._write_state(len(rows), rows_bytes, self.watermark)
+
+        self._rows_bytes = rows_bytes
+        self.ids = [row[0] for row in rows]
+        self.words = [row[1] for row in rows]
+        self.source_types = [row[2] for row in rows]
+        self._map_vectors()
+
+    def _pull(self, conn, where: str, params: dict, verbose: bool) -> int:
+        """Index the rows matching `where` that are not indexed yet; returns how many."""
+        known = set(self.ids)
+        added = 0
+        with conn.cursor(name="similarity_refresh") as cur:
+            cur.itersize = REFRESH_BATCH
+            cur.execute(
+                f"""
+                SELECT id, word, source_type, composition_json, curated_at
+                FROM seed_compositions
+                WHERE {where}
+                ORDER BY curated_at
+                """,
+                params,
+            )
+            while True:
+                batch = cur.fetchmany(REFRESH_BATCH)
+                if not batch:
+                    break
+                rows, vectors = [], []
+                for row_id, word, source_type, data, curated_at in batch:
+                    row_id = str(row_id)
+                    if row_id in known:
+                        continue
+                    if isinstance(data, str):
+                        data = json.loads(data)
+                    rows.append((row_id, word, source_type))
+                    vectors.append(shape_features(Composition.from_dict(data)))
+                    known.add(row_id)
+                if rows:
+                    watermark = _later(self.watermark, batch[-1][4])
+                    self._append(rows, np.stack(vectors), watermark)
+                    added += len(rows)
+                    if verbose:
+                        print(f"  indexed {len(self)} rows (through {watermark})")
+        return added
+
+    def refresh(self, verbose: bool = False) -> int:
+        """Bring the index up to date with seed_compositions. Returns the number of new rows.
+
+        Rows are streamed with a server-side cursor in curated_at order, starting
+        REFRESH_OVERLAP before the watermark: curated_at is stamped before the INSERT
+        commits, so concurrent savers can commit rows older than ones already seen.
+        Re-read rows are skipped by id. If the indexed ids still do not match the table
+        (db.seed_id_checksum), they are compared one by one: rows deleted upstream are
+        removed and any that committed later still are pulled by id.
+        """
+        from .db import get_connection, id_checksum, seed_id_checksum
+
+        since = None
+        if self.watermark is not None:
+            since = datetime.fromisoformat(self.watermark) - timedelta(seconds=REFRESH_OVERLAP)
+        with get_connection() as conn:
+            added = self._pull(conn, "%(since)s::timestamptz IS NULL OR curated_at >= %(since)s",
+                               {"since": since}, verbose)
+            with conn.cursor() as cur:
+                remote = seed_id_checksum(cur)
+            if remote != id_checksum(self.ids):
+                with conn.cursor() as cur:
+                    cur.execute("SELECT id::text FROM seed_compositions")
+                    remote_ids = {row[0] for row in cur}
+                gone = set(self.ids) - remote_ids
+                if gone:
+                    self._remove(gone)
+                    if verbose:
+                        print(f"  removed {len(gone)} rows deleted upstream")
+                missing = list(remote_ids - set(self.ids))
+                for i in range(0, len(missing), REFRESH_BATCH):
+                    added += self._pull(conn, "id = ANY(%(ids)s::uuid[])",
+                                        {"ids": missing[i:i + REFRESH_BATCH]}, verbose)
+        return added
+
+    def _candidates(self, word: str | None, source_type: str | None) -> np.ndarray | None:
+        """Row numbers matching the filters (None means every row), from cached groupings."""
+        if word is None and source_type is None:
+            return None
+        if self._groups is None:
+            groups: dict[tuple[str | None, str | None], list[int]] = {}
+            for i, (w, src) in enumerate(zip(self.words, self.source_types)):
+                for key in ((w, None), (None, src), (w, src)):
+                    groups.setdefault(key, []).append(i)
+            self._groups = {key: np.array(rows, dtype=np.int64) for key, rows in groups.items()}
+        return self._groups.get((word, source_type), np.zeros(0, dtype=np.int64))
+
+    def search(
+        self,
+        comp: Composition,
+        k: int = 10,
+        word: str | None = None,
+        source_type: str | None = None,
+    ) -> list[SimilarMatch]:
+        """Top-k rows by cosine similarity to comp, optionally restricted by word / source_type."""
+        query = shape_features(comp)
+        rows = self._candidates(word, source_type)
+        if rows is None:
+            scores = self._vectors @ query
+        elif len(rows) * 4 > len(self.ids):
+            # Scoring everything and then selecting beats gathering a large share of rows
+            scores = (self._vectors @ query)[rows]
+        else:
+            scores = self._vectors[rows] @ query
+        if len(scores) == 0:
+            return []
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        matches = []
+        for i in top:
+            row = int(i) if rows is None else int(rows[i])
+            matches.append(SimilarMatch(self.ids[row], self.words[row], self.source_types[row], float(scores[i])))
+        return matches
+
+
+def _isoformat(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _later(watermark: str | None, value) -> str:
+    """The later of a stored watermark and a curated_at value, as a watermark."""
+    value = _isoformat(value)
+    if watermark is None or datetime.fromisoformat(value) > datetime.fromisoformat(watermark):
+        return value
+    return watermark
+
+
+def _row_line(row_id: str, word: str, source_type: str) -> bytes:
+    return (json.dumps({"id": row_id, "word": word, "source_type": source_type}) + "\n").encode("utf-8")
+
+
+_index: SimilarityIndex | None = None
+_refreshed_at: float | None = None
+
+
+def get_index(refresh: bool = True, max_age: float = INDEX_MAX_AGE) -> SimilarityIndex:
+    """Process-wide index under CACHE_DIR/similarity, refreshed from the database on first
+    use and again once the last refresh is older than max_age seconds."""
+    global _index, _refreshed_at
+    if _index is None:
+        _index = SimilarityIndex()
+    if refresh and (_refreshed_at is None or time.monotonic() - _refreshed_at > max_age):
+        _index.refresh()
+        _refreshed_at = time.monotonic()
+    return _index
+
+
+def find_similar(
+    comp: Composition,
+    k: int = 10,
+    word: str | None = None,
+    source_type: str | None = None,
+) -> list[SimilarMatch]:
+    """Stored compositions most similar in shape to comp (e.g. source_type="curated")."""
+    return get_index().search(comp, k=k, word=word, source_type=source_type)
@@ -5,17 +5,18 @@ from __future__ import annotations
 import io
 import math
 
-import cv2
 import numpy as np
-import svgpathtools
-import vtracer
 from PIL import Image
 
-from .models import Composition, DoodleFragment, Stroke
+from . import metrics
+from .builder import StrokeBuilder
+from .models import Composition, Stroke
+from .resample import resample_arrays
 
 
 # --- Edge Detection ---
 
+@metrics.timed("trace.edges")
 def detect_edges(
     img: Image.Image,
     method: str = "canny",
@@ -29,6 +30,8 @@ def detect_edges(
         "canny" — OpenCV Canny edge detection (default, fast, tunable)
         "adaptive" — Adaptive thresholding (good for varied lighting)
     """
+    import cv2
+
     gray = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2GRAY)
     blurred = cv2.GaussianBlur(gray, (blur_kernel, blur_kernel), 0)
 
@@ -47,6 +50,7 @@ def detect_edges(
 
 # --- SVG Tracing ---
 
+@metrics.timed("trace.vtracer")
 def trace_to_svg(
     edge_image: Image.Image,
     mode: str = "polygon",
@@ -57,6 +61,8 @@ def trace_to_svg(
     path_precision: int = 3,
 ) -> str:
     """Trace a binary edge image to SVG using vtracer. Returns SVG string."""
+    import vtracer
+
     buf = io.BytesIO()
     edge_image.save(buf, format="PNG")
     img_bytes = buf.getvalue()
@@ -127,25 +133,38 @@ def _sample_segment(segment, num_samples: int = 20) -> list[tuple[float, float]]
     return points
 
 
+@metrics.timed("trace.svg_to_strokes")
 def svg_to_strokes(
     svg_string: str,
     simplify_tolerance: float = 0.005,
     min_points: int = 2,
     samples_per_segment: int = 20,
+    resample_spacing: float | None = None,
+    builder: StrokeBuilder | None = None,
 ) -> list[Stroke]:
     """Parse SVG paths into Stroke objects with normalized [0, 1] coordinates.
 
     Parses SVG path elements, samples Bezier curves, normalizes coordinates,
-    and applies Douglas-Peucker simplification.
+    and applies Douglas-Peucker simplification. With resample_spacing, the sampled
+    paths are first evened out along their arc length in one batch (corners kept).
+    Strokes are appended to builder when one is given (its own rounding and
+    min_points apply), so the caller can score the result without a rescan.
     """
+    import svgpathtools
+
     # Extract paths from SVG string
-    try:
-        paths, attributes = svgpathtools.svg2paths(io.StringIO(svg_string))
-    except Exception:
-        # Fallback: try parsing path data directly from SVG string
-        import re
-        path_data = re.findall(r'd="([^"]+)"', svg_string)
-        paths = [svgpathtools.parse_path(d) for d in path_data]
+    with metrics.span("trace.svg_parse"):
+        try:
+            paths, attributes = svgpathtools.svg2paths(io.StringIO(svg_string))
+        except Exception:
+            # Fallback: try parsing path data directly from SVG string
+            import re
+            path_data = re.findall(r'd="([^"]+)"', svg_string)
+            paths = [svgpathtools.parse_path(d) for d in path_data]
+
+    if builder is None:
+        builder = StrokeBuilder(clamp=False, min_points=min_points)
+    start = len(builder.strokes)
 
     if not paths:
         return []
@@ -174,7 +193,7 @@ def svg_to_strokes(
     offset_x = min_x - (scale - range_x) / 2
     offset_y = min_y - (scale - range_y) / 2
 
-    strokes = []
+    normalized_paths = []
     for path in paths:
         if len(path) == 0:
             continue
@@ -200,21 +219,26 @@ def svg_to_strokes(
             )
             for x, y in raw_points
         ]
+        normalized_paths.append(normalized)
 
+    if resample_spacing is not None and normalized_paths:
+        resampled = resample_arrays(
+            [([p[0] for p in pts], [p[1] for p in pts]) for pts in normalized_paths],
+            spacing=resample_spacing,
+        )
+        normalized_paths = [list(zip(xs.tolist(), ys.tolist())) for xs, ys in resampled]
+
+    for normalized in normalized_paths:
         # Simplify with Douglas-Peucker
         if simplify_tolerance > 0:
-            simplified = _douglas_peucker(normalized, simplify_tolerance)
+            with metrics.span("trace.simplify"):
+                simplified = _douglas_peucker(normalized, simplify_tolerance)
         else:
             simplified = normalized
 
-        if len(simplified) < min_points:
-            continue
-
-        xs_norm = [round(p[0], 3) for p in simplified]
-        ys_norm = [round(p[1], 3) for p in simplified]
-        strokes.append(Stroke(xs=xs_norm, ys=ys_norm, ts=[0.0]))
+        builder.add([p[0] for p in simplified], [p[1] for p in simplified])
 
-    return strokes
+    return builder.strokes[start:]
 
 
 # --- Full Pipeline ---
@@ -232,6 +256,7 @@ def trace_image(
     splice_threshold: int = 45,
     path_precision: int = 3,
     subject: str = "traced",
+    resample_spacing: float | None = None,
 ) -> Composition:
     """Full pipeline: image → edges → SVG → strokes → Composition."""
     edges = detect_edges(img, method=method, low=low, high=high, blur_kernel=blur_kernel)
@@ -245,14 +270,9 @@ def trace_image(
         path_precision=path_precision,
     )
 
-    strokes = svg_to_strokes(svg, simplify_tolerance=simplify_tolerance)
-
-    return Composition(
-        width=255,
-        height=255,
-        doodle_fragments=[DoodleFragment(strokes=strokes)],
-        tags=["traced", f"traced-{method}", subject],
-    )
+    builder = StrokeBuilder(clamp=False)
+    svg_to_strokes(svg, simplify_tolerance=simplify_tolerance, resample_spacing=resample_spacing, builder=builder)
+    return builder.build(tags=["traced", f"traced-{method}", subject])
 
 
 def trace_with_params(
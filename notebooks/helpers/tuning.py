@@ -0,0 +1,256 @@
+"""Adaptive per-call batch size and token limit for generation, learned from past calls.
+
+Each generation call asks for per_call compositions under a token limit (num_predict /
+max_tokens). A limit that is too tight cuts the reply off and loses compositions; a
+per_call that is too small leaves the model doing one short reply per round trip. A
+BatchTuner keeps, per (backend, model, subject) and per (backend, model):
+
+- output tokens per composition, as a running mean and mean absolute deviation over
+  replies that finished. The next limit is per_call × (mean + 3 × deviation) ×
+  headroom, where headroom grows by 25% after every truncated reply and eases back
+  towards 1 after clean ones;
+- the truncation rate (overall and recent);
+- call time as overhead + seconds per output token, a decayed least-squares fit;
+- for each per_call tried, the share of the requested compositions that came back
+  valid (which also counts what truncation cost).
+
+suggest() estimates valid compositions per second for each candidate size as
+per_call × valid share / (overhead + per_call × tokens per composition × seconds per
+token) and picks the best. Candidates are the sizes already tried plus one step past
+the smallest and largest of them, all within what the token ceiling allows, so the
+size climbs while bigger batches pay off and backs down once their valid share drops.
+Every explore_every calls the least-tried neighbour of the best size is used instead.
+A subject with fewer than MIN_SUBJECT_CALLS calls uses the model-wide statistics.
+State is kept in CACHE_DIR/batch_tuning.json, so a new session starts from what
+earlier ones learned.
+
+    tuner = get_tuner()
+    per_call, limit = tuner.suggest("ollama", model, "cat", default_per_call=5, ceiling=8192)
+    data, usage = call_ollama_with_usage(messages, num_predict=limit, ...)
+    tuner.record("ollama", model, "cat", per_call, compositions=len(comps), valid=len(valid),
+                 output_tokens=usage["output_tokens"], truncated=usage["truncated"], seconds=dt)
+    tuner.save()
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .cache import CACHE_DIR
+
+TUNING_PATH = CACHE_DIR / "batch_tuning.json"
+
+MIN_PER_CALL = 1
+MAX_PER_CALL = 12
+MIN_SUBJECT_CALLS = 3
+EXPLORE_EVERY = 4
+ALPHA = 0.3               # weight of the newest call in running averages
+DECAY = 0.95              # per-call decay of the call-time fit
+MAX_HEADROOM = 2.0
+REPLY_OVERHEAD = 32       # tokens of JSON around the compositions
+LIMIT_STEP = 256          # limits are rounded up to a multiple of this
+
+
+def _ewma(old: float | None, new: float, alpha: float = ALPHA) -> float:
+    return new if old is None else old + alpha * (new - old)
+
+
+@dataclass
+class TuningStats:
+    """What the tuner has learned for one (backend, model[, subject])."""
+    calls: int = 0
+    truncated: int = 0
+    recent_truncation: float = 0.0
+    tokens_per_comp: float | None = None  # over replies that were not cut off
+    tokens_dev: float = 0.0
+    headroom: float = 1.0
+    timing: list[float] = field(default_factory=lambda: [0.0] * 5)  # decayed Σw, Σx, Σy, Σxx, Σxy
+    sizes: dict[int, list[float]] = field(default_factory=dict)  # per_call -> [calls, valid share]
+    suggested: int = 0
+
+    @property
+    def truncation_rate(self) -> float:
+        return self.truncated / self.calls if self.calls else 0.0
+
+    def tokens_needed(self, per_call: int) -> int | None:
+        """Token limit expected to fit per_call compositions, or None before any data."""
+        if self.tokens_per_comp is None:
+            return None
+        per_comp = (self.tokens_per_comp + 3 * self.tokens_dev) * self.headroom
+        return math.ceil((per_call * per_comp + REPLY_OVERHEAD) / LIMIT_STEP) * LIMIT_STEP
+
+    def call_time(self) -> tuple[float, float] | None:
+        """(overhead seconds, seconds per output token) fitted so far, or None."""
+        w, sx, sy, sxx, sxy = self.timing
+        if w <= 0 or sx <= 0:
+            return None
+        var = sxx / w - (sx / w) ** 2
+        if w < 2 or var <= 1e-9 * (sx / w) ** 2:
+            return 0.0, sy / sx
+        per_token = max(1e-9, (sxy / w - sx * sy / w ** 2) / var)
+        return max(0.0, sy / w - per_token * sx / w), per_token
+
+    def expected_rate(self, per_call: int) -> float:
+        """Estimated valid compositions per second at this size (0 before any data)."""
+        timing = self.call_time()
+        if not self.sizes or timing is None or self.tokens_per_comp is None:
+            return 0.0
+        nearest = min(self.sizes, key=lambda n: (abs(n - per_call), n))
+        share = self.sizes[nearest][1]
+        overhead, per_token = timing
+        return per_call * share / (overhead + per_call * self.tokens_per_comp * per_token)
+
+    def best_size(self, sizes: range) -> int | None:
+        tried = [n for n in sizes if n in self.sizes]
+        return max(tried, key=lambda n: (self.expected_rate(n), n)) if tried else None
+
+    def observe(self, per_call: int, compositions: int, valid: int, output_tokens: int,
+                truncated: bool, seconds: float) -> None:
+        self.calls += 1
+        self.recent_truncation = _ewma(self.recent_truncation, float(truncated))
+        if truncated:
+            self.truncated += 1
+            self.headroom = min(MAX_HEADROOM, self.headroom * 1.25)
+        else:
+            self.headroom = max(1.0, self.headroom * 0.98)
+            if compositions and output_tokens:
+                x = output_tokens / compositions
+                if self.tokens_per_comp is None:
+                    self.tokens_dev = 0.25 * x  # until there is a second reply to compare with
+                else:
+                    self.tokens_dev = _ewma(self.tokens_dev, abs(x - self.tokens_per_comp))
+                self.tokens_per_comp = _ewma(self.tokens_per_comp, x)
+        if seconds > 0 and output_tokens:
+            x, y = float(output_tokens), seconds
+            self.timing = [DECAY * t + d for t, d in zip(self.timing, (1.0, x, y, x * x, x * y))]
+        if per_call > 0:
+            size = self.sizes.setdefault(per_call, [0, None])
+            size[0] += 1
+            size[1] = _ewma(size[1], min(1.0, valid / per_call))
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["sizes"] = {str(n): v for n, v in self.sizes.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> TuningStats:
+        data = dict(data)
+        data["sizes"] = {int(n): list(v) for n, v in data.get("sizes", {}).items()}
+        return cls(**data)
+
+
+class BatchTuner:
+    """Chooses per_call and the token limit for each generation call; see the module docstring."""
+
+    def __init__(
+        self,
+        path: str | Path | None = TUNING_PATH,
+        min_per_call: int = MIN_PER_CALL,
+        max_per_call: int = MAX_PER_CALL,
+        explore_every: int = EXPLORE_EVERY,
+    ):
+        self.path = Path(path) if path is not None else None
+        self.min_per_call = min_per_call
+        self.max_per_call = max_per_call
+        self.explore_every = explore_every
+        self.stats: dict[str, TuningStats] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text())
+                self.stats = {k: TuningStats.from_dict(v) for k, v in raw.get("stats", {}).items()}
+            except (OSError, json.JSONDecodeError, TypeError):
+                self.stats = {}
+
+    @staticmethod
+    def key(backend: str, model: str, subject: str | None = None) -> str:
+        return f"{backend}/{model}/{subject or '*'}"
+
+    def _learned(self, backend: str, model: str, subject: str) -> TuningStats:
+        """Subject statistics once there are enough of them, else the model-wide ones."""
+        own = self.stats.get(self.key(backend, model, subject))
+        if own is not None and own.calls >= MIN_SUBJECT_CALLS:
+            return own
+        return self.stats.get(self.key(backend, model)) or TuningStats()
+
+    def suggest(self, backend: str, model: str, subject: str, default_per_call: int,
+                ceiling: int) -> tuple[int, int]:
+        """(per_call, token limit) for the next call; the limit never exceeds ceiling."""
+        with self._lock:
+            learned = self._learned(backend, model, subject)
+            own = self.stats.setdefault(self.key(backend, model, subject), TuningStats())
+            own.suggested += 1
+
+            top = self.max_per_call
+            while top > self.min_per_call and (learned.tokens_needed(top) or 0) > ceiling:
+                top -= 1
+            sizes = range(self.min_per_call, top + 1)
+
+            tried = [n for n in sizes if n in learned.sizes]
+            if not tried:
+                per_call = min(max(default_per_call, self.min_per_call), top)
+            else:
+                lo, hi = min(tried), max(tried)
+                edges = [n for n in (lo - max(1, lo // 4), hi + max(1, hi // 4)) if n in sizes]
+                per_call = max(tried + edges, key=lambda n: (learned.expected_rate(n), n))
+                if own.suggested % self.explore_every == 0:
+                    step = max(1, per_call // 4)
+                    neighbours = [n for n in (per_call + step, per_call - step) if n in sizes]
+                    if neighbours:
+                        per_call = min(neighbours, key=lambda n: learned.sizes.get(n, [0])[0])
+
+            needed = learned.tokens_needed(per_call)
+            limit = ceiling if needed is None else min(ceiling, needed)
+        return per_call, limit
+
+    def record(self, backend: str, model: str, subject: str, per_call: int, compositions: int,
+               valid: int, output_tokens: int, truncated: bool, seconds: float) -> None:
+        """Fold one finished call into the subject and model-wide statistics."""
+        with self._lock:
+            for key in (self.key(backend, model, subject), self.key(backend, model)):
+                self.stats.setdefault(key, TuningStats()).observe(
+                    per_call, compositions, valid, output_tokens, truncated, seconds,
+                )
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            payload = {"stats": {k: s.to_dict() for k, s in self.stats.items()}}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload))
+        tmp.replace(self.path)
+
+    def summary(self, backend: str, model: str) -> str:
+        """One line per subject (and the model as a whole) with what has been learned."""
+        lines = []
+        prefix = f"{backend}/{model}/"
+        with self._lock:
+            for key, s in sorted(self.stats.items()):
+                if not key.startswith(prefix) or not s.calls:
+                    continue
+                best = s.best_size(range(self.min_per_call, self.max_per_call + 1))
+                tokens = f"{s.tokens_per_comp:.0f}±{s.tokens_dev:.0f}" if s.tokens_per_comp is not None else "?"
+                rate = f", best per_call {best} (~{s.expected_rate(best):.2f} valid/s)" if best is not None else ""
+                lines.append(f"{key[len(prefix):]}: {s.calls} calls, {s.truncation_rate:.0%} truncated, "
+                             f"{tokens} tokens/composition{rate}")
+        return "\n".join(lines)
+
+
+_tuner: BatchTuner | None = None
+_tuner_lock = threading.Lock()
+
+
+def get_tuner() -> BatchTuner:
+    """The process-wide tuner, persisted at CACHE_DIR/batch_tuning.json."""
+    global _tuner
+    with _tuner_lock:
+        if _tuner is None:
+            _tuner = BatchTuner()
+        return _tuner
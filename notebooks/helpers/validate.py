@@ -1,5 +1,10 @@
 """Quality scoring and validation — port of CompositionValidator.cs + CompositionGeometry.cs."""
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from . import metrics
 from .models import Composition
 
 MIN_BOUNDING_BOX_COVERAGE = 0.10
@@ -7,6 +12,9 @@ MIN_TOTAL_POINTS = 5
 IDEAL_STROKES = 7.0
 IDEAL_POINTS = 80.0
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 def bounding_box(comp: Composition) -> tuple[float, float, float, float]:
     """Compute (min_x, min_y, max_x, max_y) across all strokes."""
@@ -53,27 +61,23 @@ def _coords_in_range(comp: Composition) -> bool:
     return True
 
 
-def validate(comp: Composition) -> tuple[bool, float]:
-    """Validate a composition and compute its quality score.
+def score_summary(
+    strokes: int,
+    points: int,
+    min_x: float,
+    min_y: float,
+    max_x: float,
+    max_y: float,
+    in_range: bool,
+) -> tuple[bool, float]:
+    """validate() from a composition's summary instead of its strokes — O(1).
 
-    Returns (is_valid, quality_score). Port of CompositionValidator.Validate().
-    Score formula: stroke_score * 0.15 + point_score * 0.15 + coverage_score * 0.40 + balance_score * 0.30
+    Takes one composition's stroke and point counts, bounding box (all zeros when
+    there are no points) and range check, as kept by builder.StrokeBuilder.
     """
-    if not comp.doodle_fragments:
-        return (False, 0.0)
-
-    total_strokes = count_strokes(comp)
-    if total_strokes == 0:
-        return (False, 0.0)
-
-    total_points = count_points(comp)
-    if total_points < MIN_TOTAL_POINTS:
+    if strokes == 0 or points < MIN_TOTAL_POINTS or not in_range:
         return (False, 0.0)
 
-    if not _coords_in_range(comp):
-        return (False, 0.0)
-
-    min_x, min_y, max_x, max_y = bounding_box(comp)
     bbox_width = max_x - min_x
     bbox_height = max_y - min_y
     bbox_coverage = bbox_width * bbox_height
@@ -82,16 +86,16 @@ def validate(comp: Composition) -> tuple[bool, float]:
         return (False, 0.0)
 
     # Stroke score (15%) — ideal is 7 strokes
-    if total_strokes <= 30:
-        stroke_score = 1.0 - abs(total_strokes - IDEAL_STROKES) / 20.0
+    if strokes <= 30:
+        stroke_score = 1.0 - abs(strokes - IDEAL_STROKES) / 20.0
     else:
         stroke_score = 0.8
 
     # Point score (15%) — ideal is 80 points
-    if total_points <= 200:
-        point_score = 1.0 - abs(total_points - IDEAL_POINTS) / 500.0
+    if points <= 200:
+        point_score = 1.0 - abs(points - IDEAL_POINTS) / 500.0
     else:
-        point_score = min(1.0, 0.7 + total_points / 5000.0)
+        point_score = min(1.0, 0.7 + points / 5000.0)
 
     # Coverage score (40%) — how much of the canvas is used
     coverage_score = min(bbox_coverage / 0.6, 1.0)
@@ -110,6 +114,83 @@ def validate(comp: Composition) -> tuple[bool, float]:
     return (True, round(score, 4))
 
 
+@metrics.timed("validate")
+def validate(comp: Composition) -> tuple[bool, float]:
+    """Validate a composition and compute its quality score.
+
+    Returns (is_valid, quality_score). Port of CompositionValidator.Validate().
+    Score formula: stroke_score * 0.15 + point_score * 0.15 + coverage_score * 0.40 + balance_score * 0.30
+    """
+    if not comp.doodle_fragments:
+        return (False, 0.0)
+
+    total_strokes = count_strokes(comp)
+    if total_strokes == 0:
+        return (False, 0.0)
+
+    total_points = count_points(comp)
+    if total_points < MIN_TOTAL_POINTS:
+        return (False, 0.0)
+
+    if not _coords_in_range(comp):
+        return (False, 0.0)
+
+    return score_summary(total_strokes, total_points, *bounding_box(comp), True)
+
+
+@metrics.timed("validate.batch")
+def score_arrays(
+    strokes: np.ndarray,
+    points: np.ndarray,
+    min_x: np.ndarray,
+    min_y: np.ndarray,
+    max_x: np.ndarray,
+    max_y: np.ndarray,
+    in_range: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized validate() over per-composition summaries. Returns (is_valid, quality_score).
+
+    Each argument holds one value per composition: stroke and point counts, the
+    bounding box (all zeros when there are no points) and whether every coordinate is
+    within [0, 1]. The arithmetic mirrors validate() term for term, so the scores are
+    bit-identical to calling it on each composition.
+    """
+    import numpy as np
+
+    strokes = np.asarray(strokes, dtype=np.int64)
+    points = np.asarray(points, dtype=np.int64)
+    bbox_width = np.asarray(max_x, dtype=np.float64) - np.asarray(min_x, dtype=np.float64)
+    bbox_height = np.asarray(max_y, dtype=np.float64) - np.asarray(min_y, dtype=np.float64)
+    bbox_coverage = bbox_width * bbox_height
+
+    is_valid = (
+        (strokes > 0)
+        & (points >= MIN_TOTAL_POINTS)
+        & np.asarray(in_range, dtype=bool)
+        & (bbox_coverage >= MIN_BOUNDING_BOX_COVERAGE)
+    )
+
+    stroke_score = np.where(strokes <= 30, 1.0 - np.abs(strokes - IDEAL_STROKES) / 20.0, 0.8)
+    point_score = np.where(
+        points <= 200,
+        1.0 - np.abs(points - IDEAL_POINTS) / 500.0,
+        np.minimum(1.0, 0.7 + points / 5000.0),
+    )
+    coverage_score = np.minimum(bbox_coverage / 0.6, 1.0)
+    balance_score = 1.0 - np.abs(bbox_width - bbox_height)
+
+    score = np.maximum(
+        0.0,
+        (stroke_score * 0.15)
+        + (point_score * 0.15)
+        + (coverage_score * 0.40)
+        + (balance_score * 0.30),
+    )
+    # Python's round() (correctly rounded) rather than np.round, to match validate() exactly
+    rounded = np.array([round(v, 4) for v in score.tolist()], dtype=np.float64)
+    return is_valid, np.where(is_valid, rounded, 0.0)
+
+
 def score_breakdown(comp: Composition) -> dict:
     """Detailed score breakdown for debugging — shows each component."""
     total_strokes = count_strokes(comp)
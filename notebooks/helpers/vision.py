@@ -3,13 +3,20 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 import io
 import json
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-import httpx
 from PIL import Image
 
+from . import metrics
+from .jsonparse import parse_json
+from .pool import get_pool
+
 OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://10.0.0.148:11434")
 OLLAMA_VISION_MODEL = os.environ.get("OLLAMA_VISION_MODEL", "qwen2.5-vl:7b")
 
@@ -22,28 +29,104 @@ Respond with JSON only:
 }"""
 
 
+_ENCODE_CACHE_SIZE = 64
+_encode_cache: OrderedDict[tuple, str] = OrderedDict()
+_encode_lock = threading.Lock()
+
+
+def _shrink(img: Image.Image, max_size: int) -> Image.Image:
+    """Downscale so the long side is at most max_size, as cheaply as possible.
+
+    JPEGs opened from disk but not yet loaded are re-opened in draft mode so libjpeg decodes at
+    1/2, 1/4 or 1/8 scale; everything else uses an integer reduce() followed by a
+    bilinear resize, which is several times faster than LANCZOS on large photos.
+    """
+    w, h = img.size
+    if max(w, h) <= max_size:
+        return img
+
+    ratio = max_size / max(w, h)
+    target = (max(1, int(w * ratio)), max(1, int(h * ratio)))
+
+    filename = getattr(img, "filename", "")
+    if img.format == "JPEG" and filename and getattr(img, "fp", None) is not None:
+        # Re-open rather than draft() in place, so the caller's image keeps its size
+        with Image.open(filename) as draft:
+            draft.draft("RGB", target)
+            return draft.resize(target, Image.BILINEAR, reducing_gap=2.0)
+
+    return img.resize(target, Image.BILINEAR, reducing_gap=2.0)
+
+
+def _content_key(img: Image.Image) -> tuple:
+    """Identity of an image's pixels for the encode cache.
+
+    An image still backed by its unread file cannot have been modified, so the file's
+    path, mtime and size stand in for it (hashing would force a full-size decode).
+    Anything already in memory is keyed by a hash of its pixel data, so images edited
+    in place are re-encoded.
+    """
+    filename = getattr(img, "filename", "")
+    if filename and getattr(img, "fp", None) is not None:
+        st = os.stat(filename)
+        return ("file", filename, st.st_mtime_ns, st.st_size)
+    return ("pixels", img.mode, img.size, hashlib.blake2b(img.tobytes(), digest_size=16).digest())
+
+
 def _image_to_base64(img: Image.Image, format: str = "JPEG", max_size: int = 1024) -> str:
-    """Convert PIL Image to base64 string, resizing if needed."""
+    """Convert PIL Image to base64 string, resizing if needed.
+
+    Encodings are remembered by image content (see _content_key), so labeling the same
+    image with several providers or prompts only resizes and re-encodes it once.
+    """
+    key = (_content_key(img), format, max_size)
+    with _encode_lock:
+        hit = _encode_cache.get(key)
+        if hit is not None:
+            _encode_cache.move_to_end(key)
+            return hit
+
     # Resize to keep token cost reasonable
-    w, h = img.size
-    if max(w, h) > max_size:
-        ratio = max_size / max(w, h)
-        img = img.resize((int(w * ratio), int(h * ratio)), Image.LANCZOS)
+    small = _shrink(img, max_size)
+    if format == "JPEG" and small.mode != "RGB":
+        small = small.convert("RGB")
 
     buf = io.BytesIO()
-    img.save(buf, format=format)
-    return base64.b64encode(buf.getvalue()).decode("utf-8")
+    small.save(buf, format=format)
+    encoded = base64.b64encode(buf.getvalue()).decode("utf-8")
+
+    with _encode_lock:
+        _encode_cache[key] = encoded
+        _encode_cache.move_to_end(key)
+        while len(_encode_cache) > _ENCODE_CACHE_SIZE:
+            _encode_cache.popitem(last=False)
+    return encoded
+
+
+@metrics.timed("vision.parse")
+def _parse_label(text: str) -> dict:
+    """Parse the LABEL_PROMPT JSON reply, tolerating markdown code fences."""
+    data = parse_json(text, salvage=False)
+    return {
+        "subject": data.get("subject", "unknown"),
+        "tags": data.get("tags", []),
+        "description": data.get("description", ""),
+    }
 
 
 def call_ollama_vision(
-    img: Image.Image,
+    img: Image.Image | str,
     prompt: str = LABEL_PROMPT,
     model: str = OLLAMA_VISION_MODEL,
-    url: str = OLLAMA_URL,
+    url: str | None = None,
     timeout: float = 120.0,
 ) -> str:
-    """Send an image to Ollama vision model and return the response text."""
-    img_b64 = _image_to_base64(img)
+    """Send an image to Ollama vision model and return the response text.
+
+    img may also be an already base64-encoded JPEG. With url=None the request is
+    routed through the shared OllamaPool.
+    """
+    img_b64 = img if isinstance(img, str) else _image_to_base64(img)
 
     body = {
         "model": model,
@@ -57,17 +140,22 @@ def call_ollama_vision(
         "stream": False,
     }
 
-    response = httpx.post(f"{url}/api/chat", json=body, timeout=timeout)
-    response.raise_for_status()
+    def post(host_url: str) -> dict:
+        import httpx
+
+        response = httpx.post(f"{host_url}/api/chat", json=body, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
 
-    result = response.json()
+    with metrics.span("vision.http"):
+        result = post(url) if url is not None else get_pool().request(model, post)
     return result.get("message", {}).get("content", "")
 
 
 def label_with_ollama(
-    img: Image.Image,
+    img: Image.Image | str,
     model: str = OLLAMA_VISION_MODEL,
-    url: str = OLLAMA_URL,
+    url: str | None = None,
 ) -> dict:
     """Send image to Ollama vision model for subject identification and tagging.
 
@@ -75,21 +163,7 @@ def label_with_ollama(
     """
     try:
         response_text = call_ollama_vision(img, prompt=LABEL_PROMPT, model=model, url=url)
-
-        # Try to parse JSON from the response
-        # Handle cases where the model wraps JSON in markdown code blocks
-        cleaned = response_text.strip()
-        if cleaned.startswith("```"):
-            lines = cleaned.split("\n")
-            json_lines = [l for l in lines if not l.strip().startswith("```")]
-            cleaned = "\n".join(json_lines)
-
-        data = json.loads(cleaned)
-        return {
-            "subject": data.get("subject", "unknown"),
-            "tags": data.get("tags", []),
-            "description": data.get("description", ""),
-        }
+        return _parse_label(response_text)
     except json.JSONDecodeError:
         # If JSON parsing fails, extract what we can from the text
         return {
@@ -107,12 +181,13 @@ def label_with_ollama(
 
 
 def label_with_claude(
-    img: Image.Image,
+    img: Image.Image | str,
     model: str | None = None,
     tracker=None,
 ) -> dict:
     """Send image to Claude for subject identification and tagging.
 
+    img may also be an already base64-encoded JPEG.
     Returns dict: {subject, tags, description, usage}
     """
     import anthropic
@@ -120,32 +195,33 @@ def label_with_claude(
     if model is None:
         model = os.environ.get("CLAUDE_MODEL", "claude-sonnet-4-5-20250929")
 
-    img_b64 = _image_to_base64(img)
+    img_b64 = img if isinstance(img, str) else _image_to_base64(img)
 
     client = anthropic.Anthropic()
-    response = client.messages.create(
-        model=model,
-        max_tokens=256,
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": "image/jpeg",
-                            "data": img_b64,
+    with metrics.span("vision.http"):
+        response = client.messages.create(
+            model=model,
+            max_tokens=256,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": "image/jpeg",
+                                "data": img_b64,
+                            },
                         },
-                    },
-                    {
-                        "type": "text",
-                        "text": LABEL_PROMPT,
-                    },
-                ],
-            }
-        ],
-    )
+                        {
+                            "type": "text",
+                            "text": LABEL_PROMPT,
+                        },
+                    ],
+                }
+            ],
+        )
 
     usage_info = {
         "input_tokens": response.usage.input_tokens,
@@ -158,19 +234,7 @@ def label_with_claude(
     content_text = response.content[0].text
 
     try:
-        cleaned = content_text.strip()
-        if cleaned.startswith("```"):
-            lines = cleaned.split("\n")
-            json_lines = [l for l in lines if not l.strip().startswith("```")]
-            cleaned = "\n".join(json_lines)
-
-        data = json.loads(cleaned)
-        return {
-            "subject": data.get("subject", "unknown"),
-            "tags": data.get("tags", []),
-            "description": data.get("description", ""),
-            "usage": usage_info,
-        }
+        return {**_parse_label(content_text), "usage": usage_info}
     except json.JSONDecodeError:
         return {
             "subject": "unknown",
@@ -181,8 +245,55 @@ def label_with_claude(
         }
 
 
+def label_many(
+    images: list[Image.Image],
+    provider: str = "ollama",
+    concurrency: int = 4,
+    model: str | None = None,
+    tracker=None,
+    max_size: int = 1024,
+) -> list[dict]:
+    """Label many images concurrently. Results are returned in the same order as images.
+
+    Encoding runs on a thread pool (Pillow releases the GIL while resizing and
+    compressing), then at most `concurrency` vision requests are in flight at once.
+    provider is "ollama" or "claude". Claude failures are reported per image in the
+    same shape label_with_ollama uses instead of aborting the whole batch.
+    """
+    if provider not in ("ollama", "claude"):
+        raise ValueError(f"Unknown vision provider: {provider}")
+    if not images:
+        return []
+
+    workers = max(1, min(concurrency, len(images)))
+    with ThreadPoolExecutor(max_workers=min(len(images), os.cpu_count() or 4)) as pool:
+        encoded = list(pool.map(lambda im: _image_to_base64(im, max_size=max_size), images))
+
+    def label_one(img_b64: str) -> dict:
+        if provider == "ollama":
+            return label_with_ollama(img_b64, model=model or OLLAMA_VISION_MODEL)
+        try:
+            return label_with_claude(img_b64, model=model)
+        except Exception as e:
+            return {"subject": "unknown", "tags": [], "description": f"Error: {e}"}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(label_one, encoded))
+
+    # Record usage on the calling thread — UsageTracker is not thread-safe
+    if tracker is not None:
+        for r in results:
+            usage = r.get("usage")
+            if usage:
+                tracker.record(usage["input_tokens"], usage["output_tokens"])
+
+    return results
+
+
 def check_vision_model(model: str = OLLAMA_VISION_MODEL, url: str = OLLAMA_URL) -> str:
     """Check if a vision-capable model is available in Ollama."""
+    import httpx
+
     try:
         resp = httpx.get(f"{url}/api/tags", timeout=10)
         resp.raise_for_status()
@@ -4,9 +4,19 @@ import math
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.font_manager import FontProperties, findfont, get_font
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
 from .models import Composition
 from .validate import validate, bounding_box, count_strokes, count_points
 
+try:
+    from matplotlib.ft2font import Kerning
+    _KERNING = Kerning.DEFAULT
+except ImportError:  # matplotlib < 3.10
+    from matplotlib.ft2font import KERNING_DEFAULT as _KERNING
+
 
 STROKE_COLORS = [
     "#2196F3", "#F44336", "#4CAF50", "#FF9800", "#9C27B0",
@@ -57,6 +67,134 @@ def draw(
     return ax
 
 
+# Gap between cells and headroom for the caption, in cell units (a cell is 1×1)
+_CELL_GAP = 0.08
+_CAPTION_SPACE = 0.12
+
+
+_glyph_cache: dict[str, tuple[np.ndarray, np.ndarray, float, int]] = {}
+_kern_cache: dict[tuple[int, int], float] = {}
+
+
+def _caption_font():
+    font = get_font(findfont(FontProperties()))
+    font.set_size(100, 72)  # 100 px per em, so advances / 100 are in em units
+    return font
+
+
+def _caption_outline(text: str) -> tuple[np.ndarray, np.ndarray, float]:
+    """Unit-size outline (vertices, codes, advance width) of text, built from cached glyphs.
+
+    Glyphs are placed by their advance plus the font's kerning, as Text artists do.
+    """
+    font = None
+    verts, codes, pen_x, prev = [], [], 0.0, None
+    for ch in text:
+        glyph = _glyph_cache.get(ch)
+        if glyph is None:
+            font = font or _caption_font()
+            index = font.get_char_index(ord(ch))
+            advance = font.load_char(ord(ch)).linearHoriAdvance / 65536 / 100
+            if ch.isspace():
+                glyph = (np.zeros((0, 2)), np.zeros(0, dtype=np.uint8), advance, index)
+            else:
+                path = TextPath((0, 0), ch, size=1)
+                glyph = (np.asarray(path.vertices, dtype=float), np.asarray(path.codes), advance, index)
+            _glyph_cache[ch] = glyph
+        g_verts, g_codes, advance, index = glyph
+        if prev is not None:
+            kern = _kern_cache.get((prev, index))
+            if kern is None:
+                font = font or _caption_font()
+                kern = _kern_cache[prev, index] = font.get_kerning(prev, index, _KERNING) / 64 / 100
+            pen_x += kern
+        if len(g_verts):
+            verts.append(g_verts + (pen_x, 0.0))
+            codes.append(g_codes)
+        pen_x += advance
+        prev = index
+    if not verts:
+        return np.zeros((0, 2)), np.zeros(0, dtype=np.uint8), pen_x
+    return np.concatenate(verts), np.concatenate(codes), pen_x
+
+
+def _draw_cells(
+    cells: list[tuple[Composition | None, str]],
+    cols: int,
+    title: str | None,
+    show_bbox: bool,
+    figsize_per_cell: float,
+    linewidth: float = 2.0,
+) -> plt.Figure:
+    """Lay every cell out on one Axes and draw all strokes as a single LineCollection.
+
+    Matches the look of one-Axes-per-cell rendering (framed 1×1 canvases, y pointing
+    down, caption above each cell) at a fraction of the artist count.
+    """
+    rows = math.ceil(len(cells) / cols)
+    step_x = 1.0 + _CELL_GAP
+    step_y = 1.0 + _CELL_GAP + _CAPTION_SPACE
+
+    strokes, frames, bboxes = [], [], []
+    captions: list[tuple[float, float, str]] = []
+    for i, (comp, caption) in enumerate(cells):
+        if comp is None:
+            continue
+        r, c = divmod(i, cols)
+        x0, y0 = c * step_x, r * step_y + _CAPTION_SPACE
+
+        for frag in comp.doodle_fragments:
+            for stroke in frag.strokes:
+                if len(stroke.xs) < 2:
+                    continue
+                strokes.append(np.column_stack((np.asarray(stroke.xs) + x0, np.asarray(stroke.ys) + y0)))
+
+        frames.append([(x0, y0), (x0 + 1, y0), (x0 + 1, y0 + 1), (x0, y0 + 1), (x0, y0)])
+        if show_bbox:
+            min_x, min_y, max_x, max_y = bounding_box(comp)
+            bboxes.append([
+                (x0 + min_x, y0 + min_y), (x0 + max_x, y0 + min_y),
+                (x0 + max_x, y0 + max_y), (x0 + min_x, y0 + max_y), (x0 + min_x, y0 + min_y),
+            ])
+        if caption:
+            captions.append((x0 + 0.5, y0 - 0.03, caption))
+
+    # Size the figure to the grid's aspect so equal-aspect cells fill the width
+    width = figsize_per_cell * cols
+    grid_height = width * (rows * step_y + _CELL_GAP) / (cols * step_x)
+    title_height = 0.5 if title else 0.0
+    fig = plt.figure(figsize=(width, grid_height + title_height))
+    ax = fig.add_axes((0.0, 0.0, 1.0, grid_height / (grid_height + title_height)))
+    ax.set_xlim(-_CELL_GAP / 2, cols * step_x - _CELL_GAP / 2)
+    ax.set_ylim(rows * step_y + _CELL_GAP / 2, 0.0)
+    ax.set_aspect("equal")
+    ax.axis("off")
+
+    ax.add_collection(LineCollection(frames, colors="black", linewidths=0.8))
+    ax.add_collection(LineCollection(
+        strokes, colors="#333333", linewidths=linewidth, capstyle="round", joinstyle="round",
+    ))
+    if bboxes:
+        ax.add_collection(LineCollection(bboxes, colors="red", linewidths=1, linestyles="--", alpha=0.5))
+
+    if captions:
+        # Batched text: every caption's glyph outlines go into one PathCollection, so
+        # the whole grid's captions are a single artist and a single draw call.
+        font_size = 10 / 72 * step_x / figsize_per_cell  # 10pt expressed in data units
+        paths = []
+        for x, y, text in captions:
+            verts, codes, advance = _caption_outline(text)
+            xy = verts * font_size
+            xy[:, 0] += x - advance * font_size / 2
+            xy[:, 1] = y - xy[:, 1]  # flip: the axis points down
+            paths.append(Path(xy, codes))
+        ax.add_collection(PathCollection(paths, facecolors="black", edgecolors="none"))
+
+    if title:
+        fig.suptitle(title, fontsize=14, fontweight="bold")
+    return fig
+
+
 def draw_grid(
     compositions: list[Composition],
     cols: int = 5,
@@ -64,14 +202,30 @@ def draw_grid(
     show_scores: bool = True,
     show_bbox: bool = False,
     figsize_per_cell: float = 3.0,
+    fast: bool = False,
 ) -> plt.Figure:
-    """Render N compositions in a grid with optional quality scores."""
+    """Render N compositions in a grid with optional quality scores.
+
+    fast=True draws the whole grid on a single Axes as one LineCollection, which keeps
+    grids of hundreds of compositions well under a second.
+    """
     n = len(compositions)
     if n == 0:
         fig, ax = plt.subplots(1, 1, figsize=(4, 4))
         ax.text(0.5, 0.5, "No compositions", ha="center", va="center")
         return fig
 
+    if fast:
+        captions = [""] * n
+        if show_scores:
+            captions = [
+                f"q={validate(comp)[1]:.3f}  s={count_strokes(comp)}  p={count_points(comp)}"
+                for comp in compositions
+            ]
+        return _draw_cells(
+            list(zip(compositions, captions)), cols, title, show_bbox, figsize_per_cell,
+        )
+
     rows = math.ceil(n / cols)
     fig, axes = plt.subplots(rows, cols, figsize=(figsize_per_cell * cols, figsize_per_cell * rows))
 
@@ -110,6 +264,7 @@ def draw_comparison(
     generated: list[Composition],
     cols: int = 5,
     title: str = "Curated vs Generated",
+    fast: bool = False,
 ) -> plt.Figure:
     """Side-by-side comparison: curated on top row(s), generated on bottom row(s)."""
     max_show = cols
@@ -119,6 +274,16 @@ def draw_comparison(
     rows = 2
     total_cols = max(len(curated_show), len(generated_show), 1)
 
+    if fast:
+        cells: list[tuple[Composition | None, str]] = []
+        for label, row in (("Curated", curated_show), ("Generated", generated_show)):
+            for c in range(total_cols):
+                if c < len(row):
+                    cells.append((row[c], f"{label} q={validate(row[c])[1]:.3f}"))
+                else:
+                    cells.append((None, ""))
+        return _draw_cells(cells, total_cols, title, show_bbox=False, figsize_per_cell=3.0)
+
     fig, axes = plt.subplots(rows, total_cols, figsize=(3.0 * total_cols, 7))
 
     if total_cols == 1: